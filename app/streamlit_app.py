@@ -1,27 +1,27 @@
 # app/streamlit_app.py
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 import numpy as np
+import uuid
 import sys
 import os
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.etl import load_data
-from src.clean import clean_vax
-from src.storage import save_df_to_db, get_country_timeseries, DB_PATH
-from src.forecast import forecast_country_with_history
+# Only what every page needs is imported here. Heavy subsystems (plotly,
+# the forecasting models, the chatbot's NLP stack, reportlab, feedparser)
+# are imported where their page or button is first used, so a cold start
+# doesn't pay for pages that are never opened.
+from src.storage import (
+    save_df_to_db, record_high_water_marks, get_all_countries, get_countries_timeseries,
+    get_latest_snapshot, get_global_totals, get_data_summary
+)
 from src.utils import format_metric
-from src.pdf_generator import create_symptom_assessment_pdf
-from src.chatbot import get_chatbot_response
 from src.translations import t, SUPPORTED_LANGUAGES
 from src.js_components import text_to_speech_button
 from src.location_maps import show_my_location_button
-from src.news_dashboard import render_news_dashboard
 from src.feedback import display_feedback_form
 from src.particles import show_particle_background
 
@@ -399,32 +399,60 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def load_vaccination_data():
-    """Load and clean vaccination data, with caching"""
-    if os.path.exists(DB_PATH):
-        # Try to load from database first
-        try:
-            from sqlalchemy import create_engine
-            engine = create_engine(f"sqlite:///{DB_PATH}")
-            df = pd.read_sql("SELECT * FROM countries_vaccinations", engine, parse_dates=["date"])
-            return df
-        except:
-            pass
-    
-    # Fallback to loading from source
-    df = load_data()
+def build_database():
+    """Download, clean and store the vaccination data from source"""
+    from src.etl import load_data
+    from src.clean import clean_vax, CLEAN_COLUMNS, CLEAN_DTYPES
+
+    df = load_data(columns=CLEAN_COLUMNS, dtype=CLEAN_DTYPES)
     df_clean = clean_vax(df)
     save_df_to_db(df_clean)
-    return df_clean
+    record_high_water_marks(df_clean, replace=True)
+
+@st.cache_resource
+def ensure_vaccination_data():
+    """Build the database on first run if it holds no data yet"""
+    if not get_data_summary()['records']:
+        build_database()
+
+# The dashboard queries only what it shows; each query is cached separately
+# so a session never holds the full history in memory
+
+@st.cache_data(ttl=3600)  # Cache for 1 hour
+def load_country_list():
+    """Names of all stored locations, with caching"""
+    return get_all_countries()
+
+@st.cache_data(ttl=3600, max_entries=32)
+def load_country_timeseries(countries):
+    """Time series of the selected countries (a tuple, for a stable cache key)"""
+    return get_countries_timeseries(countries)
+
+@st.cache_data(ttl=900)  # Cache for 15 minutes
+def load_latest_snapshot():
+    """Latest reported values per country (one row per location), with caching"""
+    return get_latest_snapshot()
+
+@st.cache_data(ttl=900)
+def load_global_totals():
+    """Global vaccination totals, with caching"""
+    return get_global_totals()
+
+@st.cache_data(ttl=900)
+def load_data_summary():
+    """Last update date and record counts, with caching"""
+    return get_data_summary()
+
+@st.cache_resource
+def load_chatbot():
+    """The chatbot shared by all sessions, built when the chatbot page is first used"""
+    from src.chatbot import get_chatbot
+    return get_chatbot()
 
 def refresh_data():
     """Force refresh data from source"""
     st.cache_data.clear()
-    df = load_data()
-    df_clean = clean_vax(df)
-    save_df_to_db(df_clean)
-    return df_clean
+    build_database()
 
 def show_chatbot():
     """Display the AI Health Assistant interface"""
@@ -441,6 +469,10 @@ def show_chatbot():
         st.session_state.messages = [
             {"role": "assistant", "content": t('chatbot_welcome')}
         ]
+    # The chatbot is shared by all sessions; its memory of this conversation
+    # (e.g. the country of a follow-up question) is kept under this id
+    if "chat_session_id" not in st.session_state:
+        st.session_state.chat_session_id = uuid.uuid4().hex
 
     # Display chat messages from history on app rerun
     for message in st.session_state.messages:
@@ -461,7 +493,9 @@ def show_chatbot():
         with st.chat_message("assistant"):
             with st.spinner(t('chatbot_thinking')):
                 # Pass current language to chatbot
-                response = get_chatbot_response(prompt, lang=st.session_state.language)
+                response = load_chatbot().get_response(
+                    prompt, lang=st.session_state.language, session_id=st.session_state.chat_session_id
+                )
                 st.markdown(response)
                 
                 # Add Text-to-Speech Button
@@ -472,25 +506,25 @@ def show_chatbot():
 
 def show_dashboard():
     """Display the main dashboard"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from src.news_dashboard import render_news_dashboard
+
     # Header
     st.markdown(f'<p class="main-title">{t("dashboard_title")}</p>', unsafe_allow_html=True)
     st.markdown(f"### {t('dashboard_subtitle')}")
 
     try:
-        df = load_vaccination_data()
+        ensure_vaccination_data()
         
         # Global Overview
         st.header(t('global_overview'))
         
-        # Get latest stats
-        latest_date = df['date'].max()
-        latest_stats = df[df['date'] == latest_date].copy()
-        
-        # Calculate global totals
-        total_vaccinations = latest_stats['total_vaccinations'].sum()
-        total_people_vaccinated = latest_stats['people_vaccinated'].sum()
-        total_fully_vaccinated = latest_stats['people_fully_vaccinated'].sum()
-        total_population = latest_stats['population'].sum()
+        # Get global totals (one precomputed row, each country's last known values)
+        totals = load_global_totals()
+        total_vaccinations = totals['total_vaccinations']
+        total_people_vaccinated = totals['people_vaccinated']
+        total_fully_vaccinated = totals['people_fully_vaccinated']
         
         # Display metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -514,7 +548,7 @@ def show_dashboard():
             )
         
         with col4:
-            pct_vaccinated = (total_people_vaccinated / total_population * 100) if pd.notna(total_population) and total_population > 0 else 0
+            pct_vaccinated = totals['pct_vaccinated'] if pd.notna(totals['pct_vaccinated']) else 0
             st.metric(
                 t('global_coverage'),
                 f"{pct_vaccinated:.1f}%" if pct_vaccinated > 0 else "N/A"
@@ -525,8 +559,7 @@ def show_dashboard():
         # Country Selection
         st.header(t('country_analysis'))
         
-        # Filter out aggregated regions (they usually contain spaces or special chars)
-        countries = sorted([c for c in df['location'].unique() if pd.notna(c)])
+        countries = load_country_list()
         
         # Default countries for comparison
         default_countries = ['India', 'United States', 'China', 'United Kingdom', 'Brazil']
@@ -550,8 +583,8 @@ def show_dashboard():
         )
         
         if selected_countries:
-            # Filter data for selected countries
-            country_data = df[df['location'].isin(selected_countries)].copy()
+            # Query data for selected countries
+            country_data = load_country_timeseries(tuple(sorted(selected_countries)))
             
             # Time Series Visualizations
             st.subheader(t('vaccination_trends'))
@@ -709,15 +742,20 @@ def show_dashboard():
             if st.button(t('generate_forecast')):
                 with st.spinner(f"Generating forecast for {forecast_country}..."):
                     try:
+                        from src.forecast import forecast_country_with_history, MIN_HISTORY
+
                         # Get country data
                         country_ts = country_data[country_data['location'] == forecast_country].copy()
                         
-                        if len(country_ts) > 30:  # Need sufficient history for Prophet
-                            # Generate forecast
+                        if len(country_ts) > MIN_HISTORY:  # Need sufficient history for Prophet
+                            # Read the precomputed forecast (fitted here only if
+                            # run_all.py --forecasts has not covered this data yet);
+                            # both use the model set in $VAX_FORECAST_MODEL
                             historical, future = forecast_country_with_history(
                                 country_ts, 
                                 column="daily_vaccinations",
-                                periods=30
+                                periods=30,
+                                use_cache=True
                             )
                             
                             # Create forecast visualization
@@ -798,7 +836,7 @@ def show_dashboard():
         st.header(t('global_map'))
         
         # Get latest data for each country
-        latest_by_country = df[df['date'] == latest_date].copy()
+        latest_by_country = load_latest_snapshot()
         
         # Create choropleth map
         fig = px.choropleth(
@@ -1000,6 +1038,8 @@ def show_dashboard():
             risk_level_str = "LOW"
         
         try:
+            from src.pdf_generator import create_symptom_assessment_pdf
+
             # Generate PDF
             pdf_bytes = create_symptom_assessment_pdf(
                 symptoms_data=symptoms_data,
@@ -1120,7 +1160,7 @@ with st.sidebar:
     # Data refresh button
     if st.button(t('refresh_data')):
         with st.spinner("Downloading and processing latest data..."):
-            df = refresh_data()
+            refresh_data()
             st.success(t('refresh_success'))
     
     st.divider()
@@ -1133,11 +1173,12 @@ with st.sidebar:
     
     # Data info
     try:
-        df = load_vaccination_data()
+        ensure_vaccination_data()
+        summary = load_data_summary()
         st.markdown(f"### {t('data_info')}")
-        st.metric(t('last_updated'), df['date'].max().strftime("%Y-%m-%d"))
-        st.metric(t('countries_count'), df['location'].nunique())
-        st.metric(t('total_records'), f"{len(df):,}")
+        st.metric(t('last_updated'), summary['last_date'].strftime("%Y-%m-%d"))
+        st.metric(t('countries_count'), summary['countries'])
+        st.metric(t('total_records'), f"{summary['records']:,}")
     except Exception as e:
         st.error("Error loading data info")
     
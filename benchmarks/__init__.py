@@ -0,0 +1 @@
+# COVID-19 Vaccine Tracker - Benchmarks
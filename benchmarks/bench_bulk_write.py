@@ -0,0 +1,64 @@
+"""
+Write throughput benchmark for save_df_to_db.
+
+Writes the same cleaned data with pandas to_sql (the original writer) and
+with the staging-table bulk writer at several executemany batch sizes,
+each into a fresh database, and reports rows per second.
+
+Usage:
+    python benchmarks/bench_bulk_write.py
+    python benchmarks/bench_bulk_write.py --locations 255 --days 1400 --batch-sizes 1000 10000 50000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--locations", type=int, default=255)
+    parser.add_argument("--days", type=int, default=1400)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import make_owid_frame
+    from src import storage
+    from src.clean import clean_vax, CLEAN_DTYPES
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = clean_vax(make_owid_frame(args.locations, args.days).astype(
+            {c: t for c, t in CLEAN_DTYPES.items() if c != "daily_vaccinations"}
+        ))
+    print(f"{len(df):,} rows x {len(storage.VACCINATION_COLUMNS)} columns\n")
+
+    def to_sql():
+        df.to_sql(storage.VACCINATION_TABLE, storage.get_engine(), if_exists="replace", index=False)
+
+    def bulk(batch_size):
+        def write():
+            storage.BULK_BATCH_SIZE = batch_size
+            storage.save_df_to_db(df)
+        return write
+
+    variants = [("to_sql", to_sql)]
+    variants += [(f"bulk {size:,}", bulk(size)) for size in args.batch_sizes]
+
+    print(f"{'writer':<16}{'seconds':>9}{'rows/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (name, write) in enumerate(variants):
+            storage.DB_URL = f"sqlite:///{os.path.join(tmp, f'bench{i}.db')}"
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                write()
+            seconds = time.perf_counter() - start
+            print(f"{name:<16}{seconds:>9.2f}{len(df) / seconds:>12,.0f}")
+            storage.dispose_engines()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Chatbot throughput benchmark: get_response() per message vs get_responses().
+
+Replays a made-up chat log (knowledge base patterns, some words misspelled
+with one or two edits, shuffled) through one Chatbot message by message and
+then as batches, with the spell-check cache cleared before each run, and
+reports messages per second and whether both runs gave the same answers.
+The chatbot reads countries from the local database, like the app.
+
+Usage:
+    python benchmarks/bench_chatbot_batch.py
+    python benchmarks/bench_chatbot_batch.py --messages 2000 --batch 100 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def make_chat_log(patterns, n_messages, typo_rate, rng):
+    """n_messages patterns with about typo_rate of their words misspelled"""
+    from benchmarks.bench_spelling import corrupt
+
+    messages = []
+    for _ in range(n_messages):
+        words = rng.choice(patterns).split()
+        messages.append(" ".join(
+            corrupt(word, rng) if len(word) > 3 and rng.random() < typo_rate else word
+            for word in words
+        ))
+    return messages
+
+def replay(bot, respond, seed):
+    """Seconds to run respond(state) as a new conversation from a cold spell-check cache, and its answers"""
+    from src.conversation import ConversationState
+
+    bot.spelling.correct.cache_clear()
+    state = ConversationState()
+    random.seed(seed)
+    start = time.perf_counter()
+    responses = respond(state)
+    return time.perf_counter() - start, responses
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--typo-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import contextlib
+    import io
+    from src.chatbot import Chatbot
+
+    bot = Chatbot()
+    messages = make_chat_log(list(bot.patterns), args.messages, args.typo_rate, random.Random(args.seed))
+
+    def batched(size):
+        return lambda state: [response for i in range(0, len(messages), size)
+                              for response in bot.get_responses(messages[i:i + size], state=state)]
+
+    runs = [("get_response", lambda state: [bot.get_response(message, state=state) for message in messages])]
+    runs += [(f"get_responses({size})", batched(size)) for size in args.batch]
+
+    print(f"{len(messages)} messages, {args.typo_rate:.0%} of words misspelled\n")
+    print(f"{'api':<22}{'messages/s':>12}{'ms/message':>12}{'speedup':>9}{'agree':>8}")
+    baseline = None
+    for name, respond in runs:
+        with contextlib.redirect_stdout(io.StringIO()):  # the chatbot prints each spell fix
+            seconds, responses = replay(bot, respond, args.seed)
+        if baseline is None:
+            baseline = (seconds, responses)
+        agree = sum(a == b for a, b in zip(responses, baseline[1])) / len(messages)
+        print(f"{name:<22}{len(messages) / seconds:>12.0f}{seconds * 1000 / len(messages):>12.3f}"
+              f"{baseline[0] / seconds:>8.1f}x{agree:>8.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Memory and time benchmark for loading the OWID CSV.
+
+Compares the original loader (all columns, inferred dtypes) with the
+column-pruned, dtype-declared reader on the C and pyarrow engines. Each
+variant loads and cleans the data in a fresh subprocess so peak RSS is
+measured in isolation.
+
+Usage:
+    python benchmarks/bench_csv_load.py
+    python benchmarks/bench_csv_load.py --csv data/owid-covid-data.csv
+
+Peak RSS is read from /proc (Linux) or the resource module (macOS) and
+is not reported on Windows.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+VARIANTS = ["original", "pruned-c", "pruned-pyarrow"]
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable"""
+    # ru_maxrss survives fork/exec on Linux, so prefer the per-process VmHWM
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_variant(variant, csv_path):
+    """Load and clean the CSV with one loader variant; runs in the child process"""
+    import pandas as pd
+    from src.clean import clean_vax, CLEAN_COLUMNS, CLEAN_DTYPES
+    from src.etl import read_owid_csv
+
+    start = time.perf_counter()
+    if variant == "original":
+        df = pd.read_csv(csv_path, parse_dates=["date"])
+    else:
+        engine = variant.split("-", 1)[1]
+        df = read_owid_csv(csv_path, CLEAN_COLUMNS, CLEAN_DTYPES, engine=engine)
+    load_seconds = time.perf_counter() - start
+    frame_mb = df.memory_usage(deep=True).sum() / 1e6
+    load_rss = peak_rss_mb()
+
+    start = time.perf_counter()
+    clean_vax(df)
+    clean_seconds = time.perf_counter() - start
+
+    return {
+        "variant": variant,
+        "load_s": load_seconds,
+        "clean_s": clean_seconds,
+        "frame_mb": frame_mb,
+        "load_peak_rss_mb": load_rss,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--csv", help="CSV to load (default: generate a synthetic OWID file)")
+    parser.add_argument("--locations", type=int, default=255)
+    parser.add_argument("--days", type=int, default=1400)
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            result = run_variant(args.variant, args.csv)
+            sys.stdout = stdout
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv
+        if csv_path is None:
+            from benchmarks.synthetic import write_owid_csv
+            csv_path = os.path.join(tmp, "owid-covid-data.csv")
+            print(f"Generating synthetic OWID CSV ({args.locations} locations x {args.days} days)...")
+            write_owid_csv(csv_path, args.locations, args.days)
+        print(f"CSV: {csv_path} ({os.path.getsize(csv_path) / 1e6:.0f} MB)\n")
+
+        print(f"{'variant':<16}{'load s':>8}{'clean s':>9}{'frame MB':>10}"
+              f"{'load peak MB':>14}{'peak RSS MB':>13}")
+        for variant in VARIANTS:
+            out = subprocess.run(
+                [sys.executable, __file__, "--variant", variant, "--csv", csv_path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            load_rss = f"{r['load_peak_rss_mb']:.0f}" if r["load_peak_rss_mb"] else "n/a"
+            rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] else "n/a"
+            print(f"{r['variant']:<16}{r['load_s']:>8.2f}{r['clean_s']:>9.2f}"
+                  f"{r['frame_mb']:>10.1f}{load_rss:>14}{rss:>13}")
+
+if __name__ == "__main__":
+    main()
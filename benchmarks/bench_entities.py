@@ -0,0 +1,72 @@
+"""
+Country extraction benchmark: substring scan vs CountryMatcher.
+
+Makes up a list of country names (one to three words each) and chat
+messages that mention some of them, then times the chatbot's original
+extraction (sort all names, substring test and replace for each) against
+the word trie, and the trie build itself.
+
+Usage:
+    python benchmarks/bench_entities.py
+    python benchmarks/bench_entities.py --countries 250 --messages 2000 --words 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def substring_scan(countries, text):
+    """Chatbot.extract_entities before the trie"""
+    found = []
+    text = text.lower()
+    for country in sorted(countries, key=len, reverse=True):
+        if country in text:
+            found.append(country)
+            text = text.replace(country, "")
+    return found
+
+def us_per_call(func, messages):
+    start = time.perf_counter()
+    for message in messages:
+        func(message)
+    return (time.perf_counter() - start) * 1e6 / len(messages)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--countries", type=int, default=250)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from textblob.en import spelling
+    from src.entities import CountryMatcher
+
+    rng = random.Random(args.seed)
+    vocabulary = sorted(word for word in spelling.keys() if len(word) > 3)
+    countries = sorted({
+        " ".join(rng.sample(vocabulary, rng.choice([1, 1, 1, 2, 3]))) for _ in range(args.countries)
+    })
+    messages = []
+    for _ in range(args.messages):
+        words = rng.sample(vocabulary, args.words)
+        for _ in range(rng.choice([0, 1, 2])):
+            words.insert(rng.randrange(len(words)), rng.choice(countries))
+        messages.append(" ".join(words))
+
+    start = time.perf_counter()
+    matcher = CountryMatcher(countries)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{len(countries)} countries, {len(messages)} messages of ~{args.words} words, "
+          f"trie built in {build_ms:.1f} ms\n")
+    print(f"{'extractor':<18}{'us/message':>12}")
+    print(f"{'substring scan':<18}{us_per_call(lambda m: substring_scan(countries, m), messages):>12.1f}")
+    print(f"{'CountryMatcher':<18}{us_per_call(matcher.find, messages):>12.1f}")
+
+if __name__ == "__main__":
+    main()
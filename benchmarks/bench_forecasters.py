@@ -0,0 +1,78 @@
+"""
+Accuracy and latency benchmark for the forecasting models.
+
+Holds out the last days of several synthetic vaccination campaigns in a
+few rolling windows, fits every model in FORECASTERS on the history before
+each window and scores the forecast against the held-out days: MAE, MASE
+(error relative to a weekly seasonal-naive forecast), 80% interval
+coverage, and fit time.
+
+Usage:
+    python benchmarks/bench_forecasters.py
+    python benchmarks/bench_forecasters.py --locations 20 --windows 4 --horizon 30 --models holt_winters
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--locations", type=int, default=8)
+    parser.add_argument("--days", type=int, default=400)
+    parser.add_argument("--windows", type=int, default=3)
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--models", nargs="+")
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import make_daily_vaccinations
+    from src.forecast import FORECASTERS
+
+    logging.disable(logging.WARNING)  # cmdstanpy and prophet log every fit
+
+    df = make_daily_vaccinations(args.locations, args.days)
+    models = args.models or list(FORECASTERS)
+    h = args.horizon
+    print(f"{args.locations} locations x {args.windows} windows, {h}-day horizon\n")
+
+    results = {model: {"mae": [], "mase": [], "covered": [], "seconds": []} for model in models}
+    for _, country in df.groupby("location"):
+        y = country["daily_vaccinations"].to_numpy()
+        for w in range(args.windows, 0, -1):
+            cutoff = len(country) - w * h
+            train, actual = country.iloc[:cutoff], y[cutoff:cutoff + h]
+            naive_mae = np.abs(y[7:cutoff] - y[:cutoff - 7]).mean()
+
+            for model in models:
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    forecast = FORECASTERS[model](train, "daily_vaccinations", h)
+                seconds = time.perf_counter() - start
+
+                future = forecast.tail(h)
+                error = np.abs(future["yhat"].to_numpy() - actual).mean()
+                stats = results[model]
+                stats["mae"].append(error)
+                stats["mase"].append(error / naive_mae)
+                stats["covered"].append(np.mean(
+                    (actual >= future["yhat_lower"].to_numpy()) & (actual <= future["yhat_upper"].to_numpy())
+                ))
+                stats["seconds"].append(seconds)
+
+    print(f"{'model':<14}{'MAE':>12}{'MASE':>8}{'80% cover':>11}{'median fit ms':>15}{'total s':>9}")
+    for model, stats in results.items():
+        print(f"{model:<14}{np.mean(stats['mae']):>12,.0f}{np.mean(stats['mase']):>8.2f}"
+              f"{np.mean(stats['covered']):>11.0%}{statistics.median(stats['seconds']) * 1000:>15.1f}"
+              f"{sum(stats['seconds']):>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Cold-start import cost of the Streamlit app.
+
+Collects the module-level imports of app/streamlit_app.py, imports them in
+a fresh interpreter under python -X importtime, and reports the total and
+the most expensive top-level packages. Heavy subsystems (Prophet, the
+chatbot's scikit-learn/TextBlob stack, reportlab) should not show up here;
+they are imported when their page or button is first used.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --module src.forecast --repeat 5 --top 15
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+APP_PATH = os.path.join(ROOT, "app", "streamlit_app.py")
+
+def app_imports(path=APP_PATH):
+    """Import statements at the top level of a module, as source lines"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+def import_times(statements):
+    """
+    Run statements in a fresh interpreter under -X importtime.
+
+    Returns:
+        dict: Cumulative microseconds per top-level package (per module
+            for this repo's src package), counting only outermost imports
+    """
+    code = f"import sys; sys.path.insert(0, {ROOT!r})\n" + "\n".join(statements)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+
+    packages = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is shown by indentation; depth 0 imports are ours
+        if name.startswith(" ") and not name.startswith("  "):
+            name = name.strip()
+            packages[name if name.startswith("src.") else name.split(".")[0]] += int(cumulative)
+    return packages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", help="time one module instead of the app's imports")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    statements = [f"import {args.module}"] if args.module else app_imports()
+    startup = set(import_times([]))  # the interpreter's own, e.g. site and encodings
+    runs = [
+        {name: us for name, us in import_times(statements).items() if name not in startup}
+        for _ in range(args.repeat)
+    ]
+    totals = [sum(run.values()) for run in runs]
+    median = {name: statistics.median(run.get(name, 0) for run in runs) for name in runs[0]}
+
+    target = args.module or "app/streamlit_app.py"
+    print(f"{target}: {len(statements)} import statements, median of {args.repeat} cold runs\n")
+    print(f"{'package':<24}{'ms':>10}")
+    for name, us in sorted(median.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<24}{us / 1000:>10.1f}")
+    print(f"{'total':<24}{statistics.median(totals) / 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
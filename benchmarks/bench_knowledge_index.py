@@ -0,0 +1,84 @@
+"""
+Knowledge base lookup benchmark: linear scans vs the compiled index.
+
+Looks up the responses of every intent (and of every emotion's intent),
+and checks every translated response plus an untranslated one, first with
+the scans Chatbot.get_response used to do over KNOWLEDGE_BASE and
+KNOWLEDGE_BASE_TRANSLATIONS, then with KnowledgeIndex. --scale repeats the
+knowledge base under new intent names to show how each grows with its size.
+
+Usage:
+    python benchmarks/bench_knowledge_index.py
+    python benchmarks/bench_knowledge_index.py --scale 1 10 --repeat 20
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def scan_responses(knowledge_base, intent):
+    for item in knowledge_base:
+        if item['intent'] == intent:
+            return item['responses']
+    return None
+
+def scan_translated(translations, response, lang):
+    if lang not in translations:
+        return False
+    for intent_responses in translations[lang].values():
+        if response in intent_responses:
+            return True
+    return False
+
+def us_per_lookup(func, keys, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for key in keys:
+            func(key)
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(keys))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from src.chatbot_knowledge import KNOWLEDGE_BASE
+    from src.chatbot_translations import KNOWLEDGE_BASE_TRANSLATIONS
+    from src.knowledge_index import build_knowledge_index
+
+    print(f"{'intents':>8}{'compile ms':>12}{'scan intent us':>16}{'index us':>10}"
+          f"{'scan translated us':>20}{'index us':>10}")
+    for scale in args.scale:
+        knowledge_base = [
+            {**item, 'intent': item['intent'] + (f"_{copy}" if copy else "")}
+            for copy in range(scale) for item in KNOWLEDGE_BASE
+        ]
+        translations = {
+            lang: {
+                intent + (f"_{copy}" if copy else ""): [f"{text} ({copy})" if copy else text for text in texts]
+                for copy in range(scale) for intent, texts in by_intent.items()
+            }
+            for lang, by_intent in KNOWLEDGE_BASE_TRANSLATIONS.items()
+        }
+
+        start = time.perf_counter()
+        index = build_knowledge_index(knowledge_base, translations)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        intents = [item['intent'] for item in knowledge_base]
+        checks = [(text, lang) for lang, by_intent in translations.items()
+                  for texts in by_intent.values() for text in texts]
+        checks.append(("An English response", "hi"))
+
+        print(f"{len(intents):>8}{compile_ms:>12.1f}"
+              f"{us_per_lookup(lambda i: scan_responses(knowledge_base, i), intents, args.repeat):>16.2f}"
+              f"{us_per_lookup(index.responses.get, intents, args.repeat):>10.2f}"
+              f"{us_per_lookup(lambda c: scan_translated(translations, *c), checks, args.repeat):>20.2f}"
+              f"{us_per_lookup(lambda c: index.is_translated(*c), checks, args.repeat):>10.2f}")
+
+if __name__ == "__main__":
+    main()
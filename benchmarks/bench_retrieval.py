@@ -0,0 +1,74 @@
+"""
+Intent retrieval benchmark: dense cosine over all patterns vs PatternIndex.
+
+Grows the knowledge base patterns to several sizes by recombining the words
+of the real ones, fits a TF-IDF vectorizer on each, and times one query
+against all patterns the way Chatbot.get_response used to (cosine_similarity
+then argmax) and with the sparse top-k PatternIndex. Vectorizing the query
+costs the same for both and is reported separately.
+
+Usage:
+    python benchmarks/bench_retrieval.py
+    python benchmarks/bench_retrieval.py --patterns 844 5000 20000 --queries 300
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def us_per_query(func, queries):
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) * 1e6 / len(queries)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patterns", type=int, nargs="+", default=[844, 5000, 20000])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+    from src.knowledge_index import get_knowledge_index
+    from src.retrieval import PatternIndex
+
+    rng = random.Random(args.seed)
+    knowledge = get_knowledge_index()
+    words = sorted({word for pattern in knowledge.patterns for word in pattern.lower().split()})
+
+    print(f"{'patterns':>9}{'intents':>9}{'transform us':>14}{'dense us':>10}{'sparse top-k us':>17}{'agree':>8}")
+    for size in args.patterns:
+        patterns, labels = list(knowledge.patterns), list(knowledge.pattern_intents)
+        while len(patterns) < size:
+            i = rng.randrange(len(knowledge.patterns))
+            base = knowledge.patterns[i].split()
+            patterns.append(" ".join(base + rng.sample(words, 2)))
+            labels.append(f"{knowledge.pattern_intents[i]}_{len(patterns) % 50}")
+
+        vectorizer = TfidfVectorizer()
+        matrix = vectorizer.fit_transform(patterns)
+        index = PatternIndex(matrix, labels)
+        texts = [" ".join(rng.sample(p.split(), max(1, len(p.split()) - 1))) for p in rng.sample(patterns, args.queries)]
+        queries = [vectorizer.transform([text]) for text in texts]
+
+        def dense(query):
+            similarities = cosine_similarity(query, matrix).flatten()
+            best = np.argmax(similarities)
+            return labels[best], similarities[best]
+
+        agree = sum(dense(q)[0] == (index.search(q) or [(None,)])[0][0] for q in queries)
+        print(f"{matrix.shape[0]:>9}{len(index.intents):>9}"
+              f"{us_per_query(lambda t: vectorizer.transform([t]), texts):>14.0f}"
+              f"{us_per_query(dense, queries):>10.0f}{us_per_query(index.search, queries):>17.0f}"
+              f"{agree / len(queries):>8.0%}")
+
+if __name__ == "__main__":
+    main()
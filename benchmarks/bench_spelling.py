@@ -0,0 +1,74 @@
+"""
+Spell-correction benchmark: TextBlob's Word.correct() vs the SpellIndex.
+
+Corrupts random words from TextBlob's word list with one or two edits,
+corrects them with both, and reports the per-word latency (cold and with
+the LRU cache warm), how often the two agree, and the index build time.
+
+Usage:
+    python benchmarks/bench_spelling.py
+    python benchmarks/bench_spelling.py --words 500 --seed 1
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def corrupt(word, rng):
+    """word with one or two random deletes, inserts, replaces or swaps"""
+    chars = list(word)
+    for _ in range(rng.choice([1, 1, 2])):
+        i = rng.randrange(len(chars))
+        op = rng.choice("dirs")
+        if op == "d" and len(chars) > 1:
+            del chars[i]
+        elif op == "i":
+            chars.insert(i, rng.choice(string.ascii_lowercase))
+        elif op == "r":
+            chars[i] = rng.choice(string.ascii_lowercase)
+        elif op == "s" and i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+def per_word_ms(correct, words):
+    start = time.perf_counter()
+    results = [correct(word) for word in words]
+    return results, (time.perf_counter() - start) * 1000 / len(words)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from textblob import Word
+    from textblob.en import spelling
+    from src.spelling import SpellIndex
+
+    rng = random.Random(args.seed)
+    vocabulary = sorted(word for word in spelling.keys() if len(word) > 2)
+    words = [corrupt(rng.choice(vocabulary), rng) for _ in range(args.words)]
+
+    start = time.perf_counter()
+    index = SpellIndex.from_textblob()
+    build = time.perf_counter() - start
+
+    expected, textblob_ms = per_word_ms(lambda w: str(Word(w).correct()), words)
+    results, cold_ms = per_word_ms(index.correct, words)
+    _, warm_ms = per_word_ms(index.correct, words)
+    agree = sum(a == b for a, b in zip(results, expected))
+
+    print(f"{len(words)} misspelled words, index of {len(index):,} words built in {build:.2f} s\n")
+    print(f"{'corrector':<22}{'ms/word':>10}")
+    print(f"{'TextBlob':<22}{textblob_ms:>10.3f}")
+    print(f"{'SpellIndex (cold)':<22}{cold_ms:>10.3f}")
+    print(f"{'SpellIndex (cached)':<22}{warm_ms:>10.4f}")
+    print(f"\nSame correction as TextBlob: {agree}/{len(words)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Query latency benchmark for the countries_vaccinations table.
+
+Loads the same cleaned data twice: once as the unindexed table pandas
+to_sql used to create, once through save_df_to_db with the managed
+(location, date) schema. Then times get_latest_by_country and
+get_country_timeseries against both.
+
+Usage:
+    python benchmarks/bench_storage_queries.py
+    python benchmarks/bench_storage_queries.py --locations 255 --days 1400 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def time_ms(func, repeat):
+    """Median wall time of func() in milliseconds"""
+    func()  # warm the page cache and connection pool
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def write_legacy_table(df, db_path):
+    """Write df the way save_df_to_db used to: to_sql replace, no keys or indexes"""
+    import sqlalchemy as sa
+    from src import storage
+
+    engine = sa.create_engine(f"sqlite:///{db_path}")
+    df.to_sql(storage.VACCINATION_TABLE, engine, if_exists="replace", index=False)
+    with engine.begin() as conn:
+        # Mark the schema as current so get_engine() queries the table as-is
+        conn.execute(sa.text(f"PRAGMA user_version = {len(storage.MIGRATIONS)}"))
+    engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--locations", type=int, default=255)
+    parser.add_argument("--days", type=int, default=1400)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import make_owid_frame
+    from src import storage
+    from src.clean import clean_vax
+
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        df = clean_vax(make_owid_frame(args.locations, args.days))
+        sys.stdout = stdout
+    country = df["location"].iloc[len(df) // 2]
+    print(f"{len(df):,} rows, timeseries query for '{country}', median of {args.repeat} runs\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.db")
+        managed_path = os.path.join(tmp, "managed.db")
+
+        write_legacy_table(df, legacy_path)
+        storage.DB_URL = f"sqlite:///{managed_path}"
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            storage.save_df_to_db(df)
+            sys.stdout = stdout
+
+        print(f"{'schema':<10}{'latest ms':>12}{'timeseries ms':>16}")
+        for name, path in (("to_sql", legacy_path), ("managed", managed_path)):
+            storage.DB_URL = f"sqlite:///{path}"
+            latest = time_ms(lambda: storage.get_latest_by_country(limit=100), args.repeat)
+            series = time_ms(lambda: storage.get_country_timeseries(country), args.repeat)
+            print(f"{name:<10}{latest:>12.1f}{series:>16.1f}")
+
+        storage.dispose_engines()
+
+if __name__ == "__main__":
+    main()
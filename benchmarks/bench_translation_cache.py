@@ -0,0 +1,84 @@
+"""
+Translation benchmark: a translator call per answer vs the TranslationCache.
+
+Replays chatbot answers in every language with a machine-translated
+knowledge base (answers drawn with a skew towards the common ones, as in a
+chat log) through a stub translator that sleeps like a network round trip.
+Each replay is timed as a translator call per answer (the chatbot before
+the cache), a cold cache, a warm one, a new process reading the database
+filled by the first one, and a cache pre-warmed offline.
+
+Usage:
+    python benchmarks/bench_translation_cache.py
+    python benchmarks/bench_translation_cache.py --answers 2000 --latency-ms 100
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--answers", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=50.0,
+                        help="simulated round trip of one translator call")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from src import storage
+    from src.knowledge_index import get_knowledge_index
+    from src.translation_cache import TranslationCache, prewarm_knowledge_base, untranslated_responses
+
+    calls = [0]
+
+    def slow_translate(text, lang):
+        calls[0] += 1
+        time.sleep(args.latency_ms / 1000)
+        return f"[{lang}] {text}"
+
+    rng = random.Random(args.seed)
+    texts = untranslated_responses(get_knowledge_index())
+    replay = []
+    for _ in range(args.answers):
+        lang = rng.choice(sorted(texts))
+        # Zipf-like: a few answers (greetings, side effects, ...) come up far more often
+        replay.append((texts[lang][min(int(rng.paretovariate(1.0)) - 1, len(texts[lang]) - 1)], lang))
+
+    def run(translate):
+        calls[0] = 0
+        start = time.perf_counter()
+        for text, lang in replay:
+            translate(text, lang)
+        return (time.perf_counter() - start) * 1000 / len(replay), calls[0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.DB_URL = f"sqlite:///{os.path.join(tmp, 'translations.db')}"
+        cache = TranslationCache(backend=slow_translate)
+        runs = [("translator per answer", slow_translate),
+                ("cache, cold", cache.translate),
+                ("cache, warm", cache.translate),
+                ("new process, stored", TranslationCache(backend=slow_translate).translate)]
+        print(f"{len(replay)} answers, {len({r for r in replay})} distinct, "
+              f"{args.latency_ms:.0f} ms per translator call\n")
+        print(f"{'translator':<24}{'ms/answer':>10}{'calls':>8}")
+        for name, translate in runs:
+            ms, n_calls = run(translate)
+            print(f"{name:<24}{ms:>10.3f}{n_calls:>8}")
+
+        storage.DB_URL = f"sqlite:///{os.path.join(tmp, 'prewarmed.db')}"
+        start = time.perf_counter()
+        prewarmed = TranslationCache(backend=slow_translate)
+        prewarm_calls = sum(prewarm_knowledge_base(prewarmed).values())
+        prewarm_s = time.perf_counter() - start
+        ms, n_calls = run(TranslationCache(backend=slow_translate).translate)
+        print(f"{'pre-warmed offline':<24}{ms:>10.3f}{n_calls:>8}")
+        print(f"\n(pre-warming took {prewarm_calls} calls, {prewarm_s:.1f} s)")
+        storage.dispose_engines()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Synthetic OWID-shaped data for benchmarks.
+
+Generates a frame with the same 67 columns as owid-covid-data.csv so the
+benchmarks can run offline at a realistic size.
+"""
+import numpy as np
+import pandas as pd
+
+OWID_COLUMNS = [
+    "iso_code", "continent", "location", "date", "total_cases", "new_cases",
+    "new_cases_smoothed", "total_deaths", "new_deaths", "new_deaths_smoothed",
+    "total_cases_per_million", "new_cases_per_million",
+    "new_cases_smoothed_per_million", "total_deaths_per_million",
+    "new_deaths_per_million", "new_deaths_smoothed_per_million",
+    "reproduction_rate", "icu_patients", "icu_patients_per_million",
+    "hosp_patients", "hosp_patients_per_million", "weekly_icu_admissions",
+    "weekly_icu_admissions_per_million", "weekly_hosp_admissions",
+    "weekly_hosp_admissions_per_million", "total_tests", "new_tests",
+    "total_tests_per_thousand", "new_tests_per_thousand", "new_tests_smoothed",
+    "new_tests_smoothed_per_thousand", "positive_rate", "tests_per_case",
+    "tests_units", "total_vaccinations", "people_vaccinated",
+    "people_fully_vaccinated", "total_boosters", "new_vaccinations",
+    "new_vaccinations_smoothed", "total_vaccinations_per_hundred",
+    "people_vaccinated_per_hundred", "people_fully_vaccinated_per_hundred",
+    "total_boosters_per_hundred", "new_vaccinations_smoothed_per_million",
+    "new_people_vaccinated_smoothed", "new_people_vaccinated_smoothed_per_hundred",
+    "stringency_index", "population_density", "median_age", "aged_65_older",
+    "aged_70_older", "gdp_per_capita", "extreme_poverty", "cardiovasc_death_rate",
+    "diabetes_prevalence", "female_smokers", "male_smokers",
+    "handwashing_facilities", "hospital_beds_per_thousand", "life_expectancy",
+    "human_development_index", "population", "excess_mortality_cumulative_absolute",
+    "excess_mortality_cumulative", "excess_mortality",
+    "excess_mortality_cumulative_per_million",
+]
+
+AGGREGATES = [
+    "World", "Africa", "Asia", "Europe", "European Union", "North America",
+    "Oceania", "South America", "High income", "Upper middle income",
+    "Lower middle income", "Low income",
+]
+
+COUNT_COLUMNS = {
+    "total_cases", "new_cases", "total_deaths", "new_deaths", "icu_patients",
+    "hosp_patients", "total_tests", "new_tests", "total_vaccinations",
+    "people_vaccinated", "people_fully_vaccinated", "total_boosters",
+    "new_vaccinations", "population",
+}
+
+def make_owid_frame(n_locations=255, n_days=1400, seed=0):
+    """
+    Build an OWID-shaped DataFrame.
+
+    Args:
+        n_locations (int): Number of locations, aggregates included
+        n_days (int): Days of history per location
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Raw data with OWID column names, dates as strings
+    """
+    rng = np.random.default_rng(seed)
+    names = AGGREGATES[:n_locations] + [
+        f"Country {i:03d}" for i in range(max(0, n_locations - len(AGGREGATES)))
+    ]
+    n = len(names) * n_days
+
+    data = {
+        "iso_code": np.repeat([f"C{i:03d}" for i in range(len(names))], n_days),
+        "continent": np.repeat(rng.choice(["Africa", "Asia", "Europe"], len(names)), n_days),
+        "location": np.repeat(names, n_days),
+        "date": np.tile(pd.date_range("2020-01-01", periods=n_days).strftime("%Y-%m-%d"), len(names)),
+        "tests_units": "tests performed",
+    }
+
+    # Cumulative vaccination counts with reporting gaps
+    population = np.repeat(rng.integers(100_000, 1_400_000_000, len(names)), n_days)
+    doses = rng.integers(0, 50_000, (len(names), n_days)).cumsum(axis=1).ravel()
+    for col, share in [("total_vaccinations", 1.0), ("people_vaccinated", 0.6),
+                       ("people_fully_vaccinated", 0.45), ("total_boosters", 0.2)]:
+        values = np.floor(doses * share)
+        values[rng.random(n) < 0.6] = np.nan
+        data[col] = values
+    data["population"] = population.astype(float)
+
+    for col in OWID_COLUMNS:
+        if col in data:
+            continue
+        values = rng.random(n) * 1000
+        values = np.floor(values) if col in COUNT_COLUMNS else np.round(values, 3)
+        values[rng.random(n) < 0.3] = np.nan
+        data[col] = values
+
+    return pd.DataFrame(data)[OWID_COLUMNS]
+
+def write_owid_csv(path, n_locations=255, n_days=1400, seed=0):
+    """Write a synthetic OWID CSV and return its path"""
+    make_owid_frame(n_locations, n_days, seed).to_csv(path, index=False)
+    return path
+
+def make_daily_vaccinations(n_locations=20, n_days=400, seed=0):
+    """
+    Build campaign-shaped daily vaccination series for forecasting benchmarks.
+
+    Each location ramps up along a logistic curve, then declines, with a
+    weekend reporting dip and multiplicative noise.
+
+    Args:
+        n_locations (int): Number of locations
+        n_days (int): Days of history per location
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: location, date, daily_vaccinations
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_days)
+    dates = pd.date_range("2021-01-01", periods=n_days)
+    weekend = dates.dayofweek >= 5
+
+    frames = []
+    for i in range(n_locations):
+        peak = rng.uniform(1e3, 1e6)
+        ramp = peak / (1 + np.exp(-(t - rng.uniform(0.2, 0.5) * n_days) / rng.uniform(10, 40)))
+        decline = np.exp(-np.maximum(t - rng.uniform(0.4, 0.7) * n_days, 0) / rng.uniform(60, 300))
+        dip = np.where(weekend, rng.uniform(0.4, 0.9), 1.0)
+        noise = rng.lognormal(0, rng.uniform(0.05, 0.2), n_days)
+        frames.append(pd.DataFrame({
+            "location": f"Country {i:03d}",
+            "date": dates,
+            "daily_vaccinations": np.round(ramp * decline * dip * noise),
+        }))
+    return pd.concat(frames, ignore_index=True)
@@ -3,7 +3,13 @@
 """
 End-to-end automation script for COVID-19 Vaccine Tracker ETL pipeline.
 Downloads latest data, cleans it, and stores in SQLite database.
+
+Usage:
+    python run_all.py                # full rebuild
+    python run_all.py --incremental  # only load new dates and revisions of recent ones
+    python run_all.py --forecasts    # also precompute forecasts for all countries
 """
+import argparse
 import sys
 import os
 from datetime import datetime
@@ -12,10 +18,13 @@ from datetime import datetime
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.etl import load_data
-from src.clean import clean_vax
-from src.storage import save_df_to_db, get_latest_by_country
+from src.clean import clean_vax, clean_vax_incremental, CLEAN_COLUMNS, CLEAN_DTYPES, REVISION_LOOKBACK_DAYS
+from src.storage import (
+    save_df_to_db, upsert_df_to_db, get_latest_by_country,
+    get_high_water_marks, record_high_water_marks, get_recently_loaded
+)
 
-def main():
+def main(incremental=False, forecasts=False, workers=None, model=None, translations=False):
     """Execute complete ETL pipeline"""
     print("=" * 70)
     print("COVID-19 Vaccine Tracker - ETL Pipeline")
@@ -27,21 +36,34 @@ def main():
         # Step 1: Download/Load Data
         print("Step 1: Downloading vaccination data...")
         print("-" * 70)
-        df_raw = load_data()
+        df_raw = load_data(columns=CLEAN_COLUMNS, dtype=CLEAN_DTYPES)
         print(f"[+] Loaded {len(df_raw):,} raw records")
         print()
         
         # Step 2: Clean and Transform
         print("Step 2: Cleaning and transforming data...")
         print("-" * 70)
-        df_clean = clean_vax(df_raw)
+        high_water_marks = get_high_water_marks() if incremental else {}
+        if incremental and not high_water_marks:
+            print("No previous load found, running a full rebuild")
+        if high_water_marks:
+            # Recent dates are compared with what is stored to pick up revisions
+            stored = get_recently_loaded(REVISION_LOOKBACK_DAYS)
+            df_clean = clean_vax_incremental(df_raw, high_water_marks, stored=stored)
+        else:
+            df_clean = clean_vax(df_raw)
         print(f"[+] Cleaned data: {len(df_clean):,} records")
         print()
         
         # Step 3: Save to Database
         print("Step 3: Saving to database...")
         print("-" * 70)
-        save_df_to_db(df_clean)
+        if high_water_marks:
+            upsert_df_to_db(df_clean)
+            record_high_water_marks(df_clean)
+        else:
+            save_df_to_db(df_clean)
+            record_high_water_marks(df_clean, replace=True)
         print("[+] Data saved successfully")
         print()
         
@@ -49,9 +71,10 @@ def main():
         print("Step 4: Summary Statistics")
         print("=" * 70)
         
+        label = "New or revised" if high_water_marks else "Total"
         print(f"Date Range: {df_clean['date'].min()} to {df_clean['date'].max()}")
         print(f"Countries/Regions: {df_clean['location'].nunique()}")
-        print(f"Total Records: {len(df_clean):,}")
+        print(f"{label} Records: {len(df_clean):,}")
         print()
         
         # Get latest stats for top countries
@@ -65,6 +88,26 @@ def main():
             print(f"{idx+1:2d}. {row['location']:25s} - {pct:5.2f}% ({total/1e6:8.2f}M doses)")
         
         print()
+
+        if forecasts:
+            # Step 5: Precompute forecasts (Prophet is imported only when needed)
+            from src.forecast import forecast_all_countries
+
+            print("Step 5: Precomputing forecasts...")
+            print("-" * 70)
+            forecast_all_countries(workers=workers, model=model)
+            print()
+
+        if translations:
+            # Step 6: Pre-translate chatbot answers into the translation cache
+            from src.translation_cache import prewarm_knowledge_base
+
+            print("Step 6: Translating chatbot answers...")
+            print("-" * 70)
+            for lang, count in prewarm_knowledge_base().items():
+                print(f"[+] {lang}: {count} answers translated")
+            print()
+
         print("=" * 70)
         print("[+] ETL Pipeline completed successfully!")
         print(f"Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -90,5 +133,20 @@ def main():
 
 if __name__ == "__main__":
     import pandas as pd  # Import here for the main block
-    exit_code = main()
+    parser = argparse.ArgumentParser(description="COVID-19 Vaccine Tracker ETL pipeline")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only clean and upsert dates newer than the last successful load, and "
+                             f"revisions of the {REVISION_LOOKBACK_DAYS} days before it")
+    parser.add_argument("--forecasts", action="store_true",
+                        help="precompute forecasts for every country with enough history")
+    parser.add_argument("--workers", type=int,
+                        help="forecast worker processes (default: CPU count)")
+    parser.add_argument("--model", choices=["prophet", "holt_winters"],
+                        help="forecasting model (holt_winters fits in milliseconds); defaults to "
+                             "$VAX_FORECAST_MODEL or prophet, the model the dashboard reads")
+    parser.add_argument("--translations", action="store_true",
+                        help="machine-translate chatbot answers without a stored translation, for offline use")
+    args = parser.parse_args()
+    exit_code = main(incremental=args.incremental, forecasts=args.forecasts, workers=args.workers,
+                     model=args.model, translations=args.translations)
     sys.exit(exit_code)
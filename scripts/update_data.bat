@@ -1,6 +1,9 @@
 @echo off
 cd /d "c:\Users\Manish\Desktop\COVID-19 vaccine tracker"
 echo Starting COVID-19 Vaccine Tracker Update...
-python run_all.py
+:: Loads new dates and OWID's revisions of the last 28 days (run_all.py
+:: compares them with the database); run "python run_all.py" by hand for a
+:: full rebuild when older data was corrected
+python run_all.py --incremental --forecasts
 echo Update process finished.
 timeout /t 10
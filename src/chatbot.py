@@ -2,68 +2,208 @@
 Smart FAQ Chatbot logic using TF-IDF for intent matching and dynamic DB querying.
 """
 import random
-import numpy as np
+import threading
+import time
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from textblob import TextBlob
-from deep_translator import GoogleTranslator
-from src.chatbot_knowledge import KNOWLEDGE_BASE
-from src.chatbot_translations import KNOWLEDGE_BASE_TRANSLATIONS
-from src.storage import get_all_countries, get_latest_by_country, get_country_timeseries
+from src.conversation import SessionStore
+from src.entities import ALIAS_WORDS, CountryMatcher
+from src.knowledge_index import get_knowledge_index
+from src.retrieval import PatternIndex
+from src.spelling import SpellIndex, tokenize
+from src.translation_cache import TranslationCache
+from src.storage import (
+    get_all_countries, get_data_version, get_latest_by_country, get_latest_snapshot, get_country_timeseries
+)
+
+# Seconds between checks for new data; messages in between skip the query
+DATA_CHECK_INTERVAL = 5.0
+
+# Keywords that route a message to a database answer
+DATA_INTENTS = {
+    'country_stats': ['how many', 'stats', 'vaccination', 'vaccinated', 'doses', 'status', 'rate', 'what about', 'how about'],
+    'top_countries': ['top', 'best', 'highest', 'most vaccinated', 'most vaccinations']
+}
+
+# Domain words the spell checker must leave alone even when they are close
+# to a common English word; the knowledge base vocabulary, country names
+# and country aliases are protected as well
+DOMAIN_TERMS = frozenset({
+    'covid', 'coronavirus', 'sars', 'omicron', 'delta', 'alpha', 'beta', 'gamma',
+    'mrna', 'pfizer', 'biontech', 'moderna', 'astrazeneca', 'janssen', 'novavax',
+    'covaxin', 'covishield', 'sputnik', 'sinovac', 'sinopharm', 'comirnaty', 'spikevax',
+    'booster', 'boosters', 'vax', 'stats', 'who', 'cdc', 'icmr', 'cowin',
+})
+
+# Session of the callers that pass neither a session id nor a state; they
+# share one conversation, as all callers did before sessions existed
+DEFAULT_SESSION = "default"
+
+# Empathetic openers and closers by language and emotion or sentiment
+EMPATHY_PHRASES = {
+    'en': {
+        'anger': "I understand your frustration. ",
+        'fear': "It's natural to feel worried. Let me help ease your concerns. ",
+        'boredom': "I'll keep this brief. ",
+        'confusion': "Let me explain this more clearly. ",
+        'sadness': "I'm sorry you're going through this. ",
+        'negative': "I'm sorry to hear you're feeling that way. ",
+        'positive': " Glad to help!"
+    },
+    'hi': {
+        'anger': "मैं आपकी हताशा समझता हूँ। ",
+        'fear': "चिंतित होना स्वाभाविक है। ",
+        'boredom': "मैं इसे संक्षेप में रखूँगा। ",
+        'confusion': "मैं इसे और स्पष्ट रूप से समझाता हूँ। ",
+        'sadness': "मुझे यह जानकर खेद है। ",
+        'negative': "यह सुनकर दुख हुआ। ",
+        'positive': " मदद करके खुशी हुई!"
+    },
+    'bn': {
+        'anger': "আমি আপনার হতাশা বুঝতে পারছি। ",
+        'fear': "চিন্তিত হওয়া স্বাভাবিক। ",
+        'boredom': "আমি সংক্ষেপে বলছি। ",
+        'confusion': "আমি আরও স্পষ্টভাবে বুঝিয়ে বলছি। ",
+        'sadness': "আমি দুঃখিত যে আপনি এর মধ্য দিয়ে যাচ্ছেন। ",
+        'negative': "শুনে খারাপ লাগল। ",
+        'positive': " সাহায্য করতে পেরে ভালো লাগল!"
+    },
+    'ta': {
+        'anger': "உங்கள் விரக்தியை நான் புரிந்துகொள்கிறேன். ",
+        'fear': "கவலைப்படுவது இயல்பு. ",
+        'boredom': "நான் சுருக்கமாக சொல்கிறேன். ",
+        'confusion': "நான் இன்னும் தெளிவாக விளக்குகிறேன். ",
+        'sadness': "நீங்கள் படும் கஷ்டத்திற்கு வருந்துகிறேன். ",
+        'negative': "அதை கேட்டு வருந்துகிறேன். ",
+        'positive': " உதவியதில் மகிழ்ச்சி!"
+    },
+    'te': {
+        'anger': "మీ నిరాశను నేను అర్థం చేసుకోగలను. ",
+        'fear': "ఆందోళన చెందడం సహజం. ",
+        'boredom': "నేను క్లుప్తంగా చెబుతాను. ",
+        'confusion': "నేను మరింత స్పష్టంగా వివరిస్తాను. ",
+        'sadness': "మీరు పడుతున్న ఇబ్బందికి చింతిస్తున్నాను. ",
+        'negative': "అది విన్నందుకు బాధగా ఉంది. ",
+        'positive': " సహాయం చేయడం ఆనందంగా ఉంది!"
+    },
+}
 
 class Chatbot:
-    def __init__(self):
+    """
+    FAQ chatbot answering from the knowledge base and the vaccination data.
+
+    Args:
+        translator (TranslationCache): Translates answers that have no
+            stored translation; a persistent Google Translate cache if None
+    """
+
+    def __init__(self, translator=None):
         self.vectorizer = TfidfVectorizer()
         self.patterns = []
         self.intent_map = []
         self.is_trained = False
         self.countries = []
-        self.context = {}  # Store last queried entity
+        self.country_matcher = CountryMatcher([])
+        self.protected_words = frozenset()  # never spell-corrected
+        self.data_version = None  # get_data_version() the country list was loaded at
+        self._data_checked_at = None  # time.monotonic() of the last version check
+        self._data_lock = threading.Lock()  # one reload at a time
+        # Everything above is shared by all users and only replaced whole;
+        # what a conversation remembers is kept per session
+        self.sessions = SessionStore()
+        self.translator = translator if translator is not None else TranslationCache()
         self._train()
         self._load_data()
 
     def _load_data(self):
+        """
+        Reload the country list if the ETL has written new data since.
+
+        The data version is read at most every DATA_CHECK_INTERVAL seconds.
+        """
+        now = time.monotonic()
+        if self._data_checked_at is not None and now - self._data_checked_at < DATA_CHECK_INTERVAL:
+            return
+        self._data_checked_at = now
         try:
-            self.countries = [c.lower() for c in get_all_countries()]
-            print(f"Loaded {len(self.countries)} countries for entity extraction.")
+            version = get_data_version()
+            if version == self.data_version:
+                return
+            with self._data_lock:
+                if version != self.data_version:
+                    self._reload_countries(version)
         except Exception as e:
             print(f"Error loading countries: {e}")
-            self.countries = []
+
+    def _reload_countries(self, version):
+        """Rebuild the country matcher, spell index and protected words from the database"""
+        # Everything is built into locals from the trained (never modified)
+        # spell index, then assigned; messages being answered meanwhile keep
+        # using complete old or new indexes, never a half-built one
+        countries = [c.lower() for c in get_all_countries()]
+        country_words = {word for country in countries for word in tokenize(country)}
+        spelling = self.base_spelling.with_words(
+            {word: 1 for word in country_words if word not in self.base_spelling}
+        )
+        country_matcher = CountryMatcher(countries)
+        protected_words = self.vocabulary | country_words
+
+        self.spelling, self.protected_words = spelling, protected_words
+        self.country_matcher, self.countries = country_matcher, countries
+        self.data_version = version
+        print(f"Loaded {len(self.countries)} countries for entity extraction.")
 
     def preprocess_input(self, text):
         """
         Preprocess and correct spelling mistakes in user input.
         Uses a conservative approach to avoid over-correction.
         """
+        return self.preprocess_inputs([text])[0]
+
+    def preprocess_inputs(self, texts):
+        """
+        Spell-correct a batch of messages, looking up each distinct word once.
+
+        Args:
+            texts (list of str): User messages
+
+        Returns:
+            list: The corrected messages, in the same order
+        """
         try:
-            # Split into words and check each
-            words = text.split()
-            corrected_words = []
-            
-            for word in words:
-                # Only try to correct alphabetic words (skip punctuation, numbers)
-                if word.isalpha() and len(word) > 2:
-                    word_blob = TextBlob(word.lower())
-                    corrected = str(word_blob.correct())
-                    
-                    # Only apply correction if it's different and reasonable
-                    if corrected != word.lower() and len(corrected) >= len(word) - 1:
-                        # Preserve original capitalization
-                        if word[0].isupper():
-                            corrected = corrected.capitalize()
-                        corrected_words.append(corrected)
-                        if corrected.lower() != word.lower():
-                            print(f"Spell check: '{word}' -> '{corrected}'")
-                    else:
-                        corrected_words.append(word)
-                else:
-                    corrected_words.append(word)
-            
-            return ' '.join(corrected_words)
+            # Only try to correct alphabetic words (skip punctuation, numbers)
+            # that aren't known domain words
+            candidates = {
+                word.lower() for text in texts for word in text.split()
+                if word.isalpha() and len(word) > 2 and word.lower() not in self.protected_words
+            }
+            corrections = {word: self.spelling.correct(word) for word in candidates}
         except Exception as e:
             print(f"Spell check error: {e}")
-            return text
+            return list(texts)
+        return [self._apply_corrections(text, corrections) for text in texts]
+
+    def _apply_corrections(self, text, corrections):
+        """Replace the words of text that have a correction"""
+        # Split into words and check each
+        words = text.split()
+        corrected_words = []
+
+        for word in words:
+            corrected = corrections.get(word.lower()) if word.isalpha() else None
+
+            # Only apply correction if it's different and reasonable
+            if corrected and corrected != word.lower() and len(corrected) >= len(word) - 1:
+                # Preserve original capitalization
+                if word[0].isupper():
+                    corrected = corrected.capitalize()
+                corrected_words.append(corrected)
+                print(f"Spell check: '{word}' -> '{corrected}'")
+            else:
+                corrected_words.append(word)
+
+        return ' '.join(corrected_words)
 
     def analyze_sentiment(self, text):
         """
@@ -107,46 +247,64 @@ class Chatbot:
 
     def _train(self):
         """
-        Train the TF-IDF vectorizer on the knowledge base patterns.
+        Train the TF-IDF vectorizer and the spell checker on the knowledge
+        base patterns.
         """
-        corpus = []
-        for item in KNOWLEDGE_BASE:
-            intent = item['intent']
-            for pattern in item['patterns']:
-                corpus.append(pattern)
-                self.patterns.append(pattern)
-                self.intent_map.append(intent)
+        self.knowledge = get_knowledge_index()
+        corpus = self.knowledge.patterns
+        self.patterns = list(corpus)
+        self.intent_map = list(self.knowledge.pattern_intents)
         
         # Fit the vectorizer
         self.tfidf_matrix = self.vectorizer.fit_transform(corpus)
+        self.retriever = PatternIndex(self.tfidf_matrix, self.intent_map)
+
+        # TextBlob's word list plus our own vocabulary, so domain words
+        # are known and are correction targets
+        self.base_spelling = SpellIndex.from_textblob(corpus)
+        self.spelling = self.base_spelling
+        self.vocabulary = self._protected_vocabulary()
+        self.protected_words = self.vocabulary
         self.is_trained = True
 
+    def _protected_vocabulary(self):
+        """
+        Words of the knowledge base patterns and responses, their
+        translations, the data keywords, DOMAIN_TERMS and the words of
+        country aliases ("USA" must not become "Us").
+
+        Returns:
+            frozenset: Lowercase words
+        """
+        texts = list(self.knowledge.patterns)
+        texts += [text for responses in self.knowledge.responses.values() for text in responses]
+        texts += [text for responses in self.knowledge.translated.values() for text in responses]
+        texts += [keyword for keywords in DATA_INTENTS.values() for keyword in keywords]
+        return (DOMAIN_TERMS | ALIAS_WORDS).union(word for text in texts for word in tokenize(text))
+
     def extract_entities(self, user_input):
         """
         Extract known entities (countries) from user input.
+
+        Whole words only, longest name first, aliases such as "USA" and
+        "UK" included; countries are returned lowercase in order of mention.
         """
-        found_entities = []
-        user_lower = user_input.lower()
-        
-        # Simple string matching for countries
-        # Sort countries by length (desc) to match "United States" before "United"
-        for country in sorted(self.countries, key=len, reverse=True):
-            if country in user_lower:
-                found_entities.append(country)
-                # Remove found country to avoid double matching substrings
-                user_lower = user_lower.replace(country, "")
-                
-        return found_entities
+        return self.country_matcher.find(user_input)
 
-    def get_db_response(self, intent, entities):
+    def get_db_response(self, intent, entities, state=None):
         """
         Generate a response based on database queries.
+
+        state is the ConversationState to take a missing country from and
+        to remember the answered one in; the default session's if None.
         """
         print(f"DEBUG: get_db_response intent={intent} entities={entities}")
+        if state is None:
+            state = self.sessions.get(DEFAULT_SESSION)
         if not entities:
             # Check context
-            if 'last_country' in self.context:
-                entities = [self.context['last_country']]
+            if state.last_country:
+                entities = [state.last_country]
             else:
                 if intent == 'country_stats':
                     return "Which country are you asking about?"
@@ -157,11 +315,8 @@ class Chatbot:
         
         try:
             if intent == 'country_stats':
-                df = get_latest_by_country(limit=1000) # Get all to find specific
-                # Filter in memory for now, or use specific query
-                # Better to use get_country_timeseries or specific query if we had one for single country latest
-                # Re-using get_latest_by_country efficiently
-                row = df[df['location'].str.lower() == country_name]
+                # Single-row lookup in the latest_by_country snapshot
+                row = get_latest_snapshot(country_name)
                 
                 if row.empty:
                     return f"I don't have data for {display_name}."
@@ -170,7 +325,7 @@ class Chatbot:
                 total = int(data['total_vaccinations']) if pd.notnull(data['total_vaccinations']) else 0
                 pct = data['pct_vaccinated'] if pd.notnull(data['pct_vaccinated']) else 0
                 
-                self.context['last_country'] = country_name
+                state.last_country = country_name
                 return f"In {data['location']}, {total:,} doses have been administered ({pct:.1f}% vaccinated)."
 
             elif intent == 'top_countries':
@@ -187,15 +342,66 @@ class Chatbot:
 
         return "I'm not sure how to answer that data question."
 
-    def get_response(self, user_input, lang='en', threshold=0.3):
+    def get_response(self, user_input, lang='en', threshold=0.3, session_id=None, state=None):
         """
         Get the best response for the user input.
         """
+        return self.get_responses(
+            [user_input], lang=lang, threshold=threshold, session_id=session_id, state=state
+        )[0]
+
+    def get_responses(self, user_inputs, lang='en', threshold=0.3, session_id=None, state=None):
+        """
+        Get the responses to a batch of messages, e.g. a replayed chat log.
+
+        Spell checking, the TF-IDF transform and the intent search run once
+        for the whole batch; the messages are then answered in order, so a
+        follow-up ("what about stats?") uses the country of an earlier
+        message in the batch, as it would if they were sent one by one.
+
+        Args:
+            user_inputs (list of str): Messages in the order they were sent
+            lang (str): Response language code
+            threshold (float): Minimum intent score for a knowledge base answer
+            session_id (hashable): Conversation the messages belong to; its
+                state is kept in self.sessions
+            state (ConversationState): The conversation's state, for callers
+                that keep it themselves (takes precedence over session_id)
+
+        Returns:
+            list: One response per message
+        """
         if not self.is_trained:
-            return "I am initializing, please wait a moment."
+            return ["I am initializing, please wait a moment."] * len(user_inputs)
+        if not user_inputs:
+            return []
+
+        if state is None:
+            state = self.sessions.get(DEFAULT_SESSION if session_id is None else session_id)
+
+        self._load_data()  # pick up countries from an ETL run since the last batch
+        corrected_inputs = self.preprocess_inputs(user_inputs)
+        matches = self.retriever.search_many(self.vectorizer.transform(corrected_inputs))
+        return [
+            self._respond(corrected_input, match[0] if match else (None, 0.0), lang, threshold, state)
+            for corrected_input, match in zip(corrected_inputs, matches)
+        ]
+
+    def _respond(self, corrected_input, match, lang, threshold, state):
+        """
+        Answer one spell-corrected message.
+
+        Args:
+            corrected_input (str): Message after preprocess_inputs()
+            match (tuple): Best (intent, score) from the pattern search
+            lang (str): Response language code
+            threshold (float): Minimum intent score for a knowledge base answer
+            state (ConversationState): The conversation's state
 
-        # 0. Spell check and sentiment analysis
-        corrected_input = self.preprocess_input(user_input)
+        Returns:
+            str: The response
+        """
+        # 0. Sentiment analysis
         sentiment = self.analyze_sentiment(corrected_input)
         emotion = self.detect_emotion_keywords(corrected_input)
 
@@ -203,81 +409,56 @@ class Chatbot:
         entities = self.extract_entities(corrected_input)
         user_lower = corrected_input.lower()
         
-        data_intents = {
-            'country_stats': ['how many', 'stats', 'vaccination', 'vaccinated', 'doses', 'status', 'rate', 'what about', 'how about'],
-            'top_countries': ['top', 'best', 'highest', 'most vaccinated', 'most vaccinations']
-        }
-
         # Check for top countries
-        if any(keyword in user_lower for keyword in data_intents['top_countries']):
-            return self.get_db_response('top_countries', [])
+        if any(keyword in user_lower for keyword in DATA_INTENTS['top_countries']):
+            return self.get_db_response('top_countries', [], state)
 
         # Check for country stats
-        if entities or ('last_country' in self.context and any(k in user_lower for k in ['what about', 'and'])):
+        if entities or (state.last_country and any(k in user_lower for k in ['what about', 'and'])):
              # If explicit data keywords present, use DB.
-             if any(keyword in user_lower for keyword in data_intents['country_stats']):
-                 return self.get_db_response('country_stats', entities)
+             if any(keyword in user_lower for keyword in DATA_INTENTS['country_stats']):
+                 return self.get_db_response('country_stats', entities, state)
 
         # 2. If emotion detected, prioritize emotional intents
         if emotion:
-            # Map emotions to their corresponding intent names
-            emotion_intent_map = {
-                'anger': 'feeling_angry',
-                'fear': 'feeling_scared',
-                'boredom': 'feeling_bored',
-                'confusion': 'feeling_confused',
-                'sadness': 'feeling_sad'
-            }
-            
-            target_intent = emotion_intent_map.get(emotion)
-            
-            if target_intent:
-                # Find the response for this emotional intent
-                for item in KNOWLEDGE_BASE:
-                    if item['intent'] == target_intent:
-                        response = random.choice(item['responses'])
-                        return self._add_empathy(response, sentiment, emotion)
+            responses = self.knowledge.emotion_responses.get(emotion)
+            if responses:
+                response = random.choice(responses)
+                return self._add_empathy(response, sentiment, emotion)
         
         # 3. Fallback to TF-IDF for other intents
-        user_tfidf = self.vectorizer.transform([corrected_input])
-        similarities = cosine_similarity(user_tfidf, self.tfidf_matrix).flatten()
-        best_idx = np.argmax(similarities)
-        best_score = similarities[best_idx]
+        matched_intent, best_score = match
         
         if best_score < threshold:
             # If low score but we have an entity, maybe try stats?
             if entities:
-                 response = self.get_db_response('country_stats', entities)
+                 response = self.get_db_response('country_stats', entities, state)
             else:
                 response = "I'm not sure I understand. I am trained to answer questions about COVID-19, vaccines, and symptoms. Could you rephrase that?"
         else:
-            matched_intent = self.intent_map[best_idx]
-            
             # Find response for intent
             response = None
             
             # 1. Try Dictionary Translation First (Fast & Accurate for static content)
-            if lang != 'en' and lang in KNOWLEDGE_BASE_TRANSLATIONS:
-                if matched_intent in KNOWLEDGE_BASE_TRANSLATIONS[lang]:
-                    response = random.choice(KNOWLEDGE_BASE_TRANSLATIONS[lang][matched_intent])
+            if lang != 'en':
+                translated = self.knowledge.translations.get(lang, {}).get(matched_intent)
+                if translated:
+                    response = random.choice(translated)
             
             # 2. Fallback to English Logic (for dynamic data or missing translations)
             if not response:
-                for item in KNOWLEDGE_BASE:
-                    if item['intent'] == matched_intent:
-                        response = random.choice(item['responses'])
-                        break
+                responses = self.knowledge.responses.get(matched_intent)
+                if responses:
+                    response = random.choice(responses)
             
             if not response:
                 response = "I'm having trouble retrieving the answer right now."
 
-            # 3. If response is still in English but user wants another language, use Deep Translator
-            # (This handles dynamic data responses and intents not in our dictionary)
+            # 3. If response is still in English but user wants another language, use machine translation
+            # (This handles intents not in our dictionary; repeated answers come from the cache)
             if lang != 'en' and response and not self._is_response_translated(response, lang):
                 try:
-                    # Use Google Translator for dynamic translation
-                    translator = GoogleTranslator(source='auto', target=lang)
-                    response = translator.translate(response)
+                    response = self.translator.translate(response, lang)
                 except Exception as e:
                     print(f"Translation error: {e}")
                     # Fallback: append a small note in English if translation fails
@@ -288,69 +469,14 @@ class Chatbot:
 
     def _is_response_translated(self, response, lang):
         """Helper to check if response came from our dictionary"""
-        if lang not in KNOWLEDGE_BASE_TRANSLATIONS:
-            return False
-        # Check if this response string exists in any of the intent lists for this language
-        for intent_responses in KNOWLEDGE_BASE_TRANSLATIONS[lang].values():
-            if response in intent_responses:
-                return True
-        return False
+        return self.knowledge.is_translated(response, lang)
 
     def _add_empathy(self, response, sentiment, emotion=None, lang='en'):
         """
         Add empathetic tone to response based on user's sentiment and detected emotion.
         """
-        # Empathy translations
-        empathy_map = {
-            'en': {
-                'anger': "I understand your frustration. ",
-                'fear': "It's natural to feel worried. Let me help ease your concerns. ",
-                'boredom': "I'll keep this brief. ",
-                'confusion': "Let me explain this more clearly. ",
-                'sadness': "I'm sorry you're going through this. ",
-                'negative': "I'm sorry to hear you're feeling that way. ",
-                'positive': " Glad to help!"
-            },
-            'hi': {
-                'anger': "मैं आपकी हताशा समझता हूँ। ",
-                'fear': "चिंतित होना स्वाभाविक है। ",
-                'boredom': "मैं इसे संक्षेप में रखूँगा। ",
-                'confusion': "मैं इसे और स्पष्ट रूप से समझाता हूँ। ",
-                'sadness': "मुझे यह जानकर खेद है। ",
-                'negative': "यह सुनकर दुख हुआ। ",
-                'positive': " मदद करके खुशी हुई!"
-            },
-            'bn': {
-                'anger': "আমি আপনার হতাশা বুঝতে পারছি। ",
-                'fear': "চিন্তিত হওয়া স্বাভাবিক। ",
-                'boredom': "আমি সংক্ষেপে বলছি। ",
-                'confusion': "আমি আরও স্পষ্টভাবে বুঝিয়ে বলছি। ",
-                'sadness': "আমি দুঃখিত যে আপনি এর মধ্য দিয়ে যাচ্ছেন। ",
-                'negative': "শুনে খারাপ লাগল। ",
-                'positive': " সাহায্য করতে পেরে ভালো লাগল!"
-            },
-            'ta': {
-                'anger': "உங்கள் விரக்தியை நான் புரிந்துகொள்கிறேன். ",
-                'fear': "கவலைப்படுவது இயல்பு. ",
-                'boredom': "நான் சுருக்கமாக சொல்கிறேன். ",
-                'confusion': "நான் இன்னும் தெளிவாக விளக்குகிறேன். ",
-                'sadness': "நீங்கள் படும் கஷ்டத்திற்கு வருந்துகிறேன். ",
-                'negative': "அதை கேட்டு வருந்துகிறேன். ",
-                'positive': " உதவியதில் மகிழ்ச்சி!"
-            },
-            'te': {
-                'anger': "మీ నిరాశను నేను అర్థం చేసుకోగలను. ",
-                'fear': "ఆందోళన చెందడం సహజం. ",
-                'boredom': "నేను క్లుప్తంగా చెబుతాను. ",
-                'confusion': "నేను మరింత స్పష్టంగా వివరిస్తాను. ",
-                'sadness': "మీరు పడుతున్న ఇబ్బందికి చింతిస్తున్నాను. ",
-                'negative': "అది విన్నందుకు బాధగా ఉంది. ",
-                'positive': " సహాయం చేయడం ఆనందంగా ఉంది!"
-            },
-        }
-
         # Default to English if lang not found
-        current_empathy = empathy_map.get(lang, empathy_map['en'])
+        current_empathy = EMPATHY_PHRASES.get(lang, EMPATHY_PHRASES['en'])
 
         # If specific emotion keyword detected, prioritize that
         if emotion:
@@ -375,8 +501,26 @@ class Chatbot:
         else:
             return response
 
-# Singleton instance
-chatbot_instance = Chatbot()
+# Shared instance, built on first use: training the vectorizer and reading
+# the country list is too slow to do at import time
+_chatbot_instance = None
+_chatbot_lock = threading.Lock()
+
+def get_chatbot():
+    """
+    Get the process-wide Chatbot, creating it on first call.
+
+    Thread-safe: concurrent first calls build a single instance.
+
+    Returns:
+        Chatbot: The shared instance
+    """
+    global _chatbot_instance
+    if _chatbot_instance is None:
+        with _chatbot_lock:
+            if _chatbot_instance is None:
+                _chatbot_instance = Chatbot()
+    return _chatbot_instance
 
-def get_chatbot_response(user_input, lang='en'):
-    return chatbot_instance.get_response(user_input, lang=lang)
+def get_chatbot_response(user_input, lang='en', session_id=None):
+    return get_chatbot().get_response(user_input, lang=lang, session_id=session_id)
@@ -1,89 +1,216 @@
 # src/clean.py
+import numpy as np
 import pandas as pd
 
+# Columns kept from the raw OWID file
+CLEAN_COLUMNS = [
+    "location", "date", "total_vaccinations", "people_vaccinated",
+    "people_fully_vaccinated", "daily_vaccinations", "population",
+    "new_cases_smoothed", "new_deaths_smoothed",
+    "new_cases_smoothed_per_million", "new_deaths_smoothed_per_million"
+]
+
+# Vaccination and case/death columns coerced to numeric
+NUMERIC_COLUMNS = [
+    "total_vaccinations", "people_vaccinated",
+    "people_fully_vaccinated", "daily_vaccinations",
+    "new_cases_smoothed", "new_deaths_smoothed",
+    "new_cases_smoothed_per_million", "new_deaths_smoothed_per_million"
+]
+
+# Declared dtypes for reading CLEAN_COLUMNS from the OWID CSV: counts as
+# nullable integers, smoothed rates as float32, location dictionary-encoded
+CLEAN_DTYPES = {
+    "location": "category",
+    "total_vaccinations": "Int64",
+    "people_vaccinated": "Int64",
+    "people_fully_vaccinated": "Int64",
+    "population": "Int64",
+    "daily_vaccinations": "float64",
+    "new_cases_smoothed": "float32",
+    "new_deaths_smoothed": "float32",
+    "new_cases_smoothed_per_million": "float32",
+    "new_deaths_smoothed_per_million": "float32",
+}
+
+ROLLING_WINDOW = 7
+
+# Days before each location's high-water mark that an incremental update
+# recleans and compares with the stored rows, so revisions OWID publishes
+# for recent dates are loaded too
+REVISION_LOOKBACK_DAYS = 28
+
+# OWID locations that aggregate other locations (world, continents,
+# income groups, UK nations); excluded from global totals to avoid
+# counting the same people twice
+AGGREGATE_LOCATIONS = frozenset({
+    "World", "World excl. China", "World excl. China and South Korea",
+    "World excl. China, South Korea, Japan and Singapore",
+    "Africa", "Asia", "Asia excl. China", "Europe", "European Union",
+    "European Union (27)", "North America", "Oceania", "South America",
+    "High income", "Upper middle income", "Lower middle income", "Low income",
+    "High-income countries", "Upper-middle-income countries",
+    "Lower-middle-income countries", "Low-income countries",
+    "England", "Scotland", "Wales", "Northern Ireland",
+    "International", "Summer Olympics 2020", "Winter Olympics 2022",
+})
+
 def clean_vax(df):
     """
     Clean and transform vaccination data.
-    
+
     Performs the following transformations:
     - Filters to essential columns
     - Ensures numeric types for vaccination metrics
     - Fills missing daily_vaccinations by differencing total_vaccinations
     - Computes 7-day rolling averages per country
     - Calculates percentage of population vaccinated
-    
+
+    All per-country steps run as grouped vectorized operations
+    (diff, rolling, first) rather than a Python callback per country.
+
     Args:
         df (pd.DataFrame): Raw vaccination data
-    
+
     Returns:
         pd.DataFrame: Cleaned and transformed vaccination data
     """
-    # Define required columns
-    cols = [
-        "location", "date", "total_vaccinations", "people_vaccinated",
-        "people_fully_vaccinated", "daily_vaccinations", "population",
-        "new_cases_smoothed", "new_deaths_smoothed", 
-        "new_cases_smoothed_per_million", "new_deaths_smoothed_per_million"
-    ]
-    
     # Add missing columns as NA if they don't exist
-    for c in cols:
+    for c in CLEAN_COLUMNS:
         if c not in df.columns:
             df[c] = pd.NA
-    
+
     # Filter to required columns and copy to avoid SettingWithCopyWarning
-    df = df[cols].copy()
-    
+    df = df[CLEAN_COLUMNS].copy()
+
+    # Rows without a location cannot be grouped into a country series
+    df = df[df["location"].notna()]
+
     # Sort by location and date for proper time series operations
     df = df.sort_values(["location", "date"])
-    
+
     # Convert vaccination and case/death columns to numeric
-    numeric_cols = [
-        "total_vaccinations", "people_vaccinated", 
-        "people_fully_vaccinated", "daily_vaccinations",
-        "new_cases_smoothed", "new_deaths_smoothed",
-        "new_cases_smoothed_per_million", "new_deaths_smoothed_per_million"
-    ]
-    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
-    
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].apply(pd.to_numeric, errors="coerce")
+
     # Ensure population is numeric
     df["population"] = pd.to_numeric(df["population"], errors="coerce")
-    
-    def fill_group(g):
-        """Process each country group separately"""
-        # Fill missing daily_vaccinations by differencing total_vaccinations
-        if g["daily_vaccinations"].isna().any():
-            daily_diff = g["total_vaccinations"].diff().fillna(0)
-            # Only use positive differences (sometimes data corrections cause negatives)
-            daily_diff = daily_diff.clip(lower=0)
-            g["daily_vaccinations"] = g["daily_vaccinations"].fillna(daily_diff)
-        
-        # Ensure daily_vaccinations is non-negative
-        g["daily_vaccinations"] = g["daily_vaccinations"].clip(lower=0)
-        
-        # Compute 7-day rolling average
-        g["daily_vaccinations_7d"] = g["daily_vaccinations"].rolling(
-            window=7, min_periods=1
-        ).mean()
-        
-        # Calculate percentage of population vaccinated
-        if g["population"].notna().any():
-            pop = g["population"].ffill().bfill().iloc[0]
-            g["pct_vaccinated"] = (g["people_vaccinated"] / pop) * 100
-            g["pct_fully_vaccinated"] = (g["people_fully_vaccinated"] / pop) * 100
-        else:
-            g["pct_vaccinated"] = pd.NA
-            g["pct_fully_vaccinated"] = pd.NA
-        
-        return g
-    
-    # Apply transformations per country
-    df = df.groupby("location", group_keys=False).apply(fill_group)
-    
+
+    # Work on a positional index so grouped results align even if the
+    # caller's index has duplicates; the original labels are restored below
+    original_index = df.index
+    df = df.reset_index(drop=True)
+    grouped = df.groupby("location", sort=False, observed=True)
+
+    # Fill missing daily_vaccinations by differencing total_vaccinations.
+    # Only use positive differences (sometimes data corrections cause negatives)
+    daily_diff = grouped["total_vaccinations"].diff().astype("float64").fillna(0).clip(lower=0)
+    df["daily_vaccinations"] = df["daily_vaccinations"].astype("float64").fillna(daily_diff)
+
+    # Ensure daily_vaccinations is non-negative
+    df["daily_vaccinations"] = df["daily_vaccinations"].clip(lower=0)
+
+    # Compute 7-day rolling average within each country
+    rolling = grouped["daily_vaccinations"].rolling(
+        window=ROLLING_WINDOW, min_periods=1
+    ).mean()
+    df["daily_vaccinations_7d"] = rolling.droplevel(0)
+
+    # Calculate percentage of population vaccinated, using the first
+    # reported population of each country
+    pop = grouped["population"].transform("first").astype("float64")
+    df["pct_vaccinated"] = (df["people_vaccinated"].astype("float64") / pop) * 100
+    df["pct_fully_vaccinated"] = (df["people_fully_vaccinated"].astype("float64") / pop) * 100
+
+    df.index = original_index
+
     print(f"Cleaned data: {len(df):,} records across {df['location'].nunique()} locations")
-    
+
     return df
 
+def clean_vax_incremental(df, high_water_marks, stored=None, lookback_days=REVISION_LOOKBACK_DAYS):
+    """
+    Clean only the rows that are new or changed since the last load.
+
+    Rows newer than each location's high-water mark are always returned.
+    When stored holds the loaded rows of the last lookback_days before the
+    marks (see storage.get_recently_loaded), those dates are recleaned too
+    and compared with it: a location whose recleaned rows differ from the
+    stored ones (a revised value, or a date added upstream) is returned
+    from its earliest differing date, so upserting the result rewrites it
+    from there. Older revisions, and dates removed upstream, are only
+    picked up by a full rebuild.
+
+    For locations that already have data loaded, the last ROLLING_WINDOW
+    rows before the recleaned dates are cleaned along with them as a
+    warm-up: six rows feed the 7-day rolling average of the first
+    recleaned row, and one more gives the differencing step its previous
+    total. Warm-up rows are dropped from the result. Locations without a
+    high-water mark are cleaned in full.
+
+    Args:
+        df (pd.DataFrame): Raw vaccination data
+        high_water_marks (dict): Mapping of location -> last loaded date
+        stored (pd.DataFrame, optional): Stored rows of the lookback window
+        lookback_days (int): Days before the marks compared with stored
+
+    Returns:
+        pd.DataFrame: Cleaned rows with dates after the high-water marks,
+            plus the revised rows
+    """
+    df = df[df["location"].notna()].sort_values(["location", "date"])
+
+    location = df["location"].astype(str)
+    marks = pd.to_datetime(location.map(high_water_marks))
+    starts = marks if stored is None else marks - pd.Timedelta(days=lookback_days)
+    is_new = marks.isna() | (df["date"] > starts)
+
+    # Keep the trailing warm-up rows of locations that received new data
+    has_new = is_new.groupby(location).transform("any")
+    old = df[~is_new & has_new]
+    rank_from_end = old.groupby(old["location"].astype(str)).cumcount(ascending=False)
+    warmup = pd.Series(False, index=df.index)
+    warmup.loc[rank_from_end.index[rank_from_end < ROLLING_WINDOW]] = True
+
+    cleaned = clean_vax(df[is_new | warmup])
+    cleaned = cleaned[cleaned.index.isin(df.index[is_new])]
+
+    if stored is not None:
+        cleaned_marks = pd.to_datetime(cleaned["location"].astype(str).map(high_water_marks))
+        loaded = cleaned["date"] <= cleaned_marks
+        revised = _revised_since(cleaned[loaded], stored)
+        revised_from = pd.to_datetime(cleaned["location"].astype(str).map(revised))
+        cleaned = cleaned[~loaded | (cleaned["date"] >= revised_from)]
+        print(f"Incremental update: {len(revised)} locations with revised dates")
+    print(f"Incremental update: {len(cleaned):,} new or revised records")
+
+    return cleaned
+
+def _revised_since(recleaned, stored):
+    """
+    Earliest date per location at which recleaned rows differ from stored ones.
+
+    Values are compared as floats with a relative tolerance, since a
+    rolling average started at a different row can differ in the last bits.
+
+    Returns:
+        dict: location -> pd.Timestamp, for locations with a difference only
+    """
+    keys = ["location", "date"]
+    columns = [c for c in recleaned.columns if c in stored.columns and c not in keys]
+    merged = recleaned[keys + columns].astype({"location": str}).merge(
+        stored[keys + columns].astype({"location": str}),
+        on=keys, how="left", suffixes=("", "_stored"), indicator=True
+    )
+
+    differs = merged["_merge"] != "both"
+    for column in columns:
+        new = merged[column].astype("float64").to_numpy()
+        old = merged[f"{column}_stored"].astype("float64").to_numpy()
+        same = np.isclose(new, old, rtol=1e-9, atol=0, equal_nan=True)
+        differs |= ~same
+
+    return merged[differs].groupby("location")["date"].min().to_dict()
+
 if __name__ == "__main__":
     from etl import load_data
     df = load_data()
@@ -0,0 +1,96 @@
+# src/conversation.py
+"""
+Per-conversation state for the chatbot.
+
+The Chatbot (vectorizer, indexes, knowledge base) is built once and shared
+by every user, so it must not hold anything that belongs to one
+conversation. What a conversation remembers between messages lives in a
+ConversationState instead, either passed in by the caller or looked up by
+session id in a SessionStore that forgets idle and least recently used
+sessions, so memory stays bounded however many users come and go.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+MAX_SESSIONS = 10_000
+SESSION_TTL_SECONDS = 3600
+
+class ConversationState:
+    """
+    What the chatbot remembers about one conversation.
+
+    Args:
+        last_country (str): Country of the last stats answer, used by
+            follow-ups such as "what about the vaccination rate?"
+    """
+    __slots__ = ("last_country",)
+
+    def __init__(self, last_country=None):
+        self.last_country = last_country
+
+    def __repr__(self):
+        return f"ConversationState(last_country={self.last_country!r})"
+
+class SessionStore:
+    """
+    Thread-safe map of session id -> ConversationState with LRU and TTL eviction.
+
+    Args:
+        max_sessions (int): Most sessions kept; the least recently used
+            is dropped to make room for a new one
+        ttl_seconds (float): Sessions idle for longer are dropped
+        clock (callable): Returns the current time in seconds
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl_seconds=SESSION_TTL_SECONDS, clock=time.monotonic):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._sessions = OrderedDict()  # session id -> (state, last used), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """
+        The state of a session, started afresh if unknown or expired.
+
+        Args:
+            session_id (hashable): Identifies the conversation
+
+        Returns:
+            ConversationState: The session's state, marked as just used
+        """
+        now = self.clock()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._sessions.pop(session_id, None)
+            state = entry[0] if entry else ConversationState()
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+            self._sessions[session_id] = (state, now)
+            return state
+
+    def discard(self, session_id):
+        """Forget a session, e.g. when its user resets the chat"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _evict_expired(self, now):
+        # Entries are in order of last use, so the expired ones are in front
+        while self._sessions:
+            _, last_used = next(iter(self._sessions.values()))
+            if now - last_used <= self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+
+    def __contains__(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry is not None and self.clock() - entry[1] <= self.ttl_seconds
+
+    def __len__(self):
+        with self._lock:
+            self._evict_expired(self.clock())
+            return len(self._sessions)
@@ -0,0 +1,274 @@
+# src/download.py
+"""
+HTTP file downloads with conditional requests, resume and atomic replacement.
+
+Validators (ETag / Last-Modified) and the SHA-256 of the last download are
+stored in a JSON file next to the downloaded file, so an unchanged upstream
+costs a single 304 round-trip; the validators are only sent while the file
+still hashes to the stored digest. Bodies are streamed in chunks to a ".part" file that is only
+swapped into place once complete and verified, so the destination is never
+left half-written. An interrupted transfer is resumed from the partial file
+with an HTTP Range request, and failed attempts are retried with
+exponential backoff.
+"""
+import base64
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+import requests
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+RETRIES = 5
+BACKOFF = 1.0  # seconds, doubled after every failed attempt
+MAX_BACKOFF = 60.0
+
+# Server responses worth retrying
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+class DownloadError(IOError):
+    """Raised when a transfer is incomplete or fails verification"""
+
+def metadata_path(dest):
+    """Path of the metadata file stored next to a downloaded file"""
+    return dest + ".meta.json"
+
+def partial_path(dest):
+    """Path of the partial file an interrupted download is resumed from"""
+    return dest + ".part"
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _remove(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.unlink(path)
+
+def read_metadata(dest):
+    """
+    Load the validators recorded for a downloaded file.
+
+    Metadata is ignored when the file is missing or its size no longer
+    matches, so a file that was changed or truncated is fetched again.
+
+    Returns:
+        dict: Stored metadata, empty if there is nothing usable
+    """
+    meta = _read_json(metadata_path(dest))
+    if not meta or not os.path.exists(dest) or os.path.getsize(dest) != meta.get("size"):
+        return {}
+    return meta
+
+def write_metadata(dest, meta):
+    """Atomically write the metadata file for a downloaded file"""
+    _write_json(metadata_path(dest), meta)
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file, read in chunks"""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def verify_file(dest):
+    """
+    Check a downloaded file against the SHA-256 recorded when it was written.
+
+    Returns:
+        bool or None: True if dest still hashes to its recorded digest;
+            False if it was modified, truncated or corrupted since; None if
+            no digest was recorded for it (a file cached before downloads
+            were verified, or copied in by hand)
+    """
+    recorded = _read_json(metadata_path(dest)).get("sha256")
+    if not recorded:
+        return None
+    return os.path.exists(dest) and file_sha256(dest) == recorded
+
+def _expected_sha256(headers, status_code):
+    """
+    SHA-256 of the full representation advertised by the server, if any.
+
+    Understands Repr-Digest (RFC 9530) and, for complete 200 responses, the
+    older Digest header (RFC 3230).
+
+    Returns:
+        str or None: Hex digest
+    """
+    fields = [headers.get("Repr-Digest", "")]
+    if status_code == 200:
+        fields.append(headers.get("Digest", ""))
+
+    for field in fields:
+        for item in field.split(","):
+            algorithm, _, value = item.strip().partition("=")
+            if algorithm.lower() == "sha-256" and value:
+                try:
+                    return base64.b64decode(value.strip(":")).hex()
+                except ValueError:
+                    return None
+    return None
+
+def _received_bytes(response, written):
+    """Bytes received on the wire, which Content-Length refers to"""
+    encoding = response.headers.get("Content-Encoding", "identity").lower()
+    if encoding == "identity":
+        return written
+    # With gzip transfer the body is decoded while streaming, so count the
+    # compressed bytes read from the connection instead
+    return response.raw.tell()
+
+def _fetch_once(url, dest, timeout, http, compress):
+    """Single download attempt; see fetch_file"""
+    meta = read_metadata(dest)
+    if meta and not verify_file(dest):
+        # A corrupted copy must not be revalidated (a 304 would keep it)
+        print(f"{dest} does not match its recorded SHA-256; downloading it again")
+        meta = {}
+    part = partial_path(dest)
+    part_meta_path = part + ".json"
+    part_meta = _read_json(part_meta_path)
+
+    # Only resume a partial file of this URL whose version is known
+    offset = 0
+    if os.path.exists(part) and part_meta.get("url") == url and part_meta.get("validator"):
+        offset = os.path.getsize(part)
+    else:
+        _remove(part, part_meta_path)
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    # Byte offsets refer to the unencoded file, so only an identity transfer
+    # can be resumed; gzip is used when asked for and never when resuming
+    headers["Accept-Encoding"] = "gzip" if compress and not offset else "identity"
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = part_meta["validator"]
+
+    with http.get(url, headers=headers, stream=True, timeout=timeout) as r:
+        if r.status_code == 304:
+            _remove(part, part_meta_path)
+            return False
+        if r.status_code == 416:
+            _remove(part, part_meta_path)
+            raise DownloadError(f"Cannot resume {url} at byte {offset}; restarting")
+        if r.status_code in RETRY_STATUS:
+            raise DownloadError(f"Server returned {r.status_code} for {url}")
+        r.raise_for_status()
+
+        resumed = r.status_code == 206
+        if resumed:
+            content_range = r.headers.get("Content-Range", "")
+            if not content_range.startswith(f"bytes {offset}-"):
+                _remove(part, part_meta_path)
+                raise DownloadError(f"Unexpected Content-Range '{content_range}' for {url}")
+        else:
+            offset = 0
+
+        encoded = r.headers.get("Content-Encoding", "identity").lower() != "identity"
+        validator = r.headers.get("ETag") or r.headers.get("Last-Modified")
+        if encoded or not validator:
+            # Decoded or unversioned bodies cannot be resumed safely
+            _remove(part_meta_path)
+        else:
+            _write_json(part_meta_path, {"url": url, "validator": validator})
+
+        sha = hashlib.sha256()
+        if resumed:
+            with open(part, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    sha.update(chunk)
+
+        written = 0
+        try:
+            with open(part, "ab" if resumed else "wb") as f:
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                    sha.update(chunk)
+                    written += len(chunk)
+        except BaseException:
+            if encoded or not validator:
+                _remove(part)
+            raise
+
+        expected = r.headers.get("Content-Length")
+        if expected is not None and int(expected) != _received_bytes(r, written):
+            raise DownloadError(
+                f"Incomplete download of {url}: expected {expected} bytes, "
+                f"received {_received_bytes(r, written)}"
+            )
+
+        digest = sha.hexdigest()
+        expected_digest = None if encoded else _expected_sha256(r.headers, r.status_code)
+        if expected_digest and expected_digest != digest:
+            _remove(part, part_meta_path)
+            raise DownloadError(f"SHA-256 mismatch for {url}: expected {expected_digest}, got {digest}")
+
+        os.replace(part, dest)
+        _remove(part_meta_path)
+
+    write_metadata(dest, {
+        "url": url,
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "size": offset + written,
+        "sha256": digest,
+        "downloaded_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    return True
+
+def fetch_file(url, dest, timeout=30, session=None, retries=RETRIES, backoff=BACKOFF, compress=False):
+    """
+    Download a URL to a file unless the copy on disk is still current.
+
+    Sends If-None-Match / If-Modified-Since from the stored metadata (when
+    dest still matches its recorded SHA-256) and streams the body to a partial file next to dest. A transfer that
+    breaks off is retried with exponential backoff and resumed from the
+    partial file with a Range request (If-Range guards against upstream
+    changing in between). The completed file is checked against
+    Content-Length and, when the server advertises one, its SHA-256 digest,
+    then atomically replaces dest.
+
+    Args:
+        url (str): URL to download
+        dest (str): Destination file path
+        timeout (float): Connect/read timeout in seconds
+        session (requests.Session, optional): Session to reuse
+        retries (int): Retries after the first failed attempt
+        backoff (float): Delay before the first retry, doubled each time
+        compress (bool): Accept a gzip-encoded transfer. Smaller on the
+            wire, but a transfer that breaks off restarts from the
+            beginning, since it cannot be resumed
+
+    Returns:
+        bool: True if a new copy was downloaded, False if upstream was unchanged
+    """
+    http = session or requests
+
+    for attempt in range(retries + 1):
+        try:
+            return _fetch_once(url, dest, timeout, http, compress)
+        except (requests.ConnectionError, requests.Timeout,
+                requests.exceptions.ChunkedEncodingError, DownloadError) as e:
+            if attempt == retries:
+                raise
+            delay = min(backoff * 2 ** attempt, MAX_BACKOFF)
+            print(f"Download attempt {attempt + 1} failed ({e}); retrying in {delay:.0f}s")
+            time.sleep(delay)
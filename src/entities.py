@@ -0,0 +1,129 @@
+# src/entities.py
+"""
+Country name matching for the chatbot.
+
+Country names are stored in a trie keyed by word, so a message is scanned
+once, word by word, instead of once per country. Matches only cover whole
+words ("oman" is not found in "woman") and the longest name wins ("niger"
+is not found in "nigeria", "guinea" not in "papua new guinea").
+
+Abbreviations are matched as written rather than word by word: lowercase
+"us" is an ordinary word ("tell us about vaccines"), and "u.s." would be
+the words "u" and "s".
+"""
+import re
+
+from src.spelling import tokenize
+
+# Common short forms, matched only if the country they stand for is known
+COUNTRY_ALIASES = {
+    "britain": "united kingdom",
+    "great britain": "united kingdom",
+    "ivory coast": "cote d'ivoire",
+    "czech republic": "czechia",
+    "burma": "myanmar",
+    "holland": "netherlands",
+}
+
+# Abbreviations of countries; the dotted forms match in any case, the
+# others only in capitals
+COUNTRY_ABBREVIATIONS = {
+    "US": "united states",
+    "USA": "united states",
+    "U.S.": "united states",
+    "U.S.A.": "united states",
+    "UK": "united kingdom",
+    "U.K.": "united kingdom",
+    "UAE": "united arab emirates",
+    "DRC": "democratic republic of congo",
+}
+
+# Abbreviations that are also words, read as the word in a message written in capitals
+WORD_ABBREVIATIONS = {"US"}
+
+# Words of the aliases and abbreviations, which spell correction must leave alone
+ALIAS_WORDS = {word for alias in [*COUNTRY_ALIASES, *COUNTRY_ABBREVIATIONS] for word in tokenize(alias)}
+
+_END = ""  # trie key holding the country a path of words spells (never a word)
+
+class CountryMatcher:
+    """
+    Finds country names and aliases in text.
+
+    Args:
+        countries (iterable of str): Country names; matches are reported
+            with their spelling here
+        aliases (dict): Lowercase alias -> lowercase country name
+        abbreviations (dict): Abbreviation as written -> lowercase country name
+    """
+
+    def __init__(self, countries, aliases=COUNTRY_ALIASES, abbreviations=COUNTRY_ABBREVIATIONS):
+        self.trie = {}
+        by_lower = {country.lower(): country for country in countries}
+        names = dict(by_lower)
+        names.update({
+            alias: by_lower[target] for alias, target in aliases.items()
+            if target in by_lower and alias not in by_lower
+        })
+        for name, country in names.items():
+            words = tokenize(name)
+            if not words:
+                continue
+            node = self.trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node[_END] = country
+
+        # Abbreviations are replaced by the name they stand for before the
+        # word scan, so they are found in order of mention like any name
+        self.abbreviations = {
+            abbreviation.upper(): target for abbreviation, target in abbreviations.items()
+            if target in by_lower
+        }
+        patterns = [
+            f"(?i:{re.escape(abbreviation)})" if "." in abbreviation else re.escape(abbreviation)
+            for abbreviation in sorted(self.abbreviations, key=len, reverse=True)
+        ]
+        self._abbreviation_re = (
+            re.compile(rf"(?<![\w.])(?:{'|'.join(patterns)})(?!\w)") if patterns else None
+        )
+
+    def _expand_abbreviations(self, text):
+        """text with each abbreviation replaced by its country name"""
+        if self._abbreviation_re is None:
+            return text
+        shouting = not any(c.islower() for c in text)
+
+        def expand(match):
+            abbreviation = match.group()
+            if shouting and abbreviation in WORD_ABBREVIATIONS:
+                return abbreviation
+            return f" {self.abbreviations[abbreviation.upper()]} "
+
+        return self._abbreviation_re.sub(expand, text)
+
+    def find(self, text):
+        """
+        Countries mentioned in text.
+
+        Returns:
+            list: Country names in order of first mention, without repeats
+        """
+        words = tokenize(self._expand_abbreviations(text))
+        found = []
+        i = 0
+        while i < len(words):
+            node, match, end = self.trie, None, i
+            for j in range(i, len(words)):
+                node = node.get(words[j])
+                if node is None:
+                    break
+                if _END in node:
+                    match, end = node[_END], j + 1
+            if match is None:
+                i += 1
+                continue
+            if match not in found:
+                found.append(match)
+            i = end
+        return found
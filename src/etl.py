@@ -1,48 +1,208 @@
 # src/etl.py
+import csv
 import os
-import time
 import pandas as pd
 import requests
 
+from src.download import fetch_file, verify_file
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # the Parquet cache is optional; fall back to parsing the CSV
+    pa = pq = None
+
 OWID_URL = "https://raw.githubusercontent.com/owid/covid-19-data/master/public/data/owid-covid-data.csv"
 DATA_DIR = "data"
 CSV_PATH = os.path.join(DATA_DIR, "owid-covid-data.csv")
-MAX_AGE = 24 * 3600  # seconds (24 hours)
+PARQUET_PATH = os.path.join(DATA_DIR, "owid-covid-data.parquet")
+
+# Parquet schema metadata key holding the mtime/size of the CSV it was built from
+CACHE_KEY_FIELD = b"owid_csv_key"
+
+# Default CSV engine. "pyarrow" parses faster but peaks at several times the
+# memory of the C engine (see benchmarks/bench_csv_load.py)
+CSV_ENGINE = "c"
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
 def download_csv():
     """
     Download the OWID vaccination CSV file.
-    Uses caching: skips download if file exists and is less than 24 hours old.
+    Uses caching: the cached copy is revalidated with a conditional request
+    (ETag / Last-Modified) and the body is only transferred when upstream
+    changed. If upstream cannot be reached, the cached copy is used unless
+    it no longer matches the SHA-256 recorded when it was downloaded; a
+    copy without a recorded SHA-256 is used with a warning.
     
     Returns:
         str: Path to the downloaded CSV file
     """
-    if os.path.exists(CSV_PATH) and (time.time() - os.path.getmtime(CSV_PATH)) < MAX_AGE:
-        print("Using cached CSV")
+    print(f"Checking {OWID_URL} for updates...")
+    try:
+        updated = fetch_file(OWID_URL, CSV_PATH)
+    except (requests.RequestException, OSError) as e:
+        if not os.path.exists(CSV_PATH):
+            raise
+        verified = verify_file(CSV_PATH)
+        if verified is False:
+            raise IOError(f"Could not download CSV ({e}) and the cached {CSV_PATH} was modified "
+                          f"or corrupted: it no longer matches the SHA-256 recorded when it was downloaded") from e
+        if verified is None:
+            print(f"Could not download CSV ({e}); using cached CSV, which has no recorded SHA-256 "
+                  f"to verify it against")
+        else:
+            print(f"Could not download CSV ({e}); using cached CSV")
         return CSV_PATH
-    
-    print(f"Downloading vaccination data from {OWID_URL}...")
-    r = requests.get(OWID_URL, timeout=30)
-    r.raise_for_status()
-    
-    with open(CSV_PATH, "wb") as f:
-        f.write(r.content)
-    
-    print(f"Downloaded CSV to {CSV_PATH}")
+
+    if updated:
+        print(f"Downloaded CSV to {CSV_PATH}")
+    else:
+        print("Using cached CSV (not modified upstream)")
     return CSV_PATH
 
-def load_data():
+def _csv_cache_key(csv_path):
+    """Identify a CSV file by modification time and size"""
+    stat = os.stat(csv_path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+def _resolve_columns(csv_path, columns=None):
+    """
+    Match requested columns against the CSV header.
+
+    Returns:
+        list: Requested columns present in the file (all columns if None)
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    if columns is None:
+        return header
+    return [c for c in columns if c in header]
+
+def _read_parquet_cache(csv_path, columns, dtype=None):
+    """
+    Read the Parquet snapshot of the CSV if it is current and holds every
+    requested column.
+
+    Returns:
+        pd.DataFrame or None: Cached data, or None on a cache miss
+    """
+    if pq is None or not os.path.exists(PARQUET_PATH):
+        return None
+
+    try:
+        schema = pq.read_schema(PARQUET_PATH)
+    except Exception as e:
+        print(f"Ignoring unreadable Parquet cache: {e}")
+        return None
+
+    metadata = schema.metadata or {}
+    if metadata.get(CACHE_KEY_FIELD, b"").decode() != _csv_cache_key(csv_path):
+        return None
+    if not set(columns) <= set(schema.names):
+        return None
+
+    df = pd.read_parquet(PARQUET_PATH, columns=columns)
+    for col, col_dtype in (dtype or {}).items():
+        if col in df.columns:
+            try:
+                df[col] = df[col].astype(col_dtype)
+            except (TypeError, ValueError):
+                pass  # e.g. fractional values in a column declared as integer
+    return df
+
+def _write_parquet_cache(df, csv_path):
+    """Write a Parquet snapshot of the parsed CSV, keyed by the CSV's mtime and size"""
+    if pq is None:
+        return
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[CACHE_KEY_FIELD] = _csv_cache_key(csv_path).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        tmp_path = PARQUET_PATH + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, PARQUET_PATH)
+        print(f"Wrote Parquet cache to {PARQUET_PATH}")
+    except Exception as e:
+        print(f"Could not write Parquet cache: {e}")
+
+def read_owid_csv(csv_path, columns=None, dtype=None, engine=None):
+    """
+    Parse the OWID CSV, reading only the requested columns with declared dtypes.
+
+    Columns without a declared dtype are inferred as usual, and inferred
+    text columns are converted to category. If a column declared as a
+    nullable integer holds fractional values, the integer columns are read
+    as float64 instead of failing the load.
+
+    Args:
+        csv_path (str): Path to the CSV file
+        columns (list, optional): Columns to read; all columns if None.
+            Requested columns missing from the file are skipped.
+        dtype (dict, optional): Column -> dtype, e.g. clean.CLEAN_DTYPES
+        engine (str, optional): pandas CSV engine; defaults to CSV_ENGINE
+
+    Returns:
+        pd.DataFrame: Parsed data in the requested column order
+    """
+    usecols = _resolve_columns(csv_path, columns)
+    declared = {c: t for c, t in (dtype or {}).items() if c in usecols}
+
+    read_kwargs = {
+        "usecols": usecols,
+        "parse_dates": ["date"] if "date" in usecols else None,
+        "engine": engine or CSV_ENGINE,
+    }
+    try:
+        df = pd.read_csv(csv_path, dtype=declared, **read_kwargs)
+    except (TypeError, ValueError) as e:
+        print(f"Declared integer columns hold non-integer values ({e}), reading them as float64")
+        declared = {
+            c: "float64" if pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(t)) else t
+            for c, t in declared.items()
+        }
+        df = pd.read_csv(csv_path, dtype=declared, **read_kwargs)
+
+    text_cols = [
+        c for c in df.select_dtypes(include=["object", "string"]).columns
+        if c not in declared
+    ]
+    if text_cols:
+        df[text_cols] = df[text_cols].astype("category")
+
+    return df[usecols]
+
+def load_data(columns=None, dtype=None, engine=None):
     """
     Download (if needed) and load vaccination data into pandas DataFrame.
-    
+
+    Pass the cleaning schema (clean.CLEAN_COLUMNS / clean.CLEAN_DTYPES) to
+    parse only the columns clean_vax uses. The first parse of a downloaded
+    CSV is snapshotted to Parquet; later loads of the same CSV read the
+    snapshot instead, as long as it holds every requested column.
+
+    Args:
+        columns (list, optional): Columns to load; all columns if None.
+            Requested columns missing from the file are skipped.
+        dtype (dict, optional): Column -> dtype to declare while parsing
+        engine (str, optional): pandas CSV engine ("c" or "pyarrow")
+
     Returns:
         pd.DataFrame: Vaccination data with parsed date column
     """
-    download_csv()
-    df = pd.read_csv(CSV_PATH, parse_dates=["date"])
-    
+    csv_path = download_csv()
+    columns = _resolve_columns(csv_path, columns)
+
+    df = _read_parquet_cache(csv_path, columns, dtype)
+    if df is not None:
+        print(f"Using Parquet cache {PARQUET_PATH}")
+    else:
+        df = read_owid_csv(csv_path, columns, dtype, engine)
+        _write_parquet_cache(df, csv_path)
+
     print(f"Loaded {len(df):,} records")
     print("Columns:", df.columns.tolist())
     print("\nSample data:")
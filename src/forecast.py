@@ -1,10 +1,61 @@
 # src/forecast.py
-from prophet import Prophet
+import hashlib
+import logging
+import os
 import pandas as pd
 import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.holt_winters import fit_holt_winters
+from src.storage import (
+    get_all_countries, get_country_timeseries, get_cached_forecast, save_forecast,
+    dispose_engines
+)
 
 warnings.filterwarnings('ignore', category=FutureWarning)
 
+# Countries need more days of history than this to be forecast
+MIN_HISTORY = 30
+
+# Batch workers run one model each; keep cmdstan and BLAS single-threaded
+# so the process pool alone decides how many cores are used
+WORKER_THREAD_ENV = {
+    "STAN_NUM_THREADS": "1",
+    "OMP_NUM_THREADS": "1",
+    "OPENBLAS_NUM_THREADS": "1",
+    "MKL_NUM_THREADS": "1",
+}
+
+def prepare_series(df_country, column="daily_vaccinations"):
+    """
+    Build the ds/y series a model is fitted on.
+
+    Args:
+        df_country (pd.DataFrame): DataFrame with 'date' and the column for one country
+        column (str): Column name to forecast
+
+    Returns:
+        pd.DataFrame: Columns ds and y
+    """
+    # Prepare data for Prophet (requires 'ds' and 'y' columns)
+    ts = df_country[["date", column]].rename(columns={"date": "ds", column: "y"})
+    
+    # Fill NaN values with 0 (Prophet doesn't handle NaN well)
+    ts = ts.fillna(0)
+    
+    # Remove any duplicate dates
+    return ts.drop_duplicates(subset=["ds"])
+
+def series_hash(ts):
+    """
+    Fingerprint of a prepared series, used as the forecast cache key.
+    New or corrected data for a country changes its hash.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.to_datetime(ts["ds"]).to_numpy(dtype="datetime64[ns]").tobytes())
+    digest.update(ts["y"].to_numpy(dtype="float64").tobytes())
+    return digest.hexdigest()
+
 def fit_prophet_for_country(df_country, column="daily_vaccinations", periods=30):
     """
     Train a Prophet model for a country's vaccination time series and generate forecasts.
@@ -18,14 +69,11 @@ def fit_prophet_for_country(df_country, column="daily_vaccinations", periods=30)
         pd.DataFrame: Forecast with columns: ds (date), yhat (prediction), 
                      yhat_lower, yhat_upper (confidence bounds)
     """
-    # Prepare data for Prophet (requires 'ds' and 'y' columns)
-    ts = df_country[["date", column]].rename(columns={"date": "ds", column: "y"})
-    
-    # Fill NaN values with 0 (Prophet doesn't handle NaN well)
-    ts = ts.fillna(0)
-    
-    # Remove any duplicate dates
-    ts = ts.drop_duplicates(subset=["ds"])
+    # Prophet (cmdstanpy) takes most of a second to import; load it only
+    # when a model is actually fitted
+    from prophet import Prophet
+
+    ts = prepare_series(df_country, column)
     
     # Initialize and fit Prophet model
     # Disable daily seasonality for vaccination data (weekly patterns more relevant)
@@ -47,7 +95,95 @@ def fit_prophet_for_country(df_country, column="daily_vaccinations", periods=30)
     # Return relevant columns
     return forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]]
 
-def forecast_country_with_history(df_country, column="daily_vaccinations", periods=30):
+def fit_holt_winters_for_country(df_country, column="daily_vaccinations", periods=30):
+    """
+    Forecast a country with damped-trend Holt-Winters (weekly seasonality).
+
+    Fits in milliseconds instead of seconds; suited to the short horizons
+    the dashboard shows.
+
+    Args:
+        df_country (pd.DataFrame): DataFrame with 'date' and the column for one country
+        column (str): Column name to forecast
+        periods (int): Number of days to forecast into the future
+
+    Returns:
+        pd.DataFrame: Forecast with columns ds, yhat, yhat_lower, yhat_upper
+    """
+    return fit_holt_winters(prepare_series(df_country, column), periods)
+
+# Forecasting models by name; each takes (df_country, column, periods) and
+# returns ds, yhat, yhat_lower, yhat_upper for the history and the horizon
+FORECASTERS = {
+    "prophet": fit_prophet_for_country,
+    "holt_winters": fit_holt_winters_for_country,
+}
+
+# Environment variable naming the model used when none is passed. It is
+# read at call time, and the dashboard and run_all.py --forecasts both
+# default to it, so the app reads the forecasts the batch job stored
+# instead of fitting another model.
+MODEL_ENV_VAR = "VAX_FORECAST_MODEL"
+
+def configured_model():
+    """
+    The forecasting model set in MODEL_ENV_VAR.
+
+    Returns:
+        str: Key of FORECASTERS, "prophet" if the variable is unset
+    """
+    model = os.environ.get(MODEL_ENV_VAR) or "prophet"
+    if model not in FORECASTERS:
+        raise ValueError(f"{MODEL_ENV_VAR}='{model}' is not one of {sorted(FORECASTERS)}")
+    return model
+
+def fit_forecast(df_country, column="daily_vaccinations", periods=30, model=None):
+    """
+    Fit the named forecasting model for one country.
+
+    Args:
+        df_country (pd.DataFrame): DataFrame with 'date' and the column for one country
+        column (str): Column name to forecast
+        periods (int): Number of days to forecast into the future
+        model (str): Key of FORECASTERS; configured_model() if None
+
+    Returns:
+        pd.DataFrame: Forecast with columns ds, yhat, yhat_lower, yhat_upper
+    """
+    model = model or configured_model()
+    if model not in FORECASTERS:
+        raise ValueError(f"Unknown forecasting model '{model}', expected one of {sorted(FORECASTERS)}")
+    return FORECASTERS[model](df_country, column, periods)
+
+def cached_forecast(df_country, column="daily_vaccinations", periods=30, model=None):
+    """
+    Forecast a country through the persistent forecast cache.
+
+    The model is only fitted when no forecast is stored for this location,
+    column, horizon, model and input series; the result is then stored for
+    the next call.
+
+    Args:
+        df_country (pd.DataFrame): DataFrame with 'location', 'date' and the column
+        column (str): Column name to forecast
+        periods (int): Number of days to forecast into the future
+        model (str): Key of FORECASTERS; configured_model() if None
+
+    Returns:
+        pd.DataFrame: Forecast with columns ds, yhat, yhat_lower, yhat_upper
+    """
+    model = model or configured_model()
+    location = str(df_country["location"].iloc[0])
+    key = series_hash(prepare_series(df_country, column))
+
+    forecast = get_cached_forecast(location, column, periods, key, model)
+    if forecast is None:
+        forecast = fit_forecast(df_country, column, periods, model)
+        save_forecast(location, column, periods, key, forecast, model)
+    return forecast
+
+def forecast_country_with_history(df_country, column="daily_vaccinations", periods=30, use_cache=False,
+                                  model=None):
     """
     Generate forecast and combine with historical data.
     
@@ -55,12 +191,18 @@ def forecast_country_with_history(df_country, column="daily_vaccinations", perio
         df_country (pd.DataFrame): Historical data
         column (str): Column to forecast
         periods (int): Days to forecast
+        use_cache (bool): Read/write the persistent forecast cache
+            (requires a 'location' column)
+        model (str): Key of FORECASTERS; configured_model() if None
     
     Returns:
         tuple: (historical_df, forecast_df)
     """
     # Get forecast
-    forecast = fit_prophet_for_country(df_country, column, periods)
+    if use_cache:
+        forecast = cached_forecast(df_country, column, periods, model)
+    else:
+        forecast = fit_forecast(df_country, column, periods, model)
     
     # Split historical and future
     max_date = df_country["date"].max()
@@ -76,6 +218,88 @@ def forecast_country_with_history(df_country, column="daily_vaccinations", perio
     
     return historical, future
 
+def _init_worker():
+    """Set up a batch forecast worker process"""
+    os.environ.update(WORKER_THREAD_ENV)
+    # Connections inherited from the parent must not be used (or closed) here
+    dispose_engines(close=False)
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+def _forecast_location(location, column, periods, model):
+    """
+    Fit one location's forecast unless it is already stored.
+
+    Returns:
+        tuple: (status, series hash, forecast or None); status is one of
+            "fitted", "cached" or "skipped"
+    """
+    df_country = get_country_timeseries(location)
+    if len(df_country) <= MIN_HISTORY:
+        return "skipped", None, None
+
+    key = series_hash(prepare_series(df_country, column))
+    if get_cached_forecast(location, column, periods, key, model) is not None:
+        return "cached", key, None
+    return "fitted", key, fit_forecast(df_country, column, periods, model)
+
+def forecast_all_countries(column="daily_vaccinations", periods=30, workers=None, model=None):
+    """
+    Precompute forecasts for every location with enough history.
+
+    Models are fitted in parallel in a process pool. Workers read their own
+    series from the database and return the forecast; the calling process
+    writes all results to the forecasts table, so there is a single writer.
+    Locations whose stored forecast still matches their data are skipped.
+
+    Args:
+        column (str): Column to forecast
+        periods (int): Days to forecast
+        workers (int, optional): Worker processes; defaults to the CPU
+            count. 0 fits in the calling process.
+        model (str): Key of FORECASTERS; configured_model() if None
+
+    Returns:
+        dict: Number of locations per outcome (fitted, cached, skipped, failed)
+    """
+    model = model or configured_model()
+    if model not in FORECASTERS:
+        raise ValueError(f"Unknown forecasting model '{model}', expected one of {sorted(FORECASTERS)}")
+    locations = get_all_countries()
+    counts = {"fitted": 0, "cached": 0, "skipped": 0, "failed": 0}
+
+    def record(location, result):
+        status, key, forecast = result
+        if forecast is not None:
+            save_forecast(location, column, periods, key, forecast, model)
+        counts[status] += 1
+
+    if workers == 0:
+        for location in locations:
+            try:
+                record(location, _forecast_location(location, column, periods, model))
+            except Exception as e:
+                print(f"Forecast failed for {location}: {e}")
+                counts["failed"] += 1
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(_forecast_location, location, column, periods, model): location
+                for location in locations
+            }
+            for future in as_completed(futures):
+                location = futures[future]
+                try:
+                    record(location, future.result())
+                except Exception as e:
+                    print(f"Forecast failed for {location}: {e}")
+                    counts["failed"] += 1
+
+    print(f"Forecasts for {len(locations)} locations: {counts['fitted']} fitted, "
+          f"{counts['cached']} up to date, {counts['skipped']} without enough history, "
+          f"{counts['failed']} failed")
+    return counts
+
 if __name__ == "__main__":
     from etl import load_data
     from clean import clean_vax
@@ -0,0 +1,109 @@
+# src/holt_winters.py
+"""
+Additive Holt-Winters forecasting with a damped trend and weekly seasonality.
+
+A NumPy-only alternative to Prophet for short horizons. Smoothing
+parameters are chosen by minimizing the one-step-ahead squared error over
+a fixed grid; the recursion runs once for all grid points at the same time,
+so a fit takes milliseconds.
+"""
+import numpy as np
+import pandas as pd
+
+SEASON_LENGTH = 7  # weekly reporting cycle of daily data
+
+# Candidate smoothing parameters: level, trend, seasonal, damping
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.01, 0.05, 0.1, 0.2)
+GAMMAS = (0.05, 0.1, 0.2, 0.4)
+PHIS = (0.8, 0.9, 0.95, 0.98)
+
+# Two-sided normal quantile for an 80% interval, Prophet's default width
+INTERVAL_Z = 1.2816
+
+def _initial_state(y, m):
+    """Level, trend and seasonal indices from the first two seasons"""
+    first, second = y[:m].mean(), y[m:2 * m].mean()
+    return first, (second - first) / m, y[:m] - first
+
+def _one_step_errors(y, m, alpha, beta, gamma, phi):
+    """
+    Run the recursion for arrays of parameters at once.
+
+    Uses the error-correction form:
+        e_t = y_t - (l + phi*b + s_{t-m})
+        l   = l + phi*b + alpha*e_t
+        b   = phi*b + alpha*beta*e_t
+        s_t = s_{t-m} + gamma*e_t
+
+    Returns:
+        tuple: (one-step predictions, shape (n, k); final level, trend and
+            seasonal state)
+    """
+    level0, trend0, season0 = _initial_state(y, m)
+    k = alpha.shape[0]
+    level = np.full(k, level0)
+    trend = np.full(k, trend0)
+    season = np.repeat(season0[:, None], k, axis=1)
+
+    predictions = np.empty((len(y), k))
+    for t, value in enumerate(y):
+        s = season[t % m]
+        damped = phi * trend
+        predicted = level + damped + s
+        error = value - predicted
+        predictions[t] = predicted
+        level = level + damped + alpha * error
+        trend = damped + alpha * beta * error
+        season[t % m] = s + gamma * error
+    return predictions, level, trend, season
+
+def fit_holt_winters(ts, periods=30, season_length=SEASON_LENGTH):
+    """
+    Fit a damped-trend additive Holt-Winters model and forecast.
+
+    Args:
+        ts (pd.DataFrame): Series with columns ds (dates) and y
+        periods (int): Number of days to forecast
+        season_length (int): Observations per seasonal cycle
+
+    Returns:
+        pd.DataFrame: ds, yhat, yhat_lower, yhat_upper for every historical
+            date (one-step-ahead fit) and the forecast horizon
+    """
+    ts = ts.sort_values("ds")
+    y = ts["y"].to_numpy(dtype="float64")
+    m = season_length
+    if len(y) < 2 * m:
+        raise ValueError(f"Holt-Winters needs at least {2 * m} observations, got {len(y)}")
+
+    alpha, beta, gamma, phi = (
+        a.ravel() for a in np.meshgrid(ALPHAS, BETAS, GAMMAS, PHIS, indexing="ij")
+    )
+    predictions, level, trend, season = _one_step_errors(y, m, alpha, beta, gamma, phi)
+
+    # Score after the initialization seasons, which fit trivially
+    sse = ((y[2 * m:, None] - predictions[2 * m:]) ** 2).sum(axis=0)
+    best = int(np.argmin(sse))
+    a, b, g, p = alpha[best], beta[best], gamma[best], phi[best]
+    fitted = predictions[:, best]
+    sigma = np.sqrt(sse[best] / max(len(y) - 2 * m, 1))
+
+    # h-step forecasts; variance grows with the cumulative error weights
+    h = np.arange(1, periods + 1)
+    phi_h = np.cumsum(p ** h)
+    n = len(y)
+    forecast = level[best] + phi_h * trend[best] + season[(n + h - 1) % m, best]
+    weights = a * (1 + b * phi_h[:-1]) + g * (h[:-1] % m == 0)
+    spread = INTERVAL_Z * sigma * np.sqrt(1 + np.concatenate(([0.0], np.cumsum(weights ** 2))))
+
+    history_ds = pd.to_datetime(ts["ds"]).reset_index(drop=True)
+    future_ds = pd.date_range(history_ds.iloc[-1], periods=periods + 1, freq="D")[1:]
+    fit_spread = INTERVAL_Z * sigma
+
+    return pd.DataFrame({
+        "ds": pd.concat([history_ds, pd.Series(future_ds)], ignore_index=True),
+        "yhat": np.concatenate([fitted, forecast]),
+        "yhat_lower": np.concatenate([fitted - fit_spread, forecast - spread]),
+        "yhat_upper": np.concatenate([fitted + fit_spread, forecast + spread]),
+    })
@@ -0,0 +1,80 @@
+# src/knowledge_index.py
+"""
+Lookup tables compiled from the chatbot knowledge base.
+
+KNOWLEDGE_BASE and KNOWLEDGE_BASE_TRANSLATIONS are lists and nested dicts
+written for editing. The chatbot needs them by key (the responses of an
+intent, the intent answering an emotion, whether a response is one of our
+translations), so they are compiled once into read-only mappings and the
+per-message cost no longer grows with the knowledge base.
+"""
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
+
+from src.chatbot_knowledge import KNOWLEDGE_BASE
+from src.chatbot_translations import KNOWLEDGE_BASE_TRANSLATIONS
+
+# Intent that answers each emotion the chatbot detects
+EMOTION_INTENTS = {
+    'anger': 'feeling_angry',
+    'fear': 'feeling_scared',
+    'boredom': 'feeling_bored',
+    'confusion': 'feeling_confused',
+    'sadness': 'feeling_sad',
+}
+
+class KnowledgeIndex(NamedTuple):
+    """Immutable view of the knowledge base, keyed for the chatbot's lookups"""
+    patterns: tuple            # every training pattern, in knowledge base order
+    pattern_intents: tuple     # intent of each pattern
+    responses: MappingProxyType          # intent -> English responses
+    emotion_responses: MappingProxyType  # emotion -> responses of its intent
+    translations: MappingProxyType       # lang -> intent -> translated responses
+    translated: MappingProxyType         # lang -> set of all translated responses
+
+    def is_translated(self, response, lang):
+        """Whether response is one of the stored translations for lang"""
+        return response in self.translated.get(lang, ())
+
+def build_knowledge_index(knowledge_base=KNOWLEDGE_BASE, translations=KNOWLEDGE_BASE_TRANSLATIONS):
+    """
+    Compile the knowledge base.
+
+    Args:
+        knowledge_base (list): Items with 'intent', 'patterns' and 'responses'
+        translations (dict): lang -> intent -> list of responses
+
+    Returns:
+        KnowledgeIndex: The compiled index; the first item of a repeated
+            intent wins, as with the linear scan it replaces
+    """
+    patterns, pattern_intents, responses = [], [], {}
+    for item in knowledge_base:
+        for pattern in item['patterns']:
+            patterns.append(pattern)
+            pattern_intents.append(item['intent'])
+        responses.setdefault(item['intent'], tuple(item['responses']))
+
+    return KnowledgeIndex(
+        patterns=tuple(patterns),
+        pattern_intents=tuple(pattern_intents),
+        responses=MappingProxyType(responses),
+        emotion_responses=MappingProxyType({
+            emotion: responses[intent] for emotion, intent in EMOTION_INTENTS.items()
+            if intent in responses
+        }),
+        translations=MappingProxyType({
+            lang: MappingProxyType({intent: tuple(texts) for intent, texts in by_intent.items()})
+            for lang, by_intent in translations.items()
+        }),
+        translated=MappingProxyType({
+            lang: frozenset(text for texts in by_intent.values() for text in texts)
+            for lang, by_intent in translations.items()
+        }),
+    )
+
+@lru_cache(maxsize=1)
+def get_knowledge_index():
+    """The index of the bundled knowledge base, compiled once per process"""
+    return build_knowledge_index()
@@ -0,0 +1,111 @@
+# src/retrieval.py
+"""
+Nearest-intent search over TF-IDF pattern vectors.
+
+The pattern matrix is L2-normalized and transposed once, so scoring a query
+is one sparse product that only touches the patterns sharing a term with
+it (an inverted index), instead of a dense cosine against every pattern.
+Pattern scores are then pooled per intent and the best k intents selected
+with argpartition. A batch of queries is scored with the same single
+product, one row per query.
+"""
+import numpy as np
+from sklearn.preprocessing import normalize
+
+AGGREGATES = ("max", "mean")
+
+# Upper bound on the queries x intents score block pooled at once
+MAX_BLOCK_CELLS = 1 << 20
+
+class PatternIndex:
+    """
+    Cosine-similarity search of intents by their example patterns.
+
+    Args:
+        matrix (scipy.sparse matrix): One row per pattern (e.g. TF-IDF)
+        labels (sequence): Intent of each pattern
+    """
+
+    def __init__(self, matrix, labels):
+        if matrix.shape[0] != len(labels):
+            raise ValueError(f"{matrix.shape[0]} patterns but {len(labels)} labels")
+
+        # terms x patterns, so query @ matrix reads one posting list per term
+        self._by_term = normalize(matrix, norm="l2").T.tocsr()
+
+        self.intents = tuple(dict.fromkeys(labels))
+        ids = {intent: i for i, intent in enumerate(self.intents)}
+        self._intent_of_pattern = np.array([ids[label] for label in labels], dtype=np.intp)
+        self._patterns_per_intent = np.bincount(self._intent_of_pattern, minlength=len(self.intents))
+
+    def search(self, query, k=1, aggregate="max"):
+        """
+        Best matching intents for a query vector.
+
+        Args:
+            query (scipy.sparse matrix): 1 x terms vector from the same vectorizer
+            k (int): Number of intents to return
+            aggregate (str): Pool pattern scores per intent by "max" (the
+                closest pattern) or "mean" (all of the intent's patterns)
+
+        Returns:
+            list: Up to k (intent, cosine score) pairs, best first; intents
+                sharing no term with the query are left out
+        """
+        return self.search_many(query, k=k, aggregate=aggregate)[0]
+
+    def search_many(self, queries, k=1, aggregate="max"):
+        """
+        Best matching intents for each row of a query matrix.
+
+        Args:
+            queries (scipy.sparse matrix): queries x terms, from the same vectorizer
+            k (int): Number of intents to return per query
+            aggregate (str): "max" or "mean", as for search()
+
+        Returns:
+            list: One search() result per query row
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{aggregate}', expected one of {AGGREGATES}")
+
+        queries = queries.tocsr()
+        rows = max(1, MAX_BLOCK_CELLS // len(self.intents))
+        if queries.shape[0] <= rows:
+            return self._search_block(queries, k, aggregate)
+        results = []
+        for start in range(0, queries.shape[0], rows):
+            results += self._search_block(queries[start:start + rows], k, aggregate)
+        return results
+
+    def _search_block(self, queries, k, aggregate):
+        n_queries, n_intents = queries.shape[0], len(self.intents)
+        query_of_term = np.repeat(np.arange(n_queries), np.diff(queries.indptr))
+        norms = np.sqrt(np.bincount(query_of_term, weights=queries.data ** 2, minlength=n_queries))
+
+        scores = (queries @ self._by_term).tocsr()
+        query_of_score = np.repeat(np.arange(n_queries), np.diff(scores.indptr))
+        cells = query_of_score * n_intents + self._intent_of_pattern[scores.indices]
+
+        intent_scores = np.zeros(n_queries * n_intents)
+        if aggregate == "max":
+            np.maximum.at(intent_scores, cells, scores.data)
+        else:
+            np.add.at(intent_scores, cells, scores.data)
+        intent_scores = intent_scores.reshape(n_queries, n_intents)
+        if aggregate == "mean":
+            intent_scores /= self._patterns_per_intent
+        np.divide(intent_scores, norms[:, None], out=intent_scores, where=norms[:, None] > 0)
+
+        if k == 1:
+            best = np.argmax(intent_scores, axis=1)[:, None]  # ties go to the first intent
+        else:
+            k = min(k, n_intents)
+            top = np.argpartition(-intent_scores, k - 1, axis=1)[:, :k]
+            order = np.argsort(-np.take_along_axis(intent_scores, top, axis=1), axis=1, kind="stable")
+            best = np.take_along_axis(top, order, axis=1)
+
+        return [
+            [(self.intents[i], float(row[i])) for i in row_best if row[i] > 0]
+            for row, row_best in zip(intent_scores, best)
+        ]
@@ -0,0 +1,185 @@
+# src/spelling.py
+"""
+Spelling correction with a symmetric-delete (SymSpell) index.
+
+Gives the same corrections as TextBlob's Word.correct(): the word itself if
+it is known, else the most frequent known word at edit distance 1, else at
+distance 2, counting deletes, inserts, replaces and adjacent swaps. Instead
+of generating every edit of the input and checking each against the word
+list, the index maps strings obtained by deleting up to two characters from
+each known word back to that word, so a lookup only visits the input's own
+deletes.
+"""
+import re
+from functools import lru_cache
+
+MAX_EDIT_DISTANCE = 2
+
+# Only the first characters of each word are indexed, as in SymSpell; this
+# keeps the index about a third the size at the same results
+PREFIX_LENGTH = 7
+
+# Corrected tokens remembered per index
+CACHE_SIZE = 4096
+
+WORD_RE = re.compile(r"[^\W\d_]+")
+
+def tokenize(text):
+    """Lowercase words (letters only) in text"""
+    return WORD_RE.findall(text.lower())
+
+def _deletes(word, distance=MAX_EDIT_DISTANCE):
+    """word and every string made by deleting up to distance characters"""
+    result = frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result = result | frontier
+    return result
+
+def edit_distance(a, b):
+    """
+    Damerau-Levenshtein distance: deletes, inserts, replaces and swaps of
+    adjacent characters, with no restriction on editing a substring twice.
+    """
+    infinity = len(a) + len(b)
+    d = [[infinity] * (len(b) + 2)]
+    d += [[infinity] + list(range(len(b) + 1))]
+    d += [[infinity, i] + [0] * len(b) for i in range(1, len(a) + 1)]
+
+    last_row = {}  # last row each character of a was seen in
+    for i in range(1, len(a) + 1):
+        last_match_col = 0
+        for j in range(1, len(b) + 1):
+            k, l = last_row.get(b[j - 1], 0), last_match_col
+            cost = 1
+            if a[i - 1] == b[j - 1]:
+                cost = 0
+                last_match_col = j
+            d[i + 1][j + 1] = min(
+                d[i][j] + cost,                           # replace
+                d[i + 1][j] + 1,                          # insert
+                d[i][j + 1] + 1,                          # delete
+                d[k][l] + (i - k - 1) + 1 + (j - l - 1),  # swap
+            )
+        last_row[a[i - 1]] = i
+    return d[len(a) + 1][len(b) + 1]
+
+def _writable(table, shared, key):
+    """table[key] as a list of its own, copied first if still in shared"""
+    if key in shared:
+        shared.discard(key)
+        table[key] = list(table[key])
+    return table.setdefault(key, [])
+
+class SpellIndex:
+    """
+    Word frequencies with a symmetric-delete lookup index.
+
+    Args:
+        counts (dict): Known words and their frequencies
+        cache_size (int): Corrections kept in the LRU cache
+    """
+
+    def __init__(self, counts, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self.counts = {}
+        self._by_prefix = {}  # prefix -> words starting with it
+        self._deletes = {}    # delete of a prefix -> prefixes
+        # Keys whose lists are still shared with the index this was copied from
+        self._shared_prefixes = set()
+        self._shared_deletes = set()
+        self.correct = lru_cache(maxsize=cache_size)(self._correct)
+        self.add_words(counts)
+
+    @classmethod
+    def from_textblob(cls, extra_text=(), **kwargs):
+        """
+        Index TextBlob's English word list plus the words in extra_text.
+
+        Args:
+            extra_text (iterable of str): Domain text; each word occurrence
+                adds one to its frequency
+
+        Returns:
+            SpellIndex: The index
+        """
+        from textblob.en import spelling
+
+        counts = dict(spelling.items())
+        for text in extra_text:
+            for word in tokenize(text):
+                counts[word] = counts.get(word, 0) + 1
+        return cls(counts, **kwargs)
+
+    def add_words(self, counts):
+        """
+        Add words, or add to the frequency of known ones.
+
+        Args:
+            counts (dict): Words and frequencies to add
+        """
+        for word, count in counts.items():
+            if word not in self.counts:
+                prefix = word[:PREFIX_LENGTH]
+                if prefix not in self._by_prefix:
+                    self._by_prefix[prefix] = []
+                    for deleted in _deletes(prefix):
+                        _writable(self._deletes, self._shared_deletes, deleted).append(prefix)
+                _writable(self._by_prefix, self._shared_prefixes, prefix).append(word)
+            self.counts[word] = self.counts.get(word, 0) + count
+        self.correct.cache_clear()
+
+    def with_words(self, counts):
+        """
+        Copy of the index with words added; this index is left unchanged,
+        so other threads can keep reading it while the copy is built.
+
+        Args:
+            counts (dict): Words and frequencies to add
+
+        Returns:
+            SpellIndex: The new index
+        """
+        index = SpellIndex({}, cache_size=self.cache_size)
+        index.counts = dict(self.counts)
+        index._by_prefix = dict(self._by_prefix)
+        index._deletes = dict(self._deletes)
+        index._shared_prefixes = set(self._by_prefix)
+        index._shared_deletes = set(self._deletes)
+        index.add_words(counts)
+        return index
+
+    def __contains__(self, word):
+        return word in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _correct(self, word):
+        """
+        Most likely intended word for a lowercase word.
+
+        Returns:
+            str: word if known (or a single character), else the most
+                frequent known word at the smallest edit distance up to
+                MAX_EDIT_DISTANCE (ties go to the alphabetically later
+                word, as in TextBlob), else word unchanged
+        """
+        if len(word) == 1 or word in self.counts:
+            return word
+
+        best, seen = None, set()
+        for deleted in _deletes(word[:PREFIX_LENGTH]):
+            for prefix in self._deletes.get(deleted, ()):
+                if prefix in seen:
+                    continue
+                seen.add(prefix)
+                for candidate in self._by_prefix[prefix]:
+                    if abs(len(candidate) - len(word)) > MAX_EDIT_DISTANCE:
+                        continue
+                    distance = edit_distance(word, candidate)
+                    if distance <= MAX_EDIT_DISTANCE:
+                        key = (-distance, self.counts[candidate], candidate)
+                        if best is None or key > best:
+                            best = key
+        return best[2] if best else word
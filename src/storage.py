@@ -2,29 +2,668 @@
 import sqlalchemy as sa
 import pandas as pd
 import os
+import threading
+from datetime import datetime
+
+from src.clean import AGGREGATE_LOCATIONS
 
 # Database path
 DB_DIR = "data"
 DB_PATH = os.path.join(DB_DIR, "vax_tracker.db")
 DB_URL = f"sqlite:///{DB_PATH}"
 
+VACCINATION_TABLE = "countries_vaccinations"
+
+# One row per location with the last reported value of each metric
+LATEST_TABLE = "latest_by_country"
+
+# Global totals per date across countries
+GLOBAL_TABLE = "global_daily"
+GLOBAL_METRICS = ["total_vaccinations", "people_vaccinated", "people_fully_vaccinated", "population"]
+
+# Forecast results keyed by (location, column, periods, hash of the input series)
+FORECAST_TABLE = "forecasts"
+
+# Per-location high-water marks of the last successful load
+ETL_STATE_TABLE = "etl_state"
+
+# Single-row counter bumped by every write of vaccination data or load
+# marks, so in-process caches can tell that the data changed
+DATA_VERSION_TABLE = "data_version"
+
+# Machine translations of chatbot responses keyed by (hash of the source text, language)
+TRANSLATION_TABLE = "translations"
+
+# Most keys per IN (...) lookup, below SQLite's bound parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Declared columns of the vaccination table, keyed by (location, date).
+# Dates are stored as ISO "YYYY-MM-DD" text.
+VACCINATION_COLUMNS = {
+    "location": "TEXT NOT NULL",
+    "date": "TEXT NOT NULL",
+    "total_vaccinations": "INTEGER",
+    "people_vaccinated": "INTEGER",
+    "people_fully_vaccinated": "INTEGER",
+    "daily_vaccinations": "REAL",
+    "population": "INTEGER",
+    "new_cases_smoothed": "REAL",
+    "new_deaths_smoothed": "REAL",
+    "new_cases_smoothed_per_million": "REAL",
+    "new_deaths_smoothed_per_million": "REAL",
+    "daily_vaccinations_7d": "REAL",
+    "pct_vaccinated": "REAL",
+    "pct_fully_vaccinated": "REAL",
+}
+
+# Rows per executemany call when bulk loading
+BULK_BATCH_SIZE = 10_000
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # readers don't block the ETL writer
+    "PRAGMA synchronous=NORMAL",    # safe with WAL, avoids an fsync per commit
+    "PRAGMA mmap_size=268435456",   # 256 MB memory-mapped reads
+    "PRAGMA cache_size=-65536",     # 64 MB page cache
+)
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Let SQLAlchemy issue BEGIN itself (see _begin_sqlite_transaction)
+    # instead of the driver's implicit BEGIN before the first DML statement
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+def _begin_sqlite_transaction(conn):
+    # DDL then runs inside the transaction too, so a table swap is atomic
+    conn.exec_driver_sql("BEGIN")
+
+def get_engine():
+    """
+    Get the process-wide SQLAlchemy engine for DB_URL.
+
+    The engine is created on first use and its connection pool is shared by
+    every query afterwards. Engines are kept per URL, so patching DB_URL
+    (as the tests do) transparently switches to a separate engine.
+
+    Returns:
+        sa.engine.Engine: Pooled engine
+    """
+    url = DB_URL
+    engine = _engines.get(url)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(url)
+            if engine is None:
+                engine = sa.create_engine(url)
+                if engine.dialect.name == "sqlite":
+                    sa.event.listen(engine, "connect", _set_sqlite_pragmas)
+                    sa.event.listen(engine, "begin", _begin_sqlite_transaction)
+                migrate(engine)
+                _engines[url] = engine
+    return engine
+
+def dispose_engines(close=True):
+    """
+    Close all pooled connections and forget the cached engines.
+
+    Call after forking a worker process or before deleting a database file.
+
+    Args:
+        close (bool): Close the pooled connections. Pass False in a forked
+            child, whose inherited connections belong to the parent.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose(close=close)
+        _engines.clear()
+
 os.makedirs(DB_DIR, exist_ok=True)
 
-def save_df_to_db(df, table_name="countries_vaccinations"):
+def create_vaccination_table(conn, table_name=VACCINATION_TABLE):
+    """
+    Create a table with the managed vaccination schema.
+
+    The (location, date) primary key clusters each country's rows in date
+    order, which serves timeseries reads and the latest-value lookups of
+    the latest_by_country refresh.
+    """
+    columns = ",\n".join(f"{name} {sql_type}" for name, sql_type in VACCINATION_COLUMNS.items())
+    conn.execute(sa.text(f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            {columns},
+            PRIMARY KEY (location, date)
+        ) WITHOUT ROWID
+    """))
+
+def _migrate_v1(conn):
+    """Managed vaccination schema; rebuilds a table written by pandas to_sql"""
+    conn.execute(sa.text(f"""
+        CREATE TABLE IF NOT EXISTS {ETL_STATE_TABLE} (
+            location TEXT PRIMARY KEY,
+            last_date TEXT NOT NULL,
+            loaded_at TEXT NOT NULL
+        )
+    """))
+
+    existing = conn.execute(sa.text(f"PRAGMA table_info({VACCINATION_TABLE})")).fetchall()
+    if not existing:
+        create_vaccination_table(conn)
+        return
+
+    # Copy the legacy table into the managed schema, normalizing dates
+    legacy_columns = [row[1] for row in existing if row[1] in VACCINATION_COLUMNS]
+    legacy_table = f"{VACCINATION_TABLE}_legacy"
+    select = ", ".join("substr(date, 1, 10)" if c == "date" else c for c in legacy_columns)
+    conn.execute(sa.text(f"ALTER TABLE {VACCINATION_TABLE} RENAME TO {legacy_table}"))
+    create_vaccination_table(conn)
+    conn.execute(sa.text(f"""
+        INSERT OR REPLACE INTO {VACCINATION_TABLE} ({", ".join(legacy_columns)})
+        SELECT {select} FROM {legacy_table}
+        WHERE location IS NOT NULL AND date IS NOT NULL
+    """))
+    conn.execute(sa.text(f"DROP TABLE {legacy_table}"))
+    print(f"Migrated {VACCINATION_TABLE} to the indexed schema")
+
+def _migrate_v2(conn):
+    """Materialized latest-per-country snapshot"""
+    # Latest-per-country reads no longer scan countries_vaccinations
+    conn.execute(sa.text(f"DROP INDEX IF EXISTS idx_{VACCINATION_TABLE}_reported"))
+    metrics = ",\n".join(
+        f"{name} {sql_type}" for name, sql_type in VACCINATION_COLUMNS.items()
+        if name not in ("location", "date")
+    )
+    conn.execute(sa.text(f"""
+        CREATE TABLE IF NOT EXISTS {LATEST_TABLE} (
+            location TEXT PRIMARY KEY,
+            date TEXT NOT NULL,
+            {metrics}
+        ) WITHOUT ROWID
+    """))
+    _refresh_latest_snapshot(conn)
+
+def _migrate_v3(conn):
+    """Global daily totals"""
+    conn.execute(sa.text(f"""
+        CREATE TABLE IF NOT EXISTS {GLOBAL_TABLE} (
+            date TEXT PRIMARY KEY,
+            total_vaccinations INTEGER,
+            people_vaccinated INTEGER,
+            people_fully_vaccinated INTEGER,
+            population INTEGER,
+            pct_vaccinated REAL,
+            pct_fully_vaccinated REAL,
+            reporting_countries INTEGER
+        ) WITHOUT ROWID
+    """))
+    _refresh_global_daily(conn)
+
+def _migrate_v4(conn):
+    """Forecast cache"""
+    conn.execute(sa.text(f"""
+        CREATE TABLE IF NOT EXISTS {FORECAST_TABLE} (
+            location TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            periods INTEGER NOT NULL,
+            series_hash TEXT NOT NULL,
+            ds TEXT NOT NULL,
+            yhat REAL,
+            yhat_lower REAL,
+            yhat_upper REAL,
+            PRIMARY KEY (location, column_name, periods, series_hash, ds)
+        ) WITHOUT ROWID
+    """))
+
+def _migrate_v5(conn):
+    """Key the forecast cache by model; cached forecasts are refitted"""
+    conn.execute(sa.text(f"DROP TABLE IF EXISTS {FORECAST_TABLE}"))
+    conn.execute(sa.text(f"""
+        CREATE TABLE {FORECAST_TABLE} (
+            location TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            periods INTEGER NOT NULL,
+            model TEXT NOT NULL,
+            series_hash TEXT NOT NULL,
+            ds TEXT NOT NULL,
+            yhat REAL,
+            yhat_lower REAL,
+            yhat_upper REAL,
+            PRIMARY KEY (location, column_name, periods, model, series_hash, ds)
+        ) WITHOUT ROWID
+    """))
+
+def _migrate_v6(conn):
+    """Persistent cache of machine translations"""
+    conn.execute(sa.text(f"""
+        CREATE TABLE IF NOT EXISTS {TRANSLATION_TABLE} (
+            text_hash TEXT NOT NULL,
+            lang TEXT NOT NULL,
+            translation TEXT NOT NULL,
+            PRIMARY KEY (text_hash, lang)
+        ) WITHOUT ROWID
+    """))
+
+def _migrate_v7(conn):
+    """Data version counter; load times alone miss two loads in one second"""
+    conn.execute(sa.text(f"""
+        CREATE TABLE IF NOT EXISTS {DATA_VERSION_TABLE} (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """))
+    conn.execute(sa.text(f"INSERT OR IGNORE INTO {DATA_VERSION_TABLE} (id, version) VALUES (1, 0)"))
+
+# Schema migrations, applied in order; PRAGMA user_version records progress
+MIGRATIONS = [_migrate_v1, _migrate_v2, _migrate_v3, _migrate_v4, _migrate_v5, _migrate_v6, _migrate_v7]
+
+def migrate(engine):
+    """
+    Bring the database schema up to date.
+
+    Runs every migration newer than the database's user_version inside one
+    transaction. Called automatically when the engine is created.
+    """
+    with engine.begin() as conn:
+        version = conn.execute(sa.text("PRAGMA user_version")).scalar()
+        for target, step in enumerate(MIGRATIONS[version:], start=version + 1):
+            step(conn)
+            conn.execute(sa.text(f"PRAGMA user_version = {target}"))
+
+def _vaccination_rows(df):
+    """
+    Convert df to rows for the managed schema.
+
+    Returns:
+        tuple: (columns present in df, list of row tuples holding plain
+            Python values, with None for missing values and ISO dates)
+    """
+    columns = [c for c in VACCINATION_COLUMNS if c in df.columns]
+    arrays = []
+    for col in columns:
+        values = df[col]
+        if col == "location":
+            values = values.astype(str)
+        elif col == "date":
+            values = pd.to_datetime(values).dt.strftime("%Y-%m-%d")
+        elif pd.api.types.is_extension_array_dtype(values):
+            arrays.append(values.to_numpy(dtype=object, na_value=None))
+            continue
+        else:
+            values = values.astype("float64")
+        array = values.to_numpy(dtype=object)
+        array[values.isna().to_numpy()] = None
+        arrays.append(array)
+    return columns, list(zip(*arrays))
+
+def _bulk_insert(conn, table_name, columns, rows):
+    """
+    Insert rows through the raw DBAPI cursor in BULK_BATCH_SIZE batches.
+
+    Runs inside the caller's transaction, bypassing SQLAlchemy's per-row
+    parameter processing.
+    """
+    sql = (f"INSERT OR REPLACE INTO {table_name} ({', '.join(columns)}) "
+           f"VALUES ({', '.join('?' * len(columns))})")
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        for start in range(0, len(rows), BULK_BATCH_SIZE):
+            cursor.executemany(sql, rows[start:start + BULK_BATCH_SIZE])
+    finally:
+        cursor.close()
+
+def _refresh_latest_snapshot(conn, locations=None):
+    """
+    Rebuild latest_by_country rows from countries_vaccinations.
+
+    Each metric holds its last non-null value, found by walking the
+    location's rows backwards along the primary key; date is the
+    location's most recent row.
+    """
+    metrics = [c for c in VACCINATION_COLUMNS if c not in ("location", "date")]
+    lookups = ",\n".join(
+        f"(SELECT {m} FROM {VACCINATION_TABLE} v WHERE v.location = l.location "
+        f"AND {m} IS NOT NULL ORDER BY date DESC LIMIT 1)"
+        for m in metrics
+    )
+    where = "" if locations is None else "WHERE location = :location"
+    delete = sa.text(f"DELETE FROM {LATEST_TABLE} {where}")
+    insert = sa.text(f"""
+        INSERT INTO {LATEST_TABLE} (location, date, {", ".join(metrics)})
+        SELECT l.location, l.date,
+            {lookups}
+        FROM (
+            SELECT location, MAX(date) AS date
+            FROM {VACCINATION_TABLE} {where}
+            GROUP BY location
+        ) l
+    """)
+
+    if locations is None:
+        conn.execute(delete)
+        conn.execute(insert)
+    else:
+        params = [{"location": str(location)} for location in locations]
+        if params:
+            conn.execute(delete, params)
+            conn.execute(insert, params)
+
+def _refresh_global_daily(conn):
+    """
+    Rebuild global_daily from countries_vaccinations.
+
+    Countries rarely report on the same day, so on every date each country
+    contributes its last known value (carried forward from its most recent
+    report) rather than only rows dated that day. Locations in
+    AGGREGATE_LOCATIONS are left out so nobody is counted twice.
+    """
+    query = sa.text(f"""
+        SELECT location, date, {", ".join(GLOBAL_METRICS)}
+        FROM {VACCINATION_TABLE}
+        WHERE location NOT IN :aggregates
+    """).bindparams(sa.bindparam("aggregates", expanding=True))
+    df = pd.read_sql_query(query, conn, params={"aggregates": sorted(AGGREGATE_LOCATIONS)})
+
+    conn.execute(sa.text(f"DELETE FROM {GLOBAL_TABLE}"))
+    if df.empty:
+        return
+
+    totals = pd.DataFrame(index=pd.Index(sorted(df["date"].unique()), name="date"))
+    for metric in GLOBAL_METRICS:
+        carried = df.pivot(index="date", columns="location", values=metric).ffill()
+        totals[metric] = carried.sum(axis=1, min_count=1)
+        if metric == "total_vaccinations":
+            totals["reporting_countries"] = carried.notna().sum(axis=1)
+    totals["pct_vaccinated"] = totals["people_vaccinated"] / totals["population"] * 100
+    totals["pct_fully_vaccinated"] = totals["people_fully_vaccinated"] / totals["population"] * 100
+
+    totals = totals.reset_index()
+    columns = list(totals.columns)
+    rows = list(totals.astype(object).where(totals.notna(), None).itertuples(index=False))
+    _bulk_insert(conn, GLOBAL_TABLE, columns, rows)
+
+def _bump_data_version(conn):
+    """Advance the data version inside the writer's transaction"""
+    conn.execute(sa.text(f"UPDATE {DATA_VERSION_TABLE} SET version = version + 1 WHERE id = 1"))
+
+def _invalidate_forecasts(conn, locations=None):
+    """Drop cached forecasts of locations whose data was rewritten"""
+    if locations is None:
+        conn.execute(sa.text(f"DELETE FROM {FORECAST_TABLE}"))
+    else:
+        params = [{"location": str(location)} for location in locations]
+        if params:
+            conn.execute(sa.text(f"DELETE FROM {FORECAST_TABLE} WHERE location = :location"), params)
+
+def refresh_latest_snapshot(locations=None):
+    """
+    Recompute the latest_by_country snapshot.
+
+    save_df_to_db and upsert_df_to_db already do this for the rows they
+    write; call it directly after changing countries_vaccinations by other
+    means.
+
+    Args:
+        locations (iterable, optional): Locations to refresh; all if None
+    """
+    engine = get_engine()
+    with engine.begin() as conn:
+        _refresh_latest_snapshot(conn, locations)
+
+def save_df_to_db(df, table_name=VACCINATION_TABLE):
     """
     Save DataFrame to SQLite database.
+
+    Rows are bulk loaded into a staging table with the managed vaccination
+    schema, which then replaces table_name, all in a single transaction:
+    readers keep seeing the previous table until the swap commits. Columns
+    outside VACCINATION_COLUMNS are not stored. Writing
+    countries_vaccinations also rebuilds the latest_by_country snapshot and
+    global_daily, and drops cached forecasts, in the same transaction.
     
     Args:
         df (pd.DataFrame): Data to save
         table_name (str): Name of the table to create/replace
     """
-    engine = sa.create_engine(DB_URL)
-    df.to_sql(table_name, engine, if_exists="replace", index=False)
+    engine = get_engine()
+    staging_table = f"{table_name}_staging"
+    columns, rows = _vaccination_rows(df)
+
+    with engine.begin() as conn:
+        conn.execute(sa.text(f"DROP TABLE IF EXISTS {staging_table}"))
+        create_vaccination_table(conn, staging_table)
+        _bulk_insert(conn, staging_table, columns, rows)
+
+        conn.execute(sa.text(f"DROP TABLE IF EXISTS {table_name}"))
+        conn.execute(sa.text(f"ALTER TABLE {staging_table} RENAME TO {table_name}"))
+        if table_name == VACCINATION_TABLE:
+            _refresh_latest_snapshot(conn)
+            _refresh_global_daily(conn)
+            _invalidate_forecasts(conn)
+            _bump_data_version(conn)
     print(f"Saved {len(df):,} records to {DB_URL} (table: {table_name})")
 
+def upsert_df_to_db(df, table_name=VACCINATION_TABLE):
+    """
+    Insert or replace rows in the database without rewriting the table.
+
+    For every location in the DataFrame, stored rows from its earliest
+    date onwards are deleted and the new rows appended, all within a
+    single transaction. The latest_by_country rows of those locations and
+    global_daily are refreshed, and the locations' cached forecasts
+    dropped, in the same transaction.
+
+    Args:
+        df (pd.DataFrame): Cleaned rows to write
+        table_name (str): Name of the table to update
+    """
+    if df.empty:
+        print(f"No records to upsert into {table_name}")
+        return
+
+    engine = get_engine()
+    starts = df.groupby("location", observed=True)["date"].min()
+    params = [
+        {"location": location, "since": start.strftime("%Y-%m-%d")}
+        for location, start in starts.items()
+    ]
+
+    columns, rows = _vaccination_rows(df)
+
+    with engine.begin() as conn:
+        create_vaccination_table(conn, table_name)
+        conn.execute(
+            sa.text(f"DELETE FROM {table_name} WHERE location = :location AND date >= :since"),
+            params
+        )
+        _bulk_insert(conn, table_name, columns, rows)
+        if table_name == VACCINATION_TABLE:
+            _refresh_latest_snapshot(conn, starts.index)
+            _refresh_global_daily(conn)
+            _invalidate_forecasts(conn, starts.index)
+            _bump_data_version(conn)
+
+    print(f"Upserted {len(df):,} records across {len(params)} locations (table: {table_name})")
+
+def get_cached_forecast(location, column, periods, series_hash, model="prophet"):
+    """
+    Look up a stored forecast.
+
+    Args:
+        location (str): Location the forecast was fitted for
+        column (str): Forecasted column
+        periods (int): Forecast horizon in days
+        series_hash (str): Hash of the input series the model was fitted on
+        model (str): Forecasting model that produced it
+
+    Returns:
+        pd.DataFrame or None: ds, yhat, yhat_lower, yhat_upper, or None on a miss
+    """
+    engine = get_engine()
+
+    query = f"""
+    SELECT ds, yhat, yhat_lower, yhat_upper
+    FROM {FORECAST_TABLE}
+    WHERE location = :location AND column_name = :column
+      AND periods = :periods AND model = :model AND series_hash = :series_hash
+    ORDER BY ds
+    """
+    params = {"location": location, "column": column, "periods": periods,
+              "model": model, "series_hash": series_hash}
+
+    df = pd.read_sql_query(query, engine, params=params, parse_dates=["ds"])
+    return df if not df.empty else None
+
+def save_forecast(location, column, periods, series_hash, forecast, model="prophet"):
+    """
+    Store a forecast, replacing any earlier one for the same location,
+    column, horizon, model and input series.
+
+    Forecasts of other series are kept, so a writer holding an outdated
+    series (e.g. a dashboard that cached its data before a load) cannot
+    replace the forecast of the current one; they are all dropped when
+    the location's data is rewritten.
+
+    Args:
+        location (str): Location the forecast was fitted for
+        column (str): Forecasted column
+        periods (int): Forecast horizon in days
+        series_hash (str): Hash of the input series the model was fitted on
+        forecast (pd.DataFrame): ds, yhat, yhat_lower, yhat_upper
+        model (str): Forecasting model that produced it
+    """
+    engine = get_engine()
+    key = {"location": location, "column": column, "periods": periods,
+           "model": model, "series_hash": series_hash}
+    rows = [
+        (location, column, periods, model, series_hash, ds.strftime("%Y-%m-%d"), yhat, lower, upper)
+        for ds, yhat, lower, upper in zip(
+            pd.to_datetime(forecast["ds"]), forecast["yhat"].astype(float),
+            forecast["yhat_lower"].astype(float), forecast["yhat_upper"].astype(float),
+        )
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(sa.text(f"""
+            DELETE FROM {FORECAST_TABLE}
+            WHERE location = :location AND column_name = :column
+              AND periods = :periods AND model = :model AND series_hash = :series_hash
+        """), key)
+        _bulk_insert(conn, FORECAST_TABLE, [
+            "location", "column_name", "periods", "model", "series_hash",
+            "ds", "yhat", "yhat_lower", "yhat_upper",
+        ], rows)
+
+def get_cached_translations(text_hashes, lang):
+    """
+    Look up stored translations.
+
+    Args:
+        text_hashes (iterable of str): Hashes of the source texts
+        lang (str): Target language code
+
+    Returns:
+        dict: text hash -> translation, for the hashes that are stored
+    """
+    engine = get_engine()
+    text_hashes = list(dict.fromkeys(text_hashes))
+    found = {}
+
+    with engine.connect() as conn:
+        for start in range(0, len(text_hashes), LOOKUP_BATCH_SIZE):
+            batch = text_hashes[start:start + LOOKUP_BATCH_SIZE]
+            query = sa.text(f"""
+                SELECT text_hash, translation FROM {TRANSLATION_TABLE}
+                WHERE lang = :lang AND text_hash IN :hashes
+            """).bindparams(sa.bindparam("hashes", expanding=True))
+            found.update(conn.execute(query, {"lang": lang, "hashes": batch}).all())
+    return found
+
+def save_translations(lang, translations):
+    """
+    Store translations, replacing earlier ones of the same texts.
+
+    Args:
+        lang (str): Target language code
+        translations (dict): text hash -> translation
+    """
+    engine = get_engine()
+    rows = [(text_hash, lang, translation) for text_hash, translation in translations.items()]
+
+    with engine.begin() as conn:
+        _bulk_insert(conn, TRANSLATION_TABLE, ["text_hash", "lang", "translation"], rows)
+
+def get_high_water_marks():
+    """
+    Get the last loaded date per location.
+
+    Returns:
+        dict: Mapping of location -> pd.Timestamp, empty if nothing was loaded yet
+    """
+    engine = get_engine()
+    query = f"SELECT location, last_date FROM {ETL_STATE_TABLE}"
+    df = pd.read_sql_query(query, engine, parse_dates=["last_date"])
+    return dict(zip(df["location"], df["last_date"]))
+
+def get_recently_loaded(days):
+    """
+    Get the stored rows of the last days up to each location's high-water mark.
+
+    Args:
+        days (int): Days before the high-water mark to include
+
+    Returns:
+        pd.DataFrame: Stored rows, ordered by location and date
+    """
+    engine = get_engine()
+    query = f"""
+    SELECT v.*
+    FROM {VACCINATION_TABLE} v
+    JOIN {ETL_STATE_TABLE} s ON s.location = v.location
+    WHERE v.date > date(s.last_date, :offset) AND v.date <= s.last_date
+    ORDER BY v.location, v.date
+    """
+    return pd.read_sql_query(query, engine, params={"offset": f"-{int(days)} days"},
+                             parse_dates=["date"])
+
+def record_high_water_marks(df, replace=False):
+    """
+    Record the latest date per location after a successful load.
+
+    Args:
+        df (pd.DataFrame): Rows that were written, with location and date columns
+        replace (bool): Drop existing marks first (used after a full reload)
+    """
+    engine = get_engine()
+    marks = df.groupby("location", observed=True)["date"].max()
+    loaded_at = datetime.now().isoformat(timespec="seconds")
+    params = [
+        {"location": location, "last_date": last.strftime("%Y-%m-%d"), "loaded_at": loaded_at}
+        for location, last in marks.items()
+    ]
+
+    with engine.begin() as conn:
+        if replace:
+            conn.execute(sa.text(f"DELETE FROM {ETL_STATE_TABLE}"))
+        if params:
+            conn.execute(sa.text(f"""
+                INSERT INTO {ETL_STATE_TABLE} (location, last_date, loaded_at)
+                VALUES (:location, :last_date, :loaded_at)
+                ON CONFLICT(location) DO UPDATE SET
+                    last_date = excluded.last_date,
+                    loaded_at = excluded.loaded_at
+            """), params)
+        _bump_data_version(conn)
+
 def get_latest_by_country(limit=100):
     """
     Query the latest vaccination statistics per country.
+
+    Reads the latest_by_country snapshot maintained at load time.
     
     Args:
         limit (int): Maximum number of countries to return
@@ -32,24 +671,40 @@ def get_latest_by_country(limit=100):
     Returns:
         pd.DataFrame: Latest stats per country, ordered by vaccination percentage
     """
-    engine = sa.create_engine(DB_URL)
+    engine = get_engine()
     
-    query = """
-    WITH latest_dates AS (
-        SELECT location, MAX(date) as max_date
-        FROM countries_vaccinations
-        WHERE total_vaccinations IS NOT NULL
-        GROUP BY location
-    )
-    SELECT t1.*
-    FROM countries_vaccinations t1
-    JOIN latest_dates t2 ON t1.location = t2.location AND t1.date = t2.max_date
-    ORDER BY t1.pct_vaccinated DESC
+    query = f"""
+    SELECT *
+    FROM {LATEST_TABLE}
+    ORDER BY pct_vaccinated DESC
     LIMIT :limit
     """
     
     return pd.read_sql_query(query, engine, params={"limit": limit})
 
+def get_latest_snapshot(country_name=None):
+    """
+    Get the last reported value of each metric per country.
+
+    Args:
+        country_name (str, optional): Only this country (case-insensitive)
+
+    Returns:
+        pd.DataFrame: One row per location, ordered by vaccination percentage
+    """
+    engine = get_engine()
+
+    where = "" if country_name is None else "WHERE location = :country COLLATE NOCASE"
+    query = f"""
+    SELECT *
+    FROM {LATEST_TABLE}
+    {where}
+    ORDER BY pct_vaccinated DESC
+    """
+
+    return pd.read_sql_query(query, engine, params={"country": country_name},
+                             parse_dates=["date"])
+
 def get_country_timeseries(country_name):
     """
     Get complete time series data for a specific country.
@@ -60,7 +715,7 @@ def get_country_timeseries(country_name):
     Returns:
         pd.DataFrame: Time series data for the country
     """
-    engine = sa.create_engine(DB_URL)
+    engine = get_engine()
     
     query = """
     SELECT *
@@ -72,6 +727,84 @@ def get_country_timeseries(country_name):
     return pd.read_sql_query(query, engine, params={"country": country_name}, 
                              parse_dates=["date"])
 
+def get_countries_timeseries(country_names):
+    """
+    Get complete time series data for several countries in one query.
+
+    Args:
+        country_names (list): Names of the countries
+
+    Returns:
+        pd.DataFrame: Time series data, ordered by location and date
+    """
+    engine = get_engine()
+
+    query = sa.text(f"""
+    SELECT *
+    FROM {VACCINATION_TABLE}
+    WHERE location IN :countries
+    ORDER BY location, date
+    """).bindparams(sa.bindparam("countries", expanding=True))
+
+    return pd.read_sql_query(query, engine, params={"countries": list(country_names)},
+                             parse_dates=["date"])
+
+def get_global_totals():
+    """
+    Get the most recent global totals from global_daily.
+
+    Returns:
+        dict: date, total_vaccinations, people_vaccinated,
+            people_fully_vaccinated, population, pct_vaccinated,
+            pct_fully_vaccinated and reporting_countries (all None when
+            nothing was loaded yet)
+    """
+    engine = get_engine()
+
+    query = f"SELECT * FROM {GLOBAL_TABLE} ORDER BY date DESC LIMIT 1"
+
+    with engine.connect() as conn:
+        result = conn.execute(sa.text(query))
+        row = result.mappings().first()
+        return dict(row) if row else dict.fromkeys(result.keys())
+
+def get_data_summary():
+    """
+    Summarize the stored data.
+
+    Returns:
+        dict: last_date (pd.Timestamp or None), countries and records counts
+    """
+    engine = get_engine()
+
+    query = f"""
+    SELECT MAX(date) AS last_date,
+           COUNT(DISTINCT location) AS countries,
+           COUNT(*) AS records
+    FROM {VACCINATION_TABLE}
+    """
+
+    with engine.connect() as conn:
+        summary = dict(conn.execute(sa.text(query)).mappings().one())
+    summary["last_date"] = pd.to_datetime(summary["last_date"]) if summary["last_date"] else None
+    return summary
+
+def get_data_version():
+    """
+    Identify the currently loaded data, for in-process caches that must
+    follow ETL runs.
+
+    Returns:
+        int: Counter that goes up with every save, upsert and recording of
+            high-water marks, however close together
+    """
+    engine = get_engine()
+
+    query = f"SELECT version FROM {DATA_VERSION_TABLE} WHERE id = 1"
+
+    with engine.connect() as conn:
+        return conn.execute(sa.text(query)).scalar_one()
+
 def get_all_countries():
     """
     Get a list of all unique countries in the database.
@@ -79,7 +812,7 @@ def get_all_countries():
     Returns:
         list: List of country names
     """
-    engine = sa.create_engine(DB_URL)
+    engine = get_engine()
     query = "SELECT DISTINCT location FROM countries_vaccinations ORDER BY location"
     df = pd.read_sql_query(query, engine)
     return df["location"].tolist()
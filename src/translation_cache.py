@@ -0,0 +1,190 @@
+# src/translation_cache.py
+"""
+Cached machine translation of chatbot responses.
+
+Most knowledge base intents have no stored translation, so answering in
+Hindi, Bengali, Tamil or Telugu means a blocking call to Google Translate,
+and the same few hundred answers are sent to it again and again. The cache
+keys translations by (hash of the source text, target language) and checks
+an in-memory LRU first, then the translations table of the database, and
+only then the translator backend. Running prewarm_knowledge_base() once
+(run_all.py --translations) fills the table for every knowledge base
+answer, so the chatbot needs no network for them.
+
+The backend is any function backend(text, lang) -> str; tests use a local stub.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from src.storage import get_cached_translations, save_translations
+
+CACHE_SIZE = 4096
+
+def text_hash(text):
+    """SHA-256 hex digest of text, the cache key of its translations"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def google_translate(text, lang):
+    """
+    Translate text with Google Translate (one network round trip).
+
+    Args:
+        text (str): Text in any language
+        lang (str): Target language code
+
+    Returns:
+        str: The translation
+    """
+    from deep_translator import GoogleTranslator
+
+    return GoogleTranslator(source='auto', target=lang).translate(text)
+
+class TranslationCache:
+    """
+    Translator with an in-memory LRU in front of the database.
+
+    Args:
+        backend (callable): backend(text, lang) -> translation, called on a miss
+        cache_size (int): Translations kept in memory
+        persist (bool): Read and write the translations table; when False
+            only the in-memory LRU is used
+    """
+
+    def __init__(self, backend=google_translate, cache_size=CACHE_SIZE, persist=True):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.persist = persist
+        self._memory = OrderedDict()  # (text hash, lang) -> translation, oldest first
+        self._lock = threading.Lock()
+
+    def translate(self, text, lang):
+        """
+        Translate text, calling the backend only if it was never translated.
+
+        Args:
+            text (str): Text to translate
+            lang (str): Target language code
+
+        Returns:
+            str: The translation
+
+        Raises:
+            Exception: Whatever the backend raises on a miss; failures are not cached
+        """
+        key = text_hash(text)
+        translation = self._recall(key, lang)
+        if translation is not None:
+            return translation
+
+        translation = self._load([key], lang).get(key)
+        if translation is None:
+            translation = self.backend(text, lang)
+            if not translation:
+                return text
+            self._store(lang, {key: translation})
+        self._remember(key, lang, translation)
+        return translation
+
+    def prewarm(self, texts, lang):
+        """
+        Translate and store every text not stored yet, e.g. offline before
+        deployment, and load them all into memory.
+
+        Args:
+            texts (iterable of str): Texts to translate
+            lang (str): Target language code
+
+        Returns:
+            int: Number of texts sent to the backend
+        """
+        by_hash = {text_hash(text): text for text in texts}
+        stored = self._load(by_hash, lang)
+        translated = {}
+        try:
+            for key, text in by_hash.items():
+                if key not in stored:
+                    translation = self.backend(text, lang)
+                    if translation:
+                        translated[key] = translation
+        finally:
+            # Keep what was translated before a failure
+            self._store(lang, translated)
+            for key, translation in {**stored, **translated}.items():
+                self._remember(key, lang, translation)
+        return len(by_hash) - len(stored)
+
+    def clear(self):
+        """Empty the in-memory LRU (stored translations are kept)"""
+        with self._lock:
+            self._memory.clear()
+
+    def _recall(self, key, lang):
+        with self._lock:
+            translation = self._memory.get((key, lang))
+            if translation is not None:
+                self._memory.move_to_end((key, lang))
+            return translation
+
+    def _remember(self, key, lang, translation):
+        with self._lock:
+            self._memory[(key, lang)] = translation
+            self._memory.move_to_end((key, lang))
+            while len(self._memory) > self.cache_size:
+                self._memory.popitem(last=False)
+
+    def _load(self, keys, lang):
+        if not self.persist:
+            return {}
+        try:
+            return get_cached_translations(keys, lang)
+        except Exception as e:
+            print(f"Translation cache read error: {e}")
+            return {}
+
+    def _store(self, lang, translations):
+        if not self.persist or not translations:
+            return
+        try:
+            save_translations(lang, translations)
+        except Exception as e:
+            print(f"Translation cache write error: {e}")
+
+def untranslated_responses(knowledge):
+    """
+    The knowledge base answers the chatbot machine-translates.
+
+    Args:
+        knowledge (KnowledgeIndex): Compiled knowledge base
+
+    Returns:
+        dict: lang -> English responses of the intents without a stored
+            translation in that language
+    """
+    return {
+        lang: [
+            response for intent, responses in knowledge.responses.items()
+            if intent not in by_intent for response in responses
+        ]
+        for lang, by_intent in knowledge.translations.items()
+    }
+
+def prewarm_knowledge_base(cache=None):
+    """
+    Store a translation of every knowledge base answer the chatbot would
+    otherwise translate per message.
+
+    Args:
+        cache (TranslationCache): Cache to fill; a persistent one with the
+            Google backend if None
+
+    Returns:
+        dict: lang -> number of answers translated now (already stored ones are skipped)
+    """
+    from src.knowledge_index import get_knowledge_index
+
+    cache = cache or TranslationCache()
+    return {
+        lang: cache.prewarm(texts, lang)
+        for lang, texts in untranslated_responses(get_knowledge_index()).items()
+    }
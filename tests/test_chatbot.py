@@ -1,8 +1,28 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, Mock, patch
 import pandas as pd
 import numpy as np
-from src.chatbot import Chatbot, get_chatbot_response
+import threading
+from src import chatbot as chatbot_module
+from src.chatbot import Chatbot, get_chatbot, get_chatbot_response
+from src.spelling import SpellIndex, edit_distance
+from src.knowledge_index import build_knowledge_index, get_knowledge_index
+from src.retrieval import PatternIndex
+from src.conversation import ConversationState, SessionStore
+from src.translation_cache import TranslationCache, prewarm_knowledge_base, untranslated_responses
+from src.storage import dispose_engines
+from src.chatbot_knowledge import KNOWLEDGE_BASE
+from src.chatbot_translations import KNOWLEDGE_BASE_TRANSLATIONS
+
+def stub_translate(text, lang):
+    return f"[{lang}] {text}"
+
+@pytest.fixture
+def translation_db(tmp_path):
+    """Point the storage module at an empty database"""
+    with patch("src.storage.DB_URL", f"sqlite:///{tmp_path / 'translations.db'}"):
+        yield
+        dispose_engines()
 
 class TestChatbot:
     @pytest.fixture
@@ -12,13 +32,17 @@ class TestChatbot:
         # But for unit tests, we can use the real class if it's self-contained enough.
         # The Chatbot class loads data in __init__, so we might want to mock that.
         
-        with patch('src.chatbot.get_all_countries', return_value=['India', 'USA', 'France']):
-            bot = Chatbot()
+        # Check the data version on every message, so tests can change it
+        with patch('src.chatbot.get_all_countries', return_value=['India', 'USA', 'France']), \
+             patch('src.chatbot.get_data_version', return_value='v1'), \
+             patch('src.chatbot.DATA_CHECK_INTERVAL', 0):
+            # Machine translation through a local stub instead of Google Translate
+            bot = Chatbot(translator=TranslationCache(backend=stub_translate, persist=False))
             # Force training with a small dummy corpus if needed, or rely on real one
             # bot.patterns = ["hello", "vaccine stats"]
             # bot.intent_map = ["greeting", "country_stats"]
             # bot._train()
-            return bot
+            yield bot
 
     def test_initialization(self, chatbot):
         """Test that chatbot initializes correctly"""
@@ -32,13 +56,27 @@ class TestChatbot:
         # Basic cleaning
         assert chatbot.preprocess_input("Hello World") == "Hello World"
         
-        # Spell checking (mocked or real depending on TextBlob)
-        # "symptms" -> "symptoms" is a known correction in our context
-        # assert "symptoms" in chatbot.preprocess_input("symptms").lower() 
+        # Spell checking against TextBlob's word list plus our vocabulary
+        assert "symptoms" in chatbot.preprocess_input("symptms").lower()
+        assert chatbot.preprocess_input("is the vacine safe") == "is the vaccine safe"
         
         # Case preservation
         assert chatbot.preprocess_input("India") == "India"
 
+    def test_protected_vocabulary(self, chatbot):
+        """Test domain words and country names skip spell correction"""
+        assert {'stats', 'pfizer', 'omicron', 'covid', 'france'} <= chatbot.protected_words
+
+        with patch.object(chatbot.spelling, 'correct', wraps=chatbot.spelling.correct) as correct:
+            assert chatbot.preprocess_input("Pfizer stats for France") == "Pfizer stats for France"
+            correct.assert_not_called()
+
+        # Countries loaded after an ETL run are protected too
+        with patch('src.chatbot.get_all_countries', return_value=['Kiribati']), \
+             patch('src.chatbot.get_data_version', return_value='v2'):
+            chatbot._load_data()
+        assert 'kiribati' in chatbot.protected_words
+
     def test_extract_entities(self, chatbot):
         """Test entity extraction (countries)"""
         # Simple extraction
@@ -54,6 +92,34 @@ class TestChatbot:
         entities = chatbot.extract_entities("hello there")
         assert len(entities) == 0
 
+    def test_extract_entities_word_boundaries(self, chatbot):
+        """Test countries match whole words, longest name first, and aliases"""
+        with patch('src.chatbot.get_all_countries',
+                   return_value=['Oman', 'Niger', 'Nigeria', 'Guinea', 'Papua New Guinea', 'United Kingdom']), \
+             patch('src.chatbot.get_data_version', return_value='v2'):
+            chatbot._load_data()
+
+        assert chatbot.extract_entities("vaccines for a woman") == []
+        assert chatbot.extract_entities("stats for Nigeria") == ["nigeria"]
+        assert chatbot.extract_entities("Papua New Guinea and Guinea") == ["papua new guinea", "guinea"]
+        assert chatbot.extract_entities("compare the UK and Oman?") == ["united kingdom", "oman"]
+
+    def test_short_aliases_need_capitals_or_dots(self, chatbot):
+        """Test "us" and "uk" as ordinary words don't name a country"""
+        with patch('src.chatbot.get_all_countries', return_value=['United States', 'United Kingdom', 'France']), \
+             patch('src.chatbot.get_data_version', return_value='v2'):
+            chatbot._load_data()
+
+        assert chatbot.extract_entities("tell us about vaccines") == []
+        assert chatbot.extract_entities("TELL US ABOUT VACCINES") == []
+        assert chatbot.extract_entities("uk and us") == []
+        assert chatbot.extract_entities("US and France") == ["united states", "france"]
+        assert chatbot.extract_entities("the u.s. or the U.K.?") == ["united states", "united kingdom"]
+
+        # Spell correction leaves abbreviations alone, so they still match after it
+        assert chatbot.preprocess_input("USA and UAE stats") == "USA and UAE stats"
+        assert chatbot.extract_entities(chatbot.preprocess_input("vaccination stats for the USA")) == ["united states"]
+
     def test_analyze_sentiment(self, chatbot):
         """Test sentiment analysis"""
         # Positive
@@ -75,7 +141,7 @@ class TestChatbot:
         assert chatbot.detect_emotion_keywords("This is confusing") == "confusion"
         assert chatbot.detect_emotion_keywords("I am happy") is None
 
-    @patch('src.chatbot.get_latest_by_country')
+    @patch('src.chatbot.get_latest_snapshot')
     def test_get_db_response_stats(self, mock_get_latest, chatbot):
         """Test database response for country stats"""
         # Mock DB return
@@ -87,6 +153,7 @@ class TestChatbot:
         mock_get_latest.return_value = mock_df
         
         response = chatbot.get_db_response('country_stats', ['india'])
+        mock_get_latest.assert_called_once_with('india')
         assert "India" in response
         assert "1,000,000" in response
         assert "75.5%" in response
@@ -102,17 +169,59 @@ class TestChatbot:
     def test_context_retention(self, chatbot):
         """Test that chatbot remembers context"""
         # Set context manually
-        chatbot.context['last_country'] = 'india'
+        state = ConversationState(last_country='india')
         
         # Ask follow-up question
         # We need to mock get_db_response or the underlying DB call
         with patch.object(chatbot, 'get_db_response', return_value="Stats for India") as mock_db:
-            chatbot.get_response("what about stats")
+            assert chatbot.get_response("what about stats", state=state) == "Stats for India"
             
-            # Should have called db response with context
-            # Note: get_response logic is complex, might need specific triggers
-            # For now, just check if extract_entities uses context if implemented
-            pass 
+            # Should have called db response with the conversation's state
+            mock_db.assert_called_once_with('country_stats', [], state)
+
+    @patch('src.chatbot.get_latest_snapshot')
+    def test_sessions_keep_separate_context(self, mock_get_latest, chatbot):
+        """Test follow-ups in concurrent sessions use their own country"""
+        mock_get_latest.side_effect = lambda country: pd.DataFrame({
+            'location': [country.title()],
+            'total_vaccinations': [1000],
+            'pct_vaccinated': [50.0]
+        })
+        chatbot.get_response("vaccination stats for India", session_id='a')
+        chatbot.get_response("vaccination stats for France", session_id='b')
+
+        assert "India" in chatbot.get_response("and the vaccination rate?", session_id='a')
+        assert "France" in chatbot.get_response("and the vaccination rate?", session_id='b')
+        # A new session has no country to follow up on
+        assert mock_get_latest.call_count == 4
+        chatbot.get_response("and the vaccination rate?", session_id='c')
+        assert mock_get_latest.call_count == 4
+
+    @patch('src.chatbot.get_latest_snapshot')
+    def test_get_responses_batch(self, mock_get_latest, chatbot):
+        """Test a batch is answered like the same messages sent one by one"""
+        mock_get_latest.side_effect = lambda country: pd.DataFrame({
+            'location': [country.title()],
+            'total_vaccinations': [1000],
+            'pct_vaccinated': [50.0]
+        })
+        messages = ["hello", "vaccination stats for France", "is the vacine safe",
+                    "and the vaccination rate?", "I am scared of side efects", ""]
+
+        chatbot_module.random.seed(0)
+        one_by_one = [chatbot.get_response(message, session_id='one') for message in messages]
+
+        chatbot_module.random.seed(0)
+        with patch.object(chatbot.spelling, 'correct', wraps=chatbot.spelling.correct) as correct:
+            batch = chatbot.get_responses(messages + ["is the vacine safe"], session_id='batch')
+            # Each distinct word is spell-checked once for the whole batch
+            corrected = [call.args[0] for call in correct.call_args_list]
+            assert len(corrected) == len(set(corrected))
+
+        assert batch[:-1] == one_by_one
+        # The follow-up uses the country of the message before it
+        assert batch[3] == "In France, 1,000 doses have been administered (50.0% vaccinated)."
+        assert chatbot.get_responses([]) == []
 
     def test_multilingual_support(self, chatbot):
         """Test that language parameter is accepted"""
@@ -120,3 +229,298 @@ class TestChatbot:
         response = chatbot.get_response("hello", lang='hi')
         assert isinstance(response, str)
         assert len(response) > 0
+
+    def test_machine_translation_is_cached(self, chatbot):
+        """Test answers without a stored translation are machine-translated once"""
+        intent = next(item for item in KNOWLEDGE_BASE
+                      if item['intent'] not in KNOWLEDGE_BASE_TRANSLATIONS['hi'] and len(item['responses']) == 1)
+        chatbot.translator.backend = Mock(side_effect=stub_translate)
+
+        responses = {chatbot.get_response(intent['patterns'][0], lang='hi') for _ in range(3)}
+        assert responses == {f"[hi] {intent['responses'][0]}"}
+        chatbot.translator.backend.assert_called_once_with(intent['responses'][0], 'hi')
+
+        # A failing backend leaves the answer in English, with a note
+        chatbot.translator.clear()
+        chatbot.translator.backend = Mock(side_effect=ConnectionError("offline"))
+        response = chatbot.get_response(intent['patterns'][0], lang='hi')
+        assert response.startswith(intent['responses'][0])
+        assert "couldn't translate" in response
+
+    def test_country_list_follows_data_version(self, chatbot):
+        """Test the country list is reloaded after the ETL writes new data"""
+        with patch('src.chatbot.get_all_countries', return_value=['India', 'Germany']) as countries:
+            chatbot.get_response("hello")
+            assert countries.call_count == 0  # same data version, nothing reloaded
+
+            with patch('src.chatbot.get_data_version', return_value='v2'):
+                chatbot.get_response("hello")
+                chatbot.get_response("hello")
+            assert countries.call_count == 1
+            assert 'germany' in chatbot.countries
+
+    def test_data_check_is_throttled(self, chatbot):
+        """Test the data version is read at most once per DATA_CHECK_INTERVAL"""
+        now = [1000.0]
+        chatbot._data_checked_at = None
+        with patch('src.chatbot.DATA_CHECK_INTERVAL', 5.0), \
+             patch('src.chatbot.time.monotonic', side_effect=lambda: now[0]), \
+             patch('src.chatbot.get_data_version', return_value='v2') as version, \
+             patch('src.chatbot.get_all_countries', return_value=['India', 'Germany']):
+            chatbot.get_responses(["hello", "hi"])
+            chatbot.get_response("hello")
+            now[0] += 1
+            chatbot.get_response("hello")
+            assert version.call_count == 1
+
+            now[0] += 5
+            chatbot.get_response("hello")
+            assert version.call_count == 2
+
+    def test_reload_builds_new_indexes(self, chatbot):
+        """Test a reload replaces the spell index instead of changing the one in use"""
+        in_use = chatbot.spelling
+        with patch('src.chatbot.get_all_countries', return_value=['Kiribati']), \
+             patch('src.chatbot.get_data_version', return_value='v2'):
+            chatbot.get_response("hello")
+
+        assert chatbot.spelling is not in_use
+        assert 'kiribati' in chatbot.spelling and 'kiribati' in chatbot.country_matcher.find('kiribati')
+        assert 'kiribati' not in in_use and 'kiribati' not in chatbot.base_spelling
+        # Countries dropped from the data are no longer protected
+        assert 'france' in in_use and 'france' not in chatbot.protected_words
+
+def test_get_chatbot_builds_once():
+    """Test concurrent first calls share one lazily built Chatbot"""
+    def slow_build():
+        threading.Event().wait(0.05)
+        return MagicMock()
+
+    with patch.object(chatbot_module, '_chatbot_instance', None), \
+         patch('src.chatbot.Chatbot', side_effect=slow_build) as build:
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get_chatbot())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert build.call_count == 1
+        assert len(results) == 8 and all(r is results[0] for r in results)
+
+class TestSessionStore:
+    def test_state_has_slots(self):
+        """Test the per-session state is a fixed set of slots"""
+        state = ConversationState()
+        assert state.last_country is None
+        assert not hasattr(state, '__dict__')
+        with pytest.raises(AttributeError):
+            state.history = []
+
+    def test_lru_eviction(self):
+        """Test the least recently used session makes room for a new one"""
+        store = SessionStore(max_sessions=2)
+        store.get('a').last_country = 'india'
+        store.get('b')
+        assert store.get('a').last_country == 'india'  # 'a' is now the most recent
+        store.get('c')
+
+        assert len(store) == 2
+        assert 'b' not in store
+        assert store.get('a').last_country == 'india'
+
+        store.discard('a')
+        assert store.get('a').last_country is None
+
+    def test_ttl_eviction(self):
+        """Test sessions idle for longer than the TTL are dropped"""
+        now = [0.0]
+        store = SessionStore(ttl_seconds=60, clock=lambda: now[0])
+        store.get('idle').last_country = 'india'
+        now[0] = 50
+        store.get('active').last_country = 'france'
+
+        now[0] = 100
+        assert 'idle' not in store
+        assert len(store) == 1
+        assert store.get('idle').last_country is None
+        assert store.get('active').last_country == 'france'
+
+class TestTranslationCache:
+    def test_memory_lru(self):
+        """Test repeats are served from memory and the LRU stays bounded"""
+        backend = Mock(side_effect=stub_translate)
+        cache = TranslationCache(backend=backend, cache_size=2, persist=False)
+
+        assert cache.translate("Get vaccinated", 'hi') == "[hi] Get vaccinated"
+        assert cache.translate("Get vaccinated", 'hi') == "[hi] Get vaccinated"
+        assert cache.translate("Get vaccinated", 'ta') == "[ta] Get vaccinated"
+        assert backend.call_count == 2
+
+        cache.translate("Wear a mask", 'hi')  # evicts the least recently used ('hi' one)
+        cache.translate("Get vaccinated", 'ta')
+        assert backend.call_count == 3
+        cache.translate("Get vaccinated", 'hi')
+        assert backend.call_count == 4
+
+    def test_persistent_store(self, translation_db):
+        """Test translations outlive the process and failures are not stored"""
+        TranslationCache(backend=stub_translate).translate("Get vaccinated", 'hi')
+
+        offline = TranslationCache(backend=Mock(side_effect=ConnectionError("offline")))
+        assert offline.translate("Get vaccinated", 'hi') == "[hi] Get vaccinated"
+        with pytest.raises(ConnectionError):
+            offline.translate("Wear a mask", 'hi')
+        with pytest.raises(ConnectionError):
+            offline.translate("Wear a mask", 'hi')
+        assert offline.backend.call_count == 2
+
+    def test_prewarm_knowledge_base(self, translation_db):
+        """Test pre-warming stores every answer the chatbot would machine-translate"""
+        texts = untranslated_responses(get_knowledge_index())
+        assert set(texts) == set(KNOWLEDGE_BASE_TRANSLATIONS)
+        hindi = KNOWLEDGE_BASE_TRANSLATIONS['hi']
+        assert all(item['intent'] in hindi or set(item['responses']) <= set(texts['hi'])
+                   for item in KNOWLEDGE_BASE)
+
+        backend = Mock(side_effect=stub_translate)
+        counts = prewarm_knowledge_base(TranslationCache(backend=backend))
+        assert counts['hi'] == len(set(texts['hi'])) and backend.call_count == sum(counts.values())
+        assert prewarm_knowledge_base(TranslationCache(backend=backend)) == {lang: 0 for lang in counts}
+
+        offline = TranslationCache(backend=Mock(side_effect=ConnectionError("offline")))
+        assert offline.translate(texts['te'][0], 'te') == f"[te] {texts['te'][0]}"
+
+class TestSpellIndex:
+    @pytest.fixture
+    def index(self):
+        return SpellIndex({'vaccine': 5, 'vaccines': 2, 'dose': 3, 'does': 10, 'the': 100})
+
+    def test_correct(self, index):
+        """Test the nearest, most frequent known word is chosen"""
+        assert index.correct('vaccine') == 'vaccine'      # known words stay
+        assert index.correct('vacine') == 'vaccine'       # insert
+        assert index.correct('vacciness') == 'vaccines'   # delete
+        assert index.correct('doe') == 'does'             # tie at distance 1: more frequent
+        assert index.correct('dsoe') == 'dose'            # swap beats distance 2
+        assert index.correct('vacxinx') == 'vaccine'      # distance 2
+        assert index.correct('xyzzy') == 'xyzzy'          # nothing close: unchanged
+
+    def test_add_words(self, index):
+        """Test added words become known and clear cached corrections"""
+        assert index.correct('omicrn') == 'omicrn'
+        index.add_words({'omicron': 1})
+        assert 'omicron' in index
+        assert index.correct('omicrn') == 'omicron'
+
+    def test_with_words_leaves_original(self, index):
+        """Test with_words returns an extended copy and shares no changed list"""
+        assert index.correct('omicrn') == 'omicrn'
+        extended = index.with_words({'omicron': 1, 'omicronic': 2})
+
+        assert extended.correct('omicrn') == 'omicron'
+        assert 'omicron' not in index
+        assert index.correct('omicrn') == 'omicrn'
+        assert len(extended) == len(index) + 2
+
+    def test_edit_distance(self):
+        """Test Damerau-Levenshtein distance, swaps included"""
+        assert edit_distance('dose', 'does') == 1
+        assert edit_distance('dsoe', 'does') == 2
+        assert edit_distance('ca', 'abc') == 2
+        assert edit_distance('', 'abc') == 3
+
+    def test_matches_textblob(self):
+        """Test the index corrects like TextBlob's Word.correct"""
+        from textblob import Word
+        index = SpellIndex.from_textblob()
+        for word in ['symptms', 'vacine', 'helo', 'recieve', 'beleive', 'quikc', 'xqzt']:
+            assert index.correct(word) == str(Word(word).correct())
+
+class TestKnowledgeIndex:
+    def test_lookups_match_knowledge_base(self):
+        """Test the compiled index answers like scanning the knowledge base"""
+        index = get_knowledge_index()
+        for item in KNOWLEDGE_BASE:
+            assert index.responses[item['intent']] == tuple(item['responses'])
+        assert len(index.patterns) == len(index.pattern_intents) == sum(len(i['patterns']) for i in KNOWLEDGE_BASE)
+        assert index.emotion_responses['fear'] == index.responses['feeling_scared']
+
+        hindi = KNOWLEDGE_BASE_TRANSLATIONS['hi']['greeting'][0]
+        assert index.is_translated(hindi, 'hi')
+        assert not index.is_translated(hindi, 'ta')
+        assert not index.is_translated(KNOWLEDGE_BASE[0]['responses'][0], 'hi')
+
+    def test_index_is_immutable(self):
+        """Test the shared index can't be changed by a caller"""
+        index = build_knowledge_index(
+            [{'intent': 'a', 'patterns': ['x'], 'responses': ['first']},
+             {'intent': 'a', 'patterns': ['y'], 'responses': ['second']}],
+            {'hi': {'a': ['pehla']}},
+        )
+        assert index.responses['a'] == ('first',)  # first item of an intent wins
+        assert index.pattern_intents == ('a', 'a')
+        with pytest.raises(TypeError):
+            index.responses['b'] = ('new',)
+        with pytest.raises(TypeError):
+            index.translations['hi']['a'] = ('new',)
+        with pytest.raises(AttributeError):
+            index.patterns = ()
+
+class TestPatternIndex:
+    @pytest.fixture
+    def index(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        patterns = ["is the vaccine safe", "vaccine side effects", "hello there", "hi there", "where to get tested"]
+        labels = ["safety", "side_effects", "greeting", "greeting", "testing"]
+        vectorizer = TfidfVectorizer()
+        return vectorizer, PatternIndex(vectorizer.fit_transform(patterns), labels)
+
+    def test_search_matches_cosine(self, index):
+        """Test the best intent and score equal a dense cosine search"""
+        from sklearn.metrics.pairwise import cosine_similarity
+        vectorizer, retriever = index
+        query = vectorizer.transform(["vaccine side effects in kids"])
+        similarities = cosine_similarity(query, vectorizer.transform(
+            ["is the vaccine safe", "vaccine side effects", "hello there", "hi there", "where to get tested"]
+        )).flatten()
+
+        (intent, score), = retriever.search(query)
+        assert intent == "side_effects"
+        assert score == pytest.approx(similarities.max())
+
+    def test_top_k_and_aggregate(self, index):
+        """Test k intents come back best first, pooled per intent"""
+        vectorizer, retriever = index
+        query = vectorizer.transform(["hello is the vaccine safe"])
+
+        results = retriever.search(query, k=3)
+        assert [intent for intent, _ in results] == ["safety", "greeting", "side_effects"]
+        assert [score for _, score in results] == sorted((s for _, s in results), reverse=True)
+
+        # Mean pooling averages over all of an intent's patterns
+        by_max = dict(retriever.search(query, k=3))
+        by_mean = dict(retriever.search(query, k=3, aggregate="mean"))
+        assert by_mean["greeting"] < by_max["greeting"]
+        assert by_mean["safety"] == pytest.approx(by_max["safety"])
+
+    def test_no_shared_terms(self, index):
+        """Test a query without known terms matches nothing"""
+        vectorizer, retriever = index
+        assert retriever.search(vectorizer.transform(["xyzzy"])) == []
+        with pytest.raises(ValueError):
+            retriever.search(vectorizer.transform(["hello"]), aggregate="median")
+
+    def test_search_many(self, index):
+        """Test a batch of queries gives each query's own search result"""
+        vectorizer, retriever = index
+        queries = ["vaccine side effects in kids", "xyzzy", "hello is the vaccine safe", "hi"]
+        batch = vectorizer.transform(queries)
+
+        for k, aggregate in [(1, "max"), (3, "max"), (3, "mean")]:
+            expected = [retriever.search(vectorizer.transform([q]), k=k, aggregate=aggregate) for q in queries]
+            assert retriever.search_many(batch, k=k, aggregate=aggregate) == expected
+
+        # Blocks bounded by MAX_BLOCK_CELLS give the same answers
+        with patch('src.retrieval.MAX_BLOCK_CELLS', 1):
+            assert retriever.search_many(batch, k=3) == [retriever.search(batch[i], k=3) for i in range(4)]
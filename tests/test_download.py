@@ -0,0 +1,372 @@
+"""
+Tests for the HTTP downloader, run against a local stand-in server
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.download import (
+    fetch_file, metadata_path, partial_path, read_metadata, verify_file, DownloadError
+)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves server.payload with ETag / Last-Modified validators and byte
+    ranges. Faults are injected per request from server.faults: an int cuts
+    the connection after that many body bytes, "503" answers with an error.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        fault = server.faults.pop(0) if server.faults else None
+
+        if fault == "503":
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = server.payload
+        status = 200
+        range_header = self.headers.get("Range")
+        if server.ranges and range_header and self.headers.get("If-Range") == server.etag:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            body = body[start:]
+            status = 206
+
+        gzipped = server.gzip and "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = gzip.compress(body)
+
+        self.send_response(status)
+        self.send_header("ETag", server.etag)
+        self.send_header("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+        if status == 206:
+            total = len(server.payload)
+            self.send_header("Content-Range", f"bytes {total - len(body)}-{total - 1}/{total}")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        if server.digest:
+            self.send_header("Repr-Digest", f"sha-256=:{server.digest}:")
+        # Advertise a larger body than is sent to simulate a truncated transfer
+        self.send_header("Content-Length", str(len(body) + server.missing_bytes))
+        self.end_headers()
+
+        if isinstance(fault, int):
+            self.wfile.write(body[:fault])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    """Start a stand-in HTTP server on a free local port"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    httpd.payload = b"location,date\n" + b"Aland,2024-01-01\n" * 5000
+    httpd.etag = '"v1"'
+    httpd.gzip = False
+    httpd.missing_bytes = 0
+    httpd.ranges = True
+    httpd.digest = None
+    httpd.faults = []
+    httpd.requests = []
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/owid.csv"
+
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestFetchFile:
+    """Test conditional, streamed downloads"""
+
+    def test_first_download_writes_file_and_metadata(self, server, tmp_path):
+        dest = str(tmp_path / "owid.csv")
+
+        assert fetch_file(server.url, dest) is True
+
+        with open(dest, "rb") as f:
+            assert f.read() == server.payload
+        meta = read_metadata(dest)
+        assert meta["etag"] == '"v1"'
+        assert meta["size"] == len(server.payload)
+        assert "If-None-Match" not in server.requests[0]
+
+    def test_unchanged_upstream_returns_304(self, server, tmp_path):
+        dest = str(tmp_path / "owid.csv")
+        fetch_file(server.url, dest)
+        mtime = os.path.getmtime(dest)
+
+        assert fetch_file(server.url, dest) is False
+
+        assert server.requests[1]["If-None-Match"] == '"v1"'
+        assert server.requests[1]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+        assert os.path.getmtime(dest) == mtime
+
+    def test_changed_upstream_is_downloaded_again(self, server, tmp_path):
+        dest = str(tmp_path / "owid.csv")
+        fetch_file(server.url, dest)
+
+        server.payload = b"location,date\nBland,2024-01-02\n"
+        server.etag = '"v2"'
+
+        assert fetch_file(server.url, dest) is True
+        with open(dest, "rb") as f:
+            assert f.read() == server.payload
+        assert read_metadata(dest)["etag"] == '"v2"'
+
+    def test_gzip_transfer(self, server, tmp_path):
+        server.gzip = True
+        dest = str(tmp_path / "owid.csv")
+
+        assert fetch_file(server.url, dest, compress=True) is True
+        assert server.requests[0]["Accept-Encoding"] == "gzip"
+
+        with open(dest, "rb") as f:
+            assert f.read() == server.payload
+        assert read_metadata(dest)["size"] == len(server.payload)
+
+    def test_truncated_body_keeps_previous_file(self, server, tmp_path):
+        dest = str(tmp_path / "owid.csv")
+        fetch_file(server.url, dest)
+        original = server.payload
+
+        server.payload = b"location,date\nBland,2024-01-02\n"
+        server.etag = '"v2"'
+        server.missing_bytes = 100
+
+        with pytest.raises(Exception):
+            fetch_file(server.url, dest, timeout=2, retries=0)
+
+        with open(dest, "rb") as f:
+            assert f.read() == original
+        assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+    def test_modified_file_ignores_stored_validators(self, server, tmp_path):
+        dest = str(tmp_path / "owid.csv")
+        fetch_file(server.url, dest)
+
+        with open(dest, "ab") as f:
+            f.write(b"local edit\n")
+
+        assert fetch_file(server.url, dest) is True
+        assert "If-None-Match" not in server.requests[1]
+        with open(metadata_path(dest)) as f:
+            assert json.load(f)["size"] == len(server.payload)
+
+    def test_corrupted_file_is_not_revalidated(self, server, tmp_path):
+        dest = str(tmp_path / "owid.csv")
+        fetch_file(server.url, dest)
+        assert verify_file(dest)
+
+        # Same size, different bytes: only the stored SHA-256 can tell
+        with open(dest, "r+b") as f:
+            f.seek(100)
+            f.write(b"X")
+        assert read_metadata(dest)
+        assert not verify_file(dest)
+
+        assert fetch_file(server.url, dest) is True
+        assert "If-None-Match" not in server.requests[1]
+        with open(dest, "rb") as f:
+            assert f.read() == server.payload
+        assert verify_file(dest)
+
+    def test_cached_csv_fallback_is_verified(self, server, tmp_path, monkeypatch):
+        from src import etl
+        dest = str(tmp_path / "owid.csv")
+        monkeypatch.setattr(etl, "CSV_PATH", dest)
+        monkeypatch.setattr(etl, "OWID_URL", server.url)
+        fetch_file(server.url, dest)
+
+        def offline(*args, **kwargs):
+            raise requests.ConnectionError("offline")
+        monkeypatch.setattr(etl, "fetch_file", offline)
+
+        assert etl.download_csv() == dest
+
+        with open(dest, "r+b") as f:
+            f.write(b"X")
+        with pytest.raises(IOError, match="no longer matches the SHA-256 recorded"):
+            etl.download_csv()
+
+        # A truncated copy is refused too, though its size no longer matches the metadata
+        with open(dest, "r+b") as f:
+            f.truncate(100)
+        assert verify_file(dest) is False
+        with pytest.raises(IOError, match="modified or corrupted"):
+            etl.download_csv()
+
+    def test_unrecorded_cached_csv_is_used_offline(self, tmp_path, monkeypatch, capsys):
+        from src import etl
+        dest = str(tmp_path / "owid.csv")
+        monkeypatch.setattr(etl, "CSV_PATH", dest)
+        # A cache from before downloads were verified: no metadata file
+        with open(dest, "w") as f:
+            f.write("location,date\n")
+
+        def offline(*args, **kwargs):
+            raise requests.ConnectionError("offline")
+        monkeypatch.setattr(etl, "fetch_file", offline)
+
+        assert verify_file(dest) is None
+        assert etl.download_csv() == dest
+        assert "no recorded SHA-256" in capsys.readouterr().out
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping"""
+    delays = []
+    monkeypatch.setattr("src.download.time.sleep", delays.append)
+    return delays
+
+
+class TestResumableFetch:
+    """Test retry, resume and integrity checks against injected faults"""
+
+    @pytest.fixture(autouse=True)
+    def small_chunks(self, monkeypatch):
+        """Stream in small chunks so partial transfers leave data behind"""
+        monkeypatch.setattr("src.download.CHUNK_SIZE", 100)
+
+    def test_resumes_after_connection_drop(self, server, tmp_path, sleeps):
+        dest = str(tmp_path / "owid.csv")
+        server.faults = [20000]
+
+        assert fetch_file(server.url, dest) is True
+
+        with open(dest, "rb") as f:
+            assert f.read() == server.payload
+        assert server.requests[1]["Range"] == "bytes=20000-"
+        assert server.requests[1]["If-Range"] == '"v1"'
+        assert sleeps == [1.0]
+        assert not os.path.exists(partial_path(dest))
+
+    def test_gzip_server_first_download_resumes(self, server, tmp_path, sleeps):
+        """A server that gzips whenever allowed (like GitHub raw) must still be resumable"""
+        server.gzip = True
+        dest = str(tmp_path / "owid.csv")
+        server.faults = [20000]
+
+        assert fetch_file(server.url, dest) is True
+
+        assert server.requests[0]["Accept-Encoding"] == "identity"
+        assert server.requests[1]["Range"] == "bytes=20000-"
+        with open(dest, "rb") as f:
+            assert f.read() == server.payload
+        assert verify_file(dest)
+
+    def test_interrupted_gzip_server_download_is_kept(self, server, tmp_path, sleeps):
+        server.gzip = True
+        dest = str(tmp_path / "owid.csv")
+        server.faults = [20000]
+
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            fetch_file(server.url, dest, retries=0)
+        assert os.path.getsize(partial_path(dest)) == 20000
+
+        # The next run picks up where this one stopped
+        assert fetch_file(server.url, dest) is True
+        assert server.requests[-1]["Range"] == "bytes=20000-"
+        with open(dest, "rb") as f:
+            assert f.read() == server.payload
+
+    def test_exponential_backoff_on_server_errors(self, server, tmp_path, sleeps):
+        dest = str(tmp_path / "owid.csv")
+        server.faults = ["503", "503", "503"]
+
+        assert fetch_file(server.url, dest, backoff=0.5) is True
+        assert sleeps == [0.5, 1.0, 2.0]
+
+    def test_gives_up_without_touching_cached_file(self, server, tmp_path, sleeps):
+        dest = str(tmp_path / "owid.csv")
+        fetch_file(server.url, dest)
+        original = server.payload
+
+        server.payload = b"location,date\n" + b"Bland,2024-01-02\n" * 5000
+        server.etag = '"v2"'
+        server.faults = [100, 200, 300]
+
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            fetch_file(server.url, dest, retries=2)
+
+        with open(dest, "rb") as f:
+            assert f.read() == original
+        assert read_metadata(dest)["etag"] == '"v1"'
+        # The partial copy is kept for the next run to resume from
+        assert os.path.getsize(partial_path(dest)) == 600
+
+        assert fetch_file(server.url, dest) is True
+        assert server.requests[-1]["Range"] == "bytes=600-"
+        with open(dest, "rb") as f:
+            assert f.read() == server.payload
+
+    def test_changed_upstream_restarts_instead_of_resuming(self, server, tmp_path, monkeypatch):
+        dest = str(tmp_path / "owid.csv")
+        server.faults = [20000]
+
+        # The first attempt breaks off; upstream changes before the retry
+        def change_upstream(delay):
+            server.payload = b"location,date\nCland,2024-01-03\n"
+            server.etag = '"v2"'
+        monkeypatch.setattr("src.download.time.sleep", change_upstream)
+
+        assert fetch_file(server.url, dest) is True
+
+        assert server.requests[1]["If-Range"] == '"v1"'
+        with open(dest, "rb") as f:
+            assert f.read() == server.payload
+        assert read_metadata(dest)["etag"] == '"v2"'
+
+    def test_digest_is_verified(self, server, tmp_path, sleeps):
+        dest = str(tmp_path / "owid.csv")
+        server.digest = base64.b64encode(hashlib.sha256(server.payload).digest()).decode()
+
+        assert fetch_file(server.url, dest) is True
+        assert read_metadata(dest)["sha256"] == hashlib.sha256(server.payload).hexdigest()
+
+    def test_digest_mismatch_is_rejected(self, server, tmp_path, sleeps):
+        dest = str(tmp_path / "owid.csv")
+        server.digest = base64.b64encode(hashlib.sha256(b"something else").digest()).decode()
+
+        with pytest.raises(DownloadError, match="SHA-256 mismatch"):
+            fetch_file(server.url, dest, retries=1)
+
+        assert not os.path.exists(dest)
+        assert not os.path.exists(partial_path(dest))
+
+    def test_resume_digest_covers_whole_file(self, server, tmp_path, sleeps):
+        dest = str(tmp_path / "owid.csv")
+        server.digest = base64.b64encode(hashlib.sha256(server.payload).digest()).decode()
+        server.faults = [5000]
+
+        assert fetch_file(server.url, dest) is True
+        assert server.requests[1]["Range"] == "bytes=5000-"
+        with open(dest, "rb") as f:
+            assert f.read() == server.payload
@@ -4,6 +4,7 @@ Unit and integration tests for COVID-19 Vaccine Tracker ETL pipeline
 """
 import pytest
 import pandas as pd
+import numpy as np
 import os
 import sys
 from datetime import datetime
@@ -11,11 +12,21 @@ from datetime import datetime
 # Add src to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.etl import download_csv, load_data, CSV_PATH
-from src.clean import clean_vax
-from src.storage import save_df_to_db, get_latest_by_country, get_country_timeseries, DB_PATH
-from src.forecast import fit_prophet_for_country, forecast_country_with_history
-from unittest.mock import patch
+from src.etl import download_csv, load_data, read_owid_csv, CSV_PATH
+from src.clean import (
+    clean_vax, clean_vax_incremental, CLEAN_COLUMNS, CLEAN_DTYPES, NUMERIC_COLUMNS, REVISION_LOOKBACK_DAYS
+)
+from src.storage import (
+    save_df_to_db, upsert_df_to_db, get_latest_by_country, get_country_timeseries,
+    get_latest_snapshot, get_countries_timeseries, get_global_totals, get_data_summary,
+    get_high_water_marks, record_high_water_marks, get_recently_loaded, get_data_version, get_cached_forecast, save_forecast,
+    get_engine, dispose_engines, DB_PATH
+)
+from src.forecast import (
+    fit_prophet_for_country, fit_holt_winters_for_country, forecast_country_with_history,
+    cached_forecast, forecast_all_countries, FORECASTERS
+)
+from unittest.mock import Mock, patch
 import tempfile
 
 @pytest.fixture(scope="function")
@@ -33,14 +44,35 @@ def temp_db():
     with patch("src.storage.DB_URL", db_url):
         yield path
         
-    # Cleanup
-    if os.path.exists(path):
-        try:
-            os.unlink(path)
-        except PermissionError:
-            pass
+    # Cleanup (close pooled connections first, WAL mode adds -wal/-shm files)
+    dispose_engines()
+    for p in (path, path + "-wal", path + "-shm"):
+        if os.path.exists(p):
+            try:
+                os.unlink(p)
+            except PermissionError:
+                pass
 
 
+def random_vaccinations(locations, days, seed=7):
+    """Raw OWID-like rows for locations, from 2021-01-01, with gaps in daily_vaccinations"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for name in locations:
+        total = np.cumsum(rng.integers(0, 500, days)).astype(float)
+        daily = rng.integers(0, 400, days).astype(float)
+        daily[rng.random(days) < 0.5] = np.nan
+        frames.append(pd.DataFrame({
+            'location': name,
+            'date': pd.date_range('2021-01-01', periods=days),
+            'total_vaccinations': total,
+            'people_vaccinated': total * 0.6,
+            'people_fully_vaccinated': total * 0.3,
+            'daily_vaccinations': daily,
+            'population': 5_000_000.0,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
 
 class TestETL:
     """Test data extraction and loading"""
@@ -84,6 +116,117 @@ class TestETL:
         assert df1.equals(df2), "Cached data should match original"
 
 
+class TestCsvReader:
+    """Test the column-pruned, dtype-declared CSV reader"""
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        path = tmp_path / "owid.csv"
+        pd.DataFrame({
+            'iso_code': ['AAA', 'AAA', 'BBB'],
+            'location': ['Aland', 'Aland', 'Bland'],
+            'date': ['2024-01-01', '2024-01-02', '2024-01-01'],
+            'total_vaccinations': [10.0, None, 1.4e9],
+            'population': [1000.0, 1000.0, 2000.0],
+            'new_cases_smoothed': [1.5, 2.25, None],
+            'unused_metric': [1.0, 2.0, 3.0],
+        }).to_csv(path, index=False)
+        return str(path)
+
+    @pytest.mark.parametrize("engine", ["c", "pyarrow"])
+    def test_read_with_cleaning_schema(self, csv_path, engine):
+        """Test only schema columns are read, with the declared dtypes"""
+        df = read_owid_csv(csv_path, CLEAN_COLUMNS, CLEAN_DTYPES, engine=engine)
+
+        assert list(df.columns) == ['location', 'date', 'total_vaccinations',
+                                    'population', 'new_cases_smoothed']
+        assert isinstance(df['location'].dtype, pd.CategoricalDtype)
+        assert df['total_vaccinations'].dtype == 'Int64'
+        assert df['total_vaccinations'].tolist()[::2] == [10, 1_400_000_000]
+        assert df['total_vaccinations'].isna().sum() == 1
+        assert df['new_cases_smoothed'].dtype == 'float32'
+        assert pd.api.types.is_datetime64_any_dtype(df['date'])
+
+    def test_typed_clean_matches_untyped(self, csv_path):
+        """Test cleaning typed input gives the same values as the default parse"""
+        typed = clean_vax(read_owid_csv(csv_path, CLEAN_COLUMNS, CLEAN_DTYPES))
+        untyped = clean_vax(pd.read_csv(csv_path, parse_dates=['date']))
+
+        as_float = {c: 'float64' for c in typed.select_dtypes('number').columns}
+        pd.testing.assert_frame_equal(
+            typed.astype({'location': str, **as_float}),
+            untyped.astype({'location': str, **as_float}),
+            check_dtype=False, rtol=1e-6,
+        )
+
+    def test_fractional_counts_fall_back_to_float(self, tmp_path):
+        """Test non-integer values in declared count columns do not fail the load"""
+        path = tmp_path / "owid.csv"
+        pd.DataFrame({
+            'location': ['Aland', 'Bland'],
+            'date': ['2024-01-01', '2024-01-01'],
+            'people_vaccinated': [10.5, 20.0],
+        }).to_csv(path, index=False)
+
+        df = read_owid_csv(str(path), CLEAN_COLUMNS, CLEAN_DTYPES)
+        assert df['people_vaccinated'].dtype == 'float64'
+        assert df['people_vaccinated'].tolist() == [10.5, 20.0]
+
+
+class TestParquetCache:
+    """Test the Parquet snapshot between download and cleaning"""
+
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        """Write a small OWID-style CSV and point the loader at it"""
+        csv_path = tmp_path / "owid.csv"
+        pd.DataFrame({
+            'iso_code': ['AAA', 'AAA', 'BBB'],
+            'location': ['Aland', 'Aland', 'Bland'],
+            'date': ['2024-01-01', '2024-01-02', '2024-01-01'],
+            'total_vaccinations': [10.0, 20.0, 5.0],
+            'unused_metric': [1.0, 2.0, 3.0],
+        }).to_csv(csv_path, index=False)
+
+        parquet_path = str(tmp_path / "owid.parquet")
+        with patch("src.etl.download_csv", return_value=str(csv_path)), \
+             patch("src.etl.PARQUET_PATH", parquet_path):
+            yield csv_path, parquet_path
+
+    def test_first_load_writes_snapshot(self, csv_file):
+        """Test the first parse writes a Parquet snapshot"""
+        csv_path, parquet_path = csv_file
+        df = load_data()
+
+        assert os.path.exists(parquet_path)
+        assert isinstance(df['location'].dtype, pd.CategoricalDtype)
+        assert pd.api.types.is_datetime64_any_dtype(df['date'])
+
+    def test_cache_hit_reads_requested_columns(self, csv_file):
+        """Test a cache hit returns the same data restricted to the requested columns"""
+        csv_path, parquet_path = csv_file
+        full = load_data()
+
+        with patch("src.etl.pd.read_csv", side_effect=AssertionError("CSV should not be parsed")):
+            cached = load_data(columns=['location', 'date', 'total_vaccinations', 'missing'])
+
+        assert list(cached.columns) == ['location', 'date', 'total_vaccinations']
+        assert isinstance(cached['location'].dtype, pd.CategoricalDtype)
+        assert cached.equals(full[['location', 'date', 'total_vaccinations']])
+
+    def test_changed_csv_invalidates_snapshot(self, csv_file):
+        """Test a rewritten CSV is parsed again instead of served from the snapshot"""
+        csv_path, parquet_path = csv_file
+        load_data()
+
+        df = pd.read_csv(csv_path)
+        df.loc[len(df)] = ['CCC', 'Cland', '2024-01-03', 1.0, 1.0]
+        df.to_csv(csv_path, index=False)
+
+        reloaded = load_data()
+        assert 'Cland' in set(reloaded['location'])
+
+
 class TestCleaning:
     """Test data cleaning and transformation"""
     
@@ -149,10 +292,140 @@ class TestCleaning:
         })
         
         df_clean = clean_vax(df)
-        
+
         # Should fill daily vaccinations by differencing
         assert df_clean['daily_vaccinations'].notna().any()
 
+    @staticmethod
+    def _reference_clean_vax(df):
+        """Original per-country implementation of clean_vax, kept for parity checks"""
+        df = df.copy()
+        for c in CLEAN_COLUMNS:
+            if c not in df.columns:
+                df[c] = pd.NA
+        df = df[CLEAN_COLUMNS].sort_values(["location", "date"])
+        df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].apply(pd.to_numeric, errors="coerce")
+        df["population"] = pd.to_numeric(df["population"], errors="coerce")
+
+        groups = []
+        for _, g in df.groupby("location", sort=True):
+            g = g.copy()
+            if g["daily_vaccinations"].isna().any():
+                daily_diff = g["total_vaccinations"].diff().fillna(0).clip(lower=0)
+                g["daily_vaccinations"] = g["daily_vaccinations"].fillna(daily_diff)
+            g["daily_vaccinations"] = g["daily_vaccinations"].clip(lower=0)
+            g["daily_vaccinations_7d"] = g["daily_vaccinations"].rolling(
+                window=7, min_periods=1
+            ).mean()
+            if g["population"].notna().any():
+                pop = g["population"].ffill().bfill().iloc[0]
+                g["pct_vaccinated"] = (g["people_vaccinated"] / pop) * 100
+                g["pct_fully_vaccinated"] = (g["people_fully_vaccinated"] / pop) * 100
+            else:
+                g["pct_vaccinated"] = np.nan
+                g["pct_fully_vaccinated"] = np.nan
+            groups.append(g)
+        return pd.concat(groups)
+
+    def test_clean_vax_matches_reference(self):
+        """Test vectorized cleaning gives the same output as the per-country version"""
+        rng = np.random.default_rng(42)
+        frames = []
+        for i, name in enumerate(['Zambia', 'Albania', 'Chile', 'Mongolia']):
+            n = 40 + i * 7
+            total = np.cumsum(rng.integers(0, 500, n)).astype(float)
+            total[rng.random(n) < 0.2] = np.nan
+            total[5] = total[4] - 50 if not np.isnan(total[4]) else 10.0  # data correction
+            daily = rng.integers(0, 400, n).astype(float)
+            daily[rng.random(n) < 0.5] = np.nan
+            population = np.full(n, 1_000_000.0 * (i + 1))
+            population[:3] = np.nan
+            if name == 'Mongolia':
+                population[:] = np.nan
+            frames.append(pd.DataFrame({
+                'location': name,
+                'date': pd.date_range('2021-01-01', periods=n),
+                'total_vaccinations': total,
+                'people_vaccinated': total * 0.6,
+                'people_fully_vaccinated': total * 0.3,
+                'daily_vaccinations': daily,
+                'population': population,
+                'new_cases_smoothed': rng.random(n) * 100,
+            }))
+        # Shuffle so sorting is exercised as well
+        raw = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=1)
+
+        expected = self._reference_clean_vax(raw)
+        actual = clean_vax(raw.copy())
+
+        assert list(actual.columns) == list(expected.columns)
+        pd.testing.assert_index_equal(actual.index, expected.index)
+        pd.testing.assert_frame_equal(
+            actual.astype({'pct_vaccinated': float, 'pct_fully_vaccinated': float}),
+            expected.astype({'pct_vaccinated': float, 'pct_fully_vaccinated': float}),
+            check_dtype=False,
+        )
+
+    def test_clean_vax_incremental_matches_full(self):
+        """Test incremental cleaning of new dates matches a full reclean"""
+        rng = np.random.default_rng(7)
+        frames = []
+        for name in ['Peru', 'Kenya']:
+            n = 30
+            total = np.cumsum(rng.integers(0, 500, n)).astype(float)
+            daily = rng.integers(0, 400, n).astype(float)
+            daily[rng.random(n) < 0.5] = np.nan
+            frames.append(pd.DataFrame({
+                'location': name,
+                'date': pd.date_range('2021-01-01', periods=n),
+                'total_vaccinations': total,
+                'people_vaccinated': total * 0.6,
+                'people_fully_vaccinated': total * 0.3,
+                'daily_vaccinations': daily,
+                'population': 5_000_000.0,
+            }))
+        raw = pd.concat(frames, ignore_index=True)
+
+        marks = {'Peru': pd.Timestamp('2021-01-20'), 'Kenya': pd.Timestamp('2021-01-25')}
+        incremental = clean_vax_incremental(raw, marks)
+        full = clean_vax(raw)
+        expected = full[full['date'] > full['location'].map(marks)]
+
+        assert len(incremental) == 10 + 5
+        pd.testing.assert_frame_equal(incremental, expected)
+
+    def test_clean_vax_incremental_new_location(self):
+        """Test locations without a high-water mark are cleaned in full"""
+        raw = pd.DataFrame({
+            'location': ['Fiji'] * 4,
+            'date': pd.date_range('2021-01-01', periods=4),
+            'total_vaccinations': [10, 20, 30, 40],
+        })
+        incremental = clean_vax_incremental(raw, {'Peru': pd.Timestamp('2021-01-20')})
+        assert len(incremental) == 4
+
+    def test_clean_vax_incremental_revisions(self):
+        """Test revised dates within the lookback window are recleaned from the first change"""
+        raw = random_vaccinations(['Peru', 'Kenya'], days=60)
+        marks = {'Peru': pd.Timestamp('2021-02-19'), 'Kenya': pd.Timestamp('2021-02-19')}
+        loaded = clean_vax(raw[raw['date'] <= marks['Peru']])
+        stored = loaded[loaded['date'] > marks['Peru'] - pd.Timedelta(days=REVISION_LOOKBACK_DAYS)]
+
+        # Nothing revised: only the 10 new dates of each location
+        assert len(clean_vax_incremental(raw, marks, stored=stored)) == 20
+
+        # OWID corrects Kenya on 2021-02-10, inside the window
+        revised = raw.copy()
+        revised.loc[(revised['location'] == 'Kenya') & (revised['date'] == '2021-02-10'),
+                    'daily_vaccinations'] = 9999.0
+        incremental = clean_vax_incremental(revised, marks, stored=stored)
+        full = clean_vax(revised)
+        starts = {'Peru': pd.Timestamp('2021-02-20'), 'Kenya': pd.Timestamp('2021-02-10')}
+        expected = full[full['date'] >= full['location'].map(starts)]
+
+        assert len(incremental) == 10 + 20
+        pd.testing.assert_frame_equal(incremental, expected)
+
 
 class TestStorage:
     """Test database operations"""
@@ -209,6 +482,248 @@ class TestStorage:
         # Should be sorted by date
         assert ts['date'].is_monotonic_increasing
 
+    def test_get_countries_timeseries(self, sample_clean_data, temp_db):
+        """Test querying several countries at once"""
+        save_df_to_db(sample_clean_data)
+
+        ts = get_countries_timeseries(['Country2', 'Country1', 'Missing'])
+
+        assert len(ts) == 10
+        assert ts['location'].tolist() == ['Country1'] * 5 + ['Country2'] * 5
+        assert pd.api.types.is_datetime64_any_dtype(ts['date'])
+
+    def test_dashboard_summaries(self, sample_clean_data, temp_db):
+        """Test global totals and data summary are computed in the database"""
+        assert get_data_summary() == {'last_date': None, 'countries': 0, 'records': 0}
+        assert get_global_totals()['total_vaccinations'] is None
+
+        save_df_to_db(sample_clean_data)
+
+        totals = get_global_totals()
+        assert totals['total_vaccinations'] == 1000
+        assert totals['population'] == 20000
+        summary = get_data_summary()
+        assert summary == {'last_date': pd.Timestamp('2024-01-05'), 'countries': 2, 'records': 10}
+
+    def test_global_totals_carry_forward(self, sample_clean_data, temp_db):
+        """Test global totals carry each country's last value and skip aggregates"""
+        data = sample_clean_data[
+            (sample_clean_data['location'] == 'Country1') | (sample_clean_data['date'] <= '2024-01-03')
+        ]
+        world = data[data['location'] == 'Country1'].assign(location='World')
+        save_df_to_db(pd.concat([data, world]))
+
+        totals = get_global_totals()
+        # Country2 stopped reporting at 300 on 2024-01-03; World is not added on top
+        assert totals['date'] == '2024-01-05'
+        assert totals['total_vaccinations'] == 500 + 300
+        assert totals['people_vaccinated'] == 400 + 240
+        assert totals['population'] == 20000
+        assert totals['pct_vaccinated'] == pytest.approx(640 / 20000 * 100)
+        assert totals['reporting_countries'] == 2
+
+    def test_engine_is_shared(self, temp_db):
+        """Test one pooled engine is reused and follows a patched DB_URL"""
+        engine = get_engine()
+        assert get_engine() is engine
+        assert engine.url.database == temp_db
+
+        with patch("src.storage.DB_URL", "sqlite:///:memory:"):
+            assert get_engine() is not engine
+
+    def test_sqlite_pragmas(self, temp_db):
+        """Test new connections use WAL with relaxed fsync"""
+        import sqlalchemy as sa
+        with get_engine().connect() as conn:
+            assert conn.execute(sa.text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(sa.text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+
+    def test_upsert_df_to_db(self, sample_clean_data, temp_db):
+        """Test upserting replaces overlapping dates and appends new ones"""
+        save_df_to_db(sample_clean_data)
+
+        update = sample_clean_data[sample_clean_data['location'] == 'Country1'].tail(2).copy()
+        update['total_vaccinations'] = [999, 1000]
+        extra = update.tail(1).copy()
+        extra['date'] = pd.Timestamp('2024-01-06')
+        update = pd.concat([update, extra])
+
+        upsert_df_to_db(update)
+
+        ts = get_country_timeseries('Country1')
+        assert len(ts) == 6
+        assert ts['total_vaccinations'].tolist() == [100, 200, 300, 999, 1000, 1000]
+        assert len(get_country_timeseries('Country2')) == 5
+
+    def test_incremental_load_picks_up_revisions(self, temp_db):
+        """Test an incremental load compares recent dates with the database and rewrites revised ones"""
+        raw = random_vaccinations(['Peru', 'Kenya'], days=60)
+        first = raw[raw['date'] <= '2021-02-19']
+        save_df_to_db(clean_vax(first))
+        record_high_water_marks(clean_vax(first), replace=True)
+
+        stored = get_recently_loaded(REVISION_LOOKBACK_DAYS)
+        assert len(stored) == 2 * REVISION_LOOKBACK_DAYS
+        assert stored['date'].min() == pd.Timestamp('2021-01-23')
+
+        # Unchanged rows read back from SQLite compare equal
+        assert clean_vax_incremental(first, get_high_water_marks(), stored=stored).empty
+
+        revised = raw.copy()
+        revised.loc[(revised['location'] == 'Kenya') & (revised['date'] == '2021-02-10'),
+                    'total_vaccinations'] += 5000
+        incremental = clean_vax_incremental(revised, get_high_water_marks(), stored=stored)
+        upsert_df_to_db(incremental)
+        record_high_water_marks(incremental)
+
+        for location in ['Peru', 'Kenya']:
+            expected = clean_vax(revised)
+            expected = expected[expected['location'] == location]
+            actual = get_country_timeseries(location)
+            assert len(actual) == 60
+            np.testing.assert_allclose(actual['daily_vaccinations_7d'], expected['daily_vaccinations_7d'])
+            np.testing.assert_allclose(actual['total_vaccinations'], expected['total_vaccinations'])
+
+    def test_high_water_marks(self, sample_clean_data, temp_db):
+        """Test high-water marks are recorded per location"""
+        assert get_high_water_marks() == {}
+        empty_version = get_data_version()
+
+        record_high_water_marks(sample_clean_data, replace=True)
+        loaded_version = get_data_version()
+        assert loaded_version > empty_version
+
+        # Loads within the same second still advance the version
+        save_df_to_db(sample_clean_data)
+        record_high_water_marks(sample_clean_data, replace=True)
+        upsert_df_to_db(sample_clean_data.tail(1))
+        assert get_data_version() == loaded_version + 3
+        marks = get_high_water_marks()
+        assert marks == {
+            'Country1': pd.Timestamp('2024-01-05'),
+            'Country2': pd.Timestamp('2024-01-05'),
+        }
+
+        newer = sample_clean_data.tail(1).assign(date=pd.Timestamp('2024-01-09'))
+        record_high_water_marks(newer)
+        assert get_high_water_marks()['Country2'] == pd.Timestamp('2024-01-09')
+
+    def test_latest_snapshot_keeps_last_reported_values(self, sample_clean_data, temp_db):
+        """Test the snapshot holds each metric's last non-null value per country"""
+        data = sample_clean_data.copy()
+        data['total_vaccinations'] = data['total_vaccinations'].astype(float)
+        data.loc[4, 'total_vaccinations'] = np.nan   # Country1 did not report on the last day
+        save_df_to_db(data)
+
+        snapshot = get_latest_snapshot()
+        assert len(snapshot) == 2
+        country1 = snapshot.set_index('location').loc['Country1']
+        assert country1['total_vaccinations'] == 400
+        assert country1['pct_vaccinated'] == 5.0
+        assert country1['date'] == pd.Timestamp('2024-01-05')
+
+        single = get_latest_snapshot('country2')
+        assert single['location'].tolist() == ['Country2']
+        assert single['total_vaccinations'].iloc[0] == 500
+
+        latest = get_latest_by_country(limit=1)
+        assert len(latest) == 1
+
+    def test_upsert_refreshes_latest_snapshot(self, sample_clean_data, temp_db):
+        """Test upserting new rows updates only the affected countries' snapshot"""
+        save_df_to_db(sample_clean_data)
+
+        newer = sample_clean_data.tail(1).assign(
+            date=pd.Timestamp('2024-01-06'), total_vaccinations=600
+        )
+        upsert_df_to_db(newer)
+
+        snapshot = get_latest_snapshot().set_index('location')
+        assert snapshot.loc['Country2', 'total_vaccinations'] == 600
+        assert snapshot.loc['Country2', 'date'] == pd.Timestamp('2024-01-06')
+        assert snapshot.loc['Country1', 'total_vaccinations'] == 500
+
+    def test_managed_schema(self, sample_clean_data, temp_db):
+        """Test the table is keyed by (location, date) and queries use its indexes"""
+        import sqlalchemy as sa
+        save_df_to_db(sample_clean_data)
+
+        with get_engine().connect() as conn:
+            columns = conn.execute(sa.text("PRAGMA table_info(countries_vaccinations)")).fetchall()
+            pk = [row[1] for row in sorted(columns, key=lambda row: row[5]) if row[5]]
+            assert pk == ['location', 'date']
+            assert {row[1]: row[2] for row in columns}['total_vaccinations'] == 'INTEGER'
+
+            # Dates are stored as ISO text
+            assert conn.execute(sa.text(
+                "SELECT MIN(date) FROM countries_vaccinations"
+            )).scalar() == '2024-01-01'
+
+            plan = conn.execute(sa.text(
+                "EXPLAIN QUERY PLAN SELECT * FROM countries_vaccinations "
+                "WHERE location = 'Country1' ORDER BY date"
+            )).fetchall()
+            details = " ".join(row[-1] for row in plan)
+            assert "SEARCH" in details and "TEMP B-TREE" not in details
+
+    def test_save_replaces_rows(self, sample_clean_data, temp_db):
+        """Test saving twice keeps one row per location and date"""
+        save_df_to_db(sample_clean_data)
+        save_df_to_db(sample_clean_data.head(3))
+
+        assert len(get_country_timeseries('Country1')) == 3
+        assert len(get_country_timeseries('Country2')) == 0
+
+    def test_save_swaps_atomically(self, sample_clean_data, temp_db):
+        """Test a failed save leaves the previous table and no staging table behind"""
+        import sqlalchemy as sa
+        save_df_to_db(sample_clean_data)
+
+        # Fail after the staging table replaced the old one, before commit
+        with patch("src.storage._refresh_latest_snapshot", side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                save_df_to_db(sample_clean_data.head(2))
+
+        assert len(get_country_timeseries('Country1')) == 5
+        assert len(get_country_timeseries('Country2')) == 5
+        assert not sa.inspect(get_engine()).has_table('countries_vaccinations_staging')
+
+    def test_bulk_load_batches(self, sample_clean_data, temp_db):
+        """Test rows spanning several executemany batches keep their values and types"""
+        data = sample_clean_data.astype({'total_vaccinations': 'Int64', 'pct_vaccinated': 'float32'})
+        data.loc[1, 'total_vaccinations'] = pd.NA
+
+        with patch("src.storage.BULK_BATCH_SIZE", 3):
+            save_df_to_db(data)
+
+        ts = get_country_timeseries('Country1')
+        assert len(ts) + len(get_country_timeseries('Country2')) == 10
+        assert pd.isna(ts['total_vaccinations'].iloc[1])
+        assert ts['total_vaccinations'].iloc[2] == 300
+        assert ts['pct_vaccinated'].iloc[2] == pytest.approx(3.0)
+
+    def test_migrates_legacy_table(self, sample_clean_data, temp_db):
+        """Test a table written by pandas to_sql is rebuilt with the managed schema"""
+        import sqlalchemy as sa
+        legacy = sa.create_engine(f"sqlite:///{temp_db}")
+        sample_clean_data.to_sql("countries_vaccinations", legacy, index=False)
+        legacy.dispose()
+
+        ts = get_country_timeseries('Country1')
+        assert len(ts) == 5
+        assert ts['total_vaccinations'].tolist() == [100, 200, 300, 400, 500]
+
+        with get_engine().connect() as conn:
+            assert conn.execute(sa.text("PRAGMA user_version")).scalar() >= 1
+            assert conn.execute(sa.text(
+                "SELECT date FROM countries_vaccinations LIMIT 1"
+            )).scalar() == '2024-01-01'
+            indexes = conn.execute(sa.text("PRAGMA index_list(countries_vaccinations)")).fetchall()
+            assert {row[3] for row in indexes} >= {'pk'}
+
+        # The migrated data is also materialized in the latest snapshot
+        assert len(get_latest_snapshot()) == 2
+
 
 class TestForecasting:
     """Test time series forecasting"""
@@ -262,6 +777,159 @@ class TestForecasting:
         # Historical should have actual values
         assert 'actual' in historical.columns
 
+    @pytest.fixture
+    def canned_forecast(self, sample_country_data):
+        """Stand-in for a fitted forecast, so cache tests don't fit Prophet"""
+        ds = pd.date_range('2024-01-01', periods=90)
+        return pd.DataFrame({
+            'ds': ds, 'yhat': np.arange(90.0),
+            'yhat_lower': np.arange(90.0) - 1, 'yhat_upper': np.arange(90.0) + 1,
+        })
+
+    def test_cached_forecast(self, sample_country_data, canned_forecast, temp_db):
+        """Test a stored forecast is reused until the country's series changes"""
+        with patch.dict("src.forecast.FORECASTERS", prophet=Mock(return_value=canned_forecast)):
+            fit = FORECASTERS['prophet']
+            first = cached_forecast(sample_country_data, periods=30)
+            warm = cached_forecast(sample_country_data, periods=30)
+            assert fit.call_count == 1
+            pd.testing.assert_frame_equal(warm, first, check_dtype=False)
+
+            # A changed series misses the cache and is fitted again
+            changed = sample_country_data.assign(
+                daily_vaccinations=sample_country_data['daily_vaccinations'] * 2
+            )
+            cached_forecast(changed, periods=30)
+            assert fit.call_count == 2
+
+    def test_load_invalidates_cached_forecasts(self, sample_country_data, canned_forecast, temp_db):
+        """Test loading new data for a country drops its cached forecasts"""
+        with patch.dict("src.forecast.FORECASTERS", prophet=Mock(return_value=canned_forecast)):
+            fit = FORECASTERS['prophet']
+            cached_forecast(sample_country_data, periods=30)
+            upsert_df_to_db(sample_country_data.tail(1))
+            cached_forecast(sample_country_data, periods=30)
+            assert fit.call_count == 2
+
+    def test_stale_series_keeps_fresh_forecast(self, sample_country_data, canned_forecast, temp_db):
+        """Test saving a forecast of an outdated series leaves the current one stored"""
+        save_forecast('TestCountry', 'daily_vaccinations', 30, 'fresh', canned_forecast)
+        save_forecast('TestCountry', 'daily_vaccinations', 30, 'stale', canned_forecast.assign(yhat=0.0))
+
+        fresh = get_cached_forecast('TestCountry', 'daily_vaccinations', 30, 'fresh')
+        assert fresh is not None
+        assert fresh['yhat'].tolist() == canned_forecast['yhat'].tolist()
+
+        # Saving the same series again replaces it rather than adding rows
+        save_forecast('TestCountry', 'daily_vaccinations', 30, 'fresh', canned_forecast.assign(yhat=1.0))
+        fresh = get_cached_forecast('TestCountry', 'daily_vaccinations', 30, 'fresh')
+        assert len(fresh) == len(canned_forecast)
+        assert (fresh['yhat'] == 1.0).all()
+
+    def test_forecast_all_countries(self, sample_country_data, canned_forecast, temp_db):
+        """Test batch forecasts are stored, reused and skip short histories"""
+        short = sample_country_data.head(10).assign(location='ShortCountry')
+        save_df_to_db(pd.concat([sample_country_data, short]))
+
+        with patch.dict("src.forecast.FORECASTERS", prophet=Mock(return_value=canned_forecast)):
+            fit = FORECASTERS['prophet']
+            counts = forecast_all_countries(periods=30, workers=0)
+            assert counts == {'fitted': 1, 'cached': 0, 'skipped': 1, 'failed': 0}
+
+            # The dashboard path now reads the stored forecast
+            cached_forecast(get_country_timeseries('TestCountry'), periods=30)
+            assert forecast_all_countries(periods=30, workers=0)['cached'] == 1
+            assert fit.call_count == 1
+
+    def test_dashboard_reads_configured_model(self, sample_country_data, canned_forecast, temp_db,
+                                              monkeypatch):
+        """Test the dashboard serves what run_all.py --forecasts precomputed with the configured model"""
+        from src import forecast
+        monkeypatch.setenv(forecast.MODEL_ENV_VAR, 'holt_winters')
+        save_df_to_db(sample_country_data)
+
+        hw = Mock(return_value=canned_forecast)
+        with patch.dict("src.forecast.FORECASTERS", holt_winters=hw, prophet=Mock()):
+            # run_all.py --forecasts without --model
+            forecast_all_countries(periods=30, workers=0)
+            assert hw.call_count == 1
+
+            # The dashboard's call path: cached series, filtered, then the button
+            country_data = get_countries_timeseries(('TestCountry',))
+            country_ts = country_data[country_data['location'] == 'TestCountry'].copy()
+            historical, future = forecast_country_with_history(
+                country_ts, column="daily_vaccinations", periods=30, use_cache=True
+            )
+            assert hw.call_count == 1
+            FORECASTERS['prophet'].assert_not_called()
+            assert len(future) == 30
+
+            # A bad setting only fails calls that rely on it
+            monkeypatch.setenv(forecast.MODEL_ENV_VAR, 'arima')
+            with pytest.raises(ValueError, match="VAX_FORECAST_MODEL"):
+                forecast_country_with_history(country_ts, periods=30, use_cache=True)
+            forecast_all_countries(periods=30, workers=0, model='holt_winters')
+            assert hw.call_count == 1
+
+    def test_bad_model_setting_still_imports(self):
+        """Test an unknown VAX_FORECAST_MODEL doesn't break importing the forecast module"""
+        import subprocess
+        code = "import src.forecast; print('imported')"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.join(os.path.dirname(__file__), '..'),
+                                env={**os.environ, "VAX_FORECAST_MODEL": "arima"})
+        assert result.stdout.strip() == "imported"
+
+    def test_import_defers_prophet(self):
+        """Test importing the forecast module doesn't load Prophet until a fit"""
+        import subprocess
+        code = "import sys, src.forecast; print('prophet' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.join(os.path.dirname(__file__), '..'))
+        assert result.stdout.strip() == "False"
+
+    def test_fit_holt_winters(self, sample_country_data):
+        """Test the Holt-Winters model follows trend and weekly seasonality"""
+        weekly = np.tile([1.0, 1.0, 1.0, 1.0, 1.0, 0.6, 0.5], 9)[:60]
+        df = sample_country_data.assign(
+            daily_vaccinations=sample_country_data['daily_vaccinations'] * weekly
+        )
+        forecast = fit_holt_winters_for_country(df, column='daily_vaccinations', periods=14)
+
+        assert list(forecast.columns) == ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+        assert len(forecast) == 60 + 14
+        assert forecast['ds'].iloc[-1] == pd.Timestamp('2024-03-14')
+
+        future = forecast.tail(14)
+        assert (future['yhat_lower'] <= future['yhat']).all()
+        assert (future['yhat'] <= future['yhat_upper']).all()
+        # Weekend dips carry into the forecast, close to the continued pattern
+        yhat = future['yhat'].to_numpy()
+        weekend = weekly[np.arange(60, 74) % 7] < 1
+        assert yhat[weekend].max() < yhat[~weekend].min()
+        expected = np.array([(1000 + i * 10) * weekly[i % 7] for i in range(60, 74)])
+        assert np.abs(yhat / expected - 1).max() < 0.15
+
+    def test_forecast_model_per_call(self, sample_country_data, temp_db):
+        """Test the model is chosen per call and cached under its own key"""
+        historical, future = forecast_country_with_history(
+            sample_country_data, periods=30, model='holt_winters'
+        )
+        assert len(historical) == 60
+        assert len(future) == 30
+
+        with pytest.raises(ValueError, match="Unknown forecasting model"):
+            forecast_country_with_history(sample_country_data, model='arima')
+
+        fast = Mock(return_value=future)
+        with patch.dict("src.forecast.FORECASTERS", holt_winters=fast, prophet=Mock()):
+            cached_forecast(sample_country_data, periods=30, model='holt_winters')
+            cached_forecast(sample_country_data, periods=30, model='holt_winters')
+            assert fast.call_count == 1
+            FORECASTERS['prophet'].return_value = future
+            cached_forecast(sample_country_data, periods=30)
+            assert FORECASTERS['prophet'].call_count == 1
+
 
 class TestIntegration:
     """Integration tests for complete pipeline"""